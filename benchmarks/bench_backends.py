@@ -0,0 +1,105 @@
+"""
+Per-call latency of every precompile on each native implementation, the Rust
+wrapper once per BLS12-381 backend of revm (FUZZ_RUST_BACKENDS). The backends
+build different revm-precompile releases, shown next to their name: a
+difference between them is not only the backend's.
+
+The inputs are fixed valid encodings (MSMs and pairings with --pairs pairs),
+so every implementation runs the full computation on the same data.
+
+Usage:
+    uv run python -m benchmarks.bench_backends [--iterations N] [--pairs K]
+        [--implementations rust,rust_arkworks,go]
+"""
+
+import argparse
+import statistics
+import time
+from random import Random
+from typing import Dict
+
+from tests.curve import CURVE_ORDER, FIELD_MODULUS, G1, G2, g1_to_bytes, g2_to_bytes
+from tests.layouts import OPS, RUST_BACKEND_VERSIONS, rust_implementation_name
+
+# Runs per measurement, the median is reported
+REPEATS = 5
+
+
+def benchmark_inputs(pairs: int, seed: int = 0) -> Dict[str, bytes]:
+    """One valid input of each precompile."""
+    rng = Random(seed)
+    scalars = [rng.randrange(1, CURVE_ORDER) for _ in range(2 * pairs)]
+    g1_points = G1.generator_multiply_many(scalars[:pairs] + scalars[:2])
+    g2_points = G2.generator_multiply_many(scalars[pairs:] + scalars[:2])
+    msm_scalars = [scalar.to_bytes(32, byteorder="big") for scalar in scalars[:pairs]]
+    fp = [rng.randrange(FIELD_MODULUS).to_bytes(64, byteorder="big") for _ in range(2)]
+    return {
+        "g1_add": g1_to_bytes(g1_points[-2]) + g1_to_bytes(g1_points[-1]),
+        "g2_add": g2_to_bytes(g2_points[-2]) + g2_to_bytes(g2_points[-1]),
+        "g1_msm": b"".join(
+            g1_to_bytes(point) + scalar
+            for point, scalar in zip(g1_points[:pairs], msm_scalars, strict=True)
+        ),
+        "g2_msm": b"".join(
+            g2_to_bytes(point) + scalar
+            for point, scalar in zip(g2_points[:pairs], msm_scalars, strict=True)
+        ),
+        "map_fp_to_g1": fp[0],
+        "map_fp2_to_g2": fp[0] + fp[1],
+        "pairing": b"".join(
+            g1_to_bytes(g1) + g2_to_bytes(g2)
+            for g1, g2 in zip(g1_points[:pairs], g2_points[:pairs], strict=True)
+        ),
+    }
+
+
+def time_per_call(function, input_bytes: bytes, iterations: int) -> float:
+    """Median over REPEATS runs of the mean wall time per call, in microseconds."""
+    runs = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function(input_bytes)
+        runs.append((time.perf_counter() - start) / iterations * 1e6)
+    return statistics.median(runs)
+
+
+def main():
+    from tests.LibCallerWrapper import IMPLEMENTATIONS
+
+    natives = [name for name in IMPLEMENTATIONS if name != "python"]
+    parser = argparse.ArgumentParser(description="Per-backend precompile latency")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--pairs", type=int, default=8)
+    parser.add_argument("--implementations", default=",".join(natives))
+    args = parser.parse_args()
+
+    names = args.implementations.split(",")
+    inputs = benchmark_inputs(args.pairs)
+
+    # Rust backends labelled with their revm-precompile release
+    versions = {
+        rust_implementation_name(backend): version
+        for backend, version in RUST_BACKEND_VERSIONS.items()
+    }
+    labels = [
+        f"{name}@{versions[name]}" if name in versions else name for name in names
+    ]
+    print(f"{'op (us/call)':<16}" + "".join(f"{label:>24}" for label in labels))
+    for op in OPS:
+        latencies = []
+        for name in names:
+            function = getattr(IMPLEMENTATIONS[name], op)
+            # Warm-up call, also checking that the input is accepted
+            function(inputs[op])
+            latencies.append(time_per_call(function, inputs[op], args.iterations))
+        print(f"{op:<16}" + "".join(f"{latency:>24.1f}" for latency in latencies))
+    if len({versions[name] for name in names if name in versions}) > 1:
+        print(
+            "note: the Rust backends build different revm-precompile releases, "
+            "their difference is not only the backend's"
+        )
+
+
+if __name__ == "__main__":
+    main()
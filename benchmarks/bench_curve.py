@@ -0,0 +1,67 @@
+"""
+Per-point generation time of tests/curve.py against py_ecc.
+
+Usage:
+    uv run python -m benchmarks.bench_curve [--iterations N]
+"""
+
+import argparse
+import time
+from random import Random
+
+from py_ecc.bls12_381 import bls12_381_curve as py_ecc_curve
+
+from tests.curve import CURVE_ORDER, G1, G2
+
+
+def time_per_call(function, scalars):
+    """Return the mean wall time per call of function(scalar) in microseconds."""
+    start = time.perf_counter()
+    for scalar in scalars:
+        function(scalar)
+    return (time.perf_counter() - start) / len(scalars) * 1e6
+
+
+def time_per_point(function, scalars):
+    """Return the mean wall time per point of function(scalars) in microseconds."""
+    start = time.perf_counter()
+    function(scalars)
+    return (time.perf_counter() - start) / len(scalars) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Curve arithmetic benchmark")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = Random(0)
+    scalars = [rng.randrange(1, CURVE_ORDER) for _ in range(args.iterations)]
+
+    print(
+        f"{'group':<6}{'py_ecc (us)':>14}{'wNAF (us)':>12}{'comb (us)':>12}"
+        f"{'comb batch (us)':>18}{'speedup':>10}"
+    )
+    for group, curve, py_ecc_generator in (
+        ("G1", G1, py_ecc_curve.G1),
+        ("G2", G2, py_ecc_curve.G2),
+    ):
+        # Build the comb table outside of the timed section
+        curve.comb_table()
+
+        py_ecc_us = time_per_call(
+            lambda s, generator=py_ecc_generator: py_ecc_curve.multiply(generator, s),
+            scalars,
+        )
+        wnaf_us = time_per_call(
+            lambda s, curve=curve: curve.multiply(curve.generator, s), scalars
+        )
+        comb_us = time_per_call(curve.generator_multiply, scalars)
+        batch_us = time_per_point(curve.generator_multiply_many, scalars)
+        print(
+            f"{group:<6}{py_ecc_us:>14.1f}{wnaf_us:>12.1f}{comb_us:>12.1f}"
+            f"{batch_us:>18.1f}{py_ecc_us / batch_us:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
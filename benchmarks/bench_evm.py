@@ -0,0 +1,106 @@
+"""
+EVM-level overhead of each precompile: the direct call of the precompile
+function next to the call from a contract run by the interpreter (STATICCALL,
+gas forwarding and return data copy), for the `make evm` builds of the Rust
+and Go wrappers and for EELS. The Rust rows are labelled with the
+revm-precompile releases of the direct and EVM-level calls.
+
+Usage:
+    uv run python -m benchmarks.bench_evm [--iterations N] [--pairs K]
+        [--implementations rust,go,python] [--backend ctypes]
+"""
+
+import argparse
+from pathlib import Path
+
+from benchmarks.bench_backends import benchmark_inputs, time_per_call
+from tests.layouts import (
+    OPS,
+    PRECOMPILE_FUNCTIONS,
+    RUST_BACKEND_VERSIONS,
+    RUST_EVM_VERSION,
+)
+from tests.versions import bind_library
+
+EVM_BUILD_DIR = Path(__file__).parent.parent / "build" / "evm"
+
+# Libraries of the `make evm` builds, by implementation
+EVM_LIBS = {
+    "rust": "librevm_wrapper.so",
+    "go": "libgo_ethereum_wrapper.so",
+}
+
+# revm-precompile releases of the direct and EVM-level Rust calls (blst)
+EVM_VERSIONS = {"rust": (RUST_BACKEND_VERSIONS["blst"], RUST_EVM_VERSION)}
+
+
+def load_functions(name: str, backend: str):
+    """Direct and EVM-level functions of an implementation, by op."""
+    if name == "python":
+        from wrappers.python.eels_evm import EELSEvmWrapper
+        from wrappers.python.eels_wrapper import EELSWrapper
+
+        return (
+            {op: getattr(EELSWrapper, op) for op in OPS},
+            {op: getattr(EELSEvmWrapper, op) for op in OPS},
+        )
+    evm_functions = [
+        (function_name.replace("_wrapper", "_evm_wrapper"), size)
+        for function_name, size in PRECOMPILE_FUNCTIONS
+    ]
+    functions = bind_library(
+        str(EVM_BUILD_DIR / EVM_LIBS[name]),
+        backend,
+        list(PRECOMPILE_FUNCTIONS) + evm_functions,
+    )
+    return (
+        {op: functions[op] for op in OPS},
+        {op: functions[f"{op}_evm"] for op in OPS},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EVM-level precompile overhead")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--pairs", type=int, default=8)
+    parser.add_argument("--implementations", default="rust,go,python")
+    parser.add_argument("--backend", default="ctypes", help="FFI backend")
+    args = parser.parse_args()
+
+    inputs = benchmark_inputs(args.pairs)
+    names = args.implementations.split(",")
+    # Implementations labelled with their direct and EVM-level releases
+    labels = {
+        name: f"{name}@{direct}/{evm}" if direct != evm else f"{name}@{direct}"
+        for name, (direct, evm) in EVM_VERSIONS.items()
+    }
+    print(
+        f"{'op':<16}{'implementation':<28}{'direct us':>12}{'evm us':>12}"
+        f"{'overhead us':>14}{'overhead':>10}"
+    )
+    for name in names:
+        direct, evm = load_functions(name, args.backend)
+        # EELS is several orders of magnitude slower
+        iterations = (
+            max(1, args.iterations // 25) if name == "python" else args.iterations
+        )
+        for op in OPS:
+            # Warm-up calls, also checking that both return the same output
+            if direct[op](inputs[op]) != evm[op](inputs[op]):
+                raise RuntimeError(f"{name} {op}: EVM-level output differs")
+            direct_us = time_per_call(direct[op], inputs[op], iterations)
+            evm_us = time_per_call(evm[op], inputs[op], iterations)
+            overhead = evm_us - direct_us
+            print(
+                f"{op:<16}{labels.get(name, name):<28}{direct_us:>12.1f}{evm_us:>12.1f}"
+                f"{overhead:>14.1f}{100 * overhead / direct_us:>9.1f}%"
+            )
+    if any(len(set(EVM_VERSIONS.get(name, ()))) > 1 for name in names):
+        print(
+            "note: revm runs another revm-precompile release than the direct "
+            "Rust calls, the overhead is not only the EVM's"
+        )
+
+
+if __name__ == "__main__":
+    main()
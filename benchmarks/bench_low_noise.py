@@ -0,0 +1,309 @@
+"""
+Low-noise latency comparison of the implementations, for go/no-go decisions.
+
+Block timings (all calls of one implementation, then the next) on a shared
+fuzz box pick up frequency scaling, migrations and other load as differences
+between the implementations. Here:
+
+- every thread of the process is pinned with os.sched_setaffinity to the
+  isolated cores (isolcpus=, from /sys/devices/system/cpu/isolated) or to
+  --cores, so it is not migrated and does not share its cores with the fuzzers
+- the implementations are interleaved: each round times one sample of every
+  implementation, in an order rotating between rounds, so that drift affects
+  all of them alike
+- the Python GC is disabled while timing
+- the governor and frequency of the cores are reported before and after the
+  run, with a warning when they are not pinned to a fixed frequency
+
+Each sample is the mean of enough calls to last TARGET_SAMPLE_NS. The report
+gives the median per call of each implementation with its noise, the half
+width of a bootstrap 95% confidence interval of the median relative to it,
+and the per-round ratio to the first implementation with its 95% confidence
+interval: a ratio whose interval excludes 1 is a real difference.
+
+Usage:
+    uv run python -m benchmarks.bench_low_noise [--cores 2,3] [--rounds 100]
+        [--max-seconds 30] [--pairs 2] [--implementations rust,go,python]
+        [--ops g1_add,g1_msm]
+"""
+
+import argparse
+import gc
+import math
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from random import Random
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from benchmarks.bench_backends import benchmark_inputs
+from tests.layouts import OPS
+
+CPU_DIR = Path("/sys/devices/system/cpu")
+
+# Duration of each sample, in nanoseconds
+TARGET_SAMPLE_NS = 200_000
+
+# Rounds always run, whatever --max-seconds
+MIN_ROUNDS = 10
+
+# Resamples of the bootstrap confidence intervals
+BOOTSTRAP_RESAMPLES = 1000
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """CPUs of a kernel CPU list, e.g. "2-3,6"."""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def isolated_cores() -> List[int]:
+    """CPUs isolated from the scheduler (isolcpus=), empty when none."""
+    try:
+        return parse_cpu_list((CPU_DIR / "isolated").read_text())
+    except OSError:
+        return []
+
+
+def pin_process(cores: Sequence[int]):
+    """Pin every thread of the process to `cores` (the native runtimes too)."""
+    for task in os.listdir("/proc/self/task"):
+        try:
+            os.sched_setaffinity(int(task), cores)
+        except OSError:
+            # Exited since listed
+            pass
+    os.sched_setaffinity(0, cores)
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cpu_state(cores: Sequence[int]) -> Dict[int, Dict[str, Optional[str]]]:
+    """Governor and current frequency (MHz) of each core."""
+    cpuinfo_mhz = {}
+    processor = None
+    for line in (_read(Path("/proc/cpuinfo")) or "").splitlines():
+        key, _, value = line.partition(":")
+        if key.strip() == "processor":
+            processor = int(value)
+        elif key.strip() == "cpu MHz" and processor is not None:
+            cpuinfo_mhz[processor] = f"{float(value):.0f}"
+    state = {}
+    for core in cores:
+        cpufreq = CPU_DIR / f"cpu{core}" / "cpufreq"
+        khz = _read(cpufreq / "scaling_cur_freq")
+        state[core] = {
+            "governor": _read(cpufreq / "scaling_governor"),
+            "mhz": f"{int(khz) / 1000:.0f}" if khz else cpuinfo_mhz.get(core),
+        }
+    return state
+
+
+def turbo_enabled() -> Optional[bool]:
+    """Whether frequency boost is on, None when unknown."""
+    no_turbo = _read(CPU_DIR / "intel_pstate" / "no_turbo")
+    if no_turbo is not None:
+        return no_turbo == "0"
+    boost = _read(CPU_DIR / "cpufreq" / "boost")
+    return None if boost is None else boost == "1"
+
+
+@contextmanager
+def gc_paused():
+    """Collect, then disable the GC for the duration of the block."""
+    enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def calls_per_sample(function: Callable, input_bytes: bytes) -> int:
+    """Calls of `function` lasting about TARGET_SAMPLE_NS."""
+    start = time.perf_counter_ns()
+    function(input_bytes)
+    elapsed = time.perf_counter_ns() - start
+    return max(1, TARGET_SAMPLE_NS // max(elapsed, 1))
+
+
+def interleaved(
+    functions: Mapping[str, Callable],
+    input_bytes: bytes,
+    rounds: int,
+    max_seconds: float,
+) -> Dict[str, List[float]]:
+    """
+    Samples of the nanoseconds per call of each function, one per round, the
+    functions running in a rotating order.
+    """
+    names = list(functions)
+    calls = {name: calls_per_sample(functions[name], input_bytes) for name in names}
+    samples: Dict[str, List[float]] = {name: [] for name in names}
+    deadline = time.monotonic() + max_seconds
+    with gc_paused():
+        for round_index in range(rounds):
+            if round_index >= MIN_ROUNDS and time.monotonic() > deadline:
+                break
+            shift = round_index % len(names)
+            for name in names[shift:] + names[:shift]:
+                function = functions[name]
+                count = calls[name]
+                start = time.perf_counter_ns()
+                for _ in range(count):
+                    function(input_bytes)
+                samples[name].append((time.perf_counter_ns() - start) / count)
+    return samples
+
+
+def bootstrap_median_interval(
+    values: Sequence[float], rng: Random, confidence: float = 0.95
+) -> Tuple[float, float]:
+    """Bootstrap confidence interval of the median of `values`."""
+    medians = sorted(
+        statistics.median(rng.choices(values, k=len(values)))
+        for _ in range(BOOTSTRAP_RESAMPLES)
+    )
+    tail = (1 - confidence) / 2
+    low = medians[int(tail * BOOTSTRAP_RESAMPLES)]
+    high = medians[
+        min(math.ceil((1 - tail) * BOOTSTRAP_RESAMPLES), BOOTSTRAP_RESAMPLES - 1)
+    ]
+    return low, high
+
+
+class Result(NamedTuple):
+    """Latency of one implementation, relative to the baseline one."""
+
+    name: str
+    median_ns: float
+    # Half width of the 95% interval of the median, relative to it
+    noise: float
+    ratio: float
+    ratio_low: float
+    ratio_high: float
+
+
+def summarize(samples: Mapping[str, List[float]], seed: int = 0) -> List[Result]:
+    """Median, noise and paired ratio to the first implementation of each."""
+    rng = Random(seed)
+    baseline = next(iter(samples.values()))
+    results = []
+    for name, values in samples.items():
+        median = statistics.median(values)
+        low, high = bootstrap_median_interval(values, rng)
+        # Samples of the same round ran a few milliseconds apart
+        ratios = [value / base for value, base in zip(values, baseline, strict=True)]
+        ratio_low, ratio_high = bootstrap_median_interval(ratios, rng)
+        results.append(
+            Result(
+                name,
+                median,
+                (high - low) / 2 / median,
+                statistics.median(ratios),
+                ratio_low,
+                ratio_high,
+            )
+        )
+    return results
+
+
+def format_results(op: str, results: Sequence[Result], rounds: int) -> List[str]:
+    """Report of an op, a `*` marking the ratios whose interval excludes 1."""
+    lines = [
+        f"{op} ({rounds} interleaved rounds)",
+        f"  {'implementation':<16}{'us/call':>12}{'noise':>8}"
+        f"{'vs ' + results[0].name:>16}{'95% CI':>20}",
+    ]
+    for result in results:
+        interval = f"[{result.ratio_low:.3f}, {result.ratio_high:.3f}]"
+        significant = not result.ratio_low <= 1 <= result.ratio_high
+        lines.append(
+            f"  {result.name:<16}{result.median_ns / 1e3:>12.2f}"
+            f"{result.noise:>8.1%}{result.ratio:>16.3f}{interval:>20}"
+            f"{' *' if significant else ''}"
+        )
+    return lines
+
+
+def format_cpu_state(label: str, state: Mapping[int, Mapping[str, Optional[str]]]):
+    cores = ", ".join(
+        f"cpu{core} {values['governor'] or 'unknown governor'}"
+        f" {values['mhz'] or '?'} MHz"
+        for core, values in state.items()
+    )
+    return f"{label}: {cores}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Low-noise interleaved benchmark")
+    parser.add_argument("--cores", help="CPU list to pin to (default: isolated)")
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--max-seconds", type=float, default=30, help="per op")
+    parser.add_argument("--pairs", type=int, default=2)
+    parser.add_argument("--implementations", help="first one is the baseline")
+    parser.add_argument("--ops", default=",".join(OPS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Pinned before loading the libraries, whose runtime threads inherit it
+    cores = parse_cpu_list(args.cores) if args.cores else isolated_cores()
+    if cores:
+        pin_process(cores)
+        print(f"pinned to CPUs {','.join(map(str, cores))}")
+    else:
+        cores = sorted(os.sched_getaffinity(0))
+        print("not pinned: no isolated CPUs (isolcpus=), pass --cores to pin")
+
+    from tests.LibCallerWrapper import IMPLEMENTATIONS
+
+    names = (args.implementations or ",".join(IMPLEMENTATIONS)).split(",")
+    inputs = benchmark_inputs(args.pairs)
+
+    before = cpu_state(cores)
+    print(format_cpu_state("before", before))
+    governors = {values["governor"] for values in before.values()}
+    if governors != {"performance"}:
+        print("warning: governor is not `performance`, the frequency may scale")
+    if turbo_enabled():
+        print("warning: turbo boost is enabled, the frequency depends on the load")
+    print("Python GC disabled while timing")
+
+    for op in args.ops.split(","):
+        functions = {name: getattr(IMPLEMENTATIONS[name], op) for name in names}
+        # Warm-up calls, also checking that the input is accepted
+        for function in functions.values():
+            function(inputs[op])
+        samples = interleaved(functions, inputs[op], args.rounds, args.max_seconds)
+        rounds = len(next(iter(samples.values())))
+        for line in format_results(op, summarize(samples, args.seed), rounds):
+            print(line)
+
+    print(format_cpu_state("after", cpu_state(cores)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-call latency of every precompile for each build profile of `make profiles`
+(debug, release, lto, pgo), side by side for each native implementation.
+
+All the Rust builds are loaded in this process. A process cannot host two Go
+runtimes, so each Go build runs in its own worker process (see
+tests/versions.py). Latencies are the fastest of --iterations calls of the
+inputs of bench_backends.
+
+Usage:
+    uv run python -m benchmarks.bench_profiles [--iterations N] [--pairs K]
+        [--profiles debug,release,lto,pgo] [--backend ctypes]
+"""
+
+import argparse
+from pathlib import Path
+
+from benchmarks.bench_backends import benchmark_inputs
+from tests.layouts import (
+    BUILD_PROFILES,
+    OPS,
+    PRECOMPILE_FUNCTIONS,
+    RUST_BACKEND_LIBS,
+    rust_implementation_name,
+)
+from tests.versions import VersionedLibrary, is_go_library
+
+BUILD_DIR = Path(__file__).parent.parent / "build"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompile latency per build profile")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--pairs", type=int, default=8)
+    parser.add_argument("--profiles", default=",".join(BUILD_PROFILES))
+    parser.add_argument("--backend", default="ctypes", help="FFI backend")
+    args = parser.parse_args()
+
+    profiles = [
+        profile
+        for profile in args.profiles.split(",")
+        if (BUILD_DIR / profile).is_dir()
+    ]
+    if not profiles:
+        raise SystemExit("No build profile found, run `make profiles`")
+    libraries = {
+        **{
+            rust_implementation_name(backend): lib_name
+            for backend, lib_name in RUST_BACKEND_LIBS.items()
+        },
+        "go": "libgo_ethereum_wrapper.so",
+    }
+    inputs = benchmark_inputs(args.pairs)
+
+    print(
+        f"{'op (us/call)':<16}{'implementation':<16}"
+        + "".join(f"{profile:>10}" for profile in profiles)
+        + f"{'speedup':>10}"
+    )
+    for name, lib_name in libraries.items():
+        builds = {}
+        for profile in profiles:
+            path = str(BUILD_DIR / profile / lib_name)
+            builds[profile] = VersionedLibrary(
+                path, args.backend, PRECOMPILE_FUNCTIONS, is_go_library(path)
+            )
+        try:
+            for op in OPS:
+                latencies = []
+                for profile, build in builds.items():
+                    [(outcome, ns)] = build.measure(op, [inputs[op]], args.iterations)
+                    if not outcome[0]:
+                        raise RuntimeError(f"{name} {op} ({profile}): {outcome[1]}")
+                    latencies.append(ns / 1e3)
+                # Of the fastest profile over the first one (debug by default)
+                speedup = latencies[0] / min(latencies)
+                print(
+                    f"{op:<16}{name:<16}"
+                    + "".join(f"{latency:>10.1f}" for latency in latencies)
+                    + f"{speedup:>9.1f}x"
+                )
+        finally:
+            for build in builds.values():
+                build.close()
+
+
+if __name__ == "__main__":
+    main()
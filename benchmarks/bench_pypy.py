@@ -0,0 +1,69 @@
+"""
+Per-call latency of every EELS precompile on CPython and PyPy.
+
+EELS runs in this process (cpython), in an EELSRemote worker of this
+interpreter (cpython-worker, the pipe overhead of FUZZ_EELS_MODE=pypy) and in
+an EELSRemote worker of PyPy. Each worker call is first repeated --warmup
+times so that the PyPy JIT has compiled the precompile.
+
+Usage:
+    uv run python -m benchmarks.bench_pypy [--iterations N] [--pairs K]
+        [--warmup N] [--pypy /path/to/.venv-pypy/bin/python]
+"""
+
+import argparse
+import sys
+
+from benchmarks.bench_backends import benchmark_inputs, time_per_call
+from tests import settings
+from tests.layouts import OPS
+from wrappers.python.eels_remote import EELSRemote
+from wrappers.python.eels_wrapper import EELSWrapper
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EELS latency on CPython and PyPy")
+    parser.add_argument("--iterations", type=int, default=2)
+    parser.add_argument("--pairs", type=int, default=2)
+    parser.add_argument("--warmup", type=int, default=10, help="calls per op")
+    parser.add_argument("--pypy", default=settings.PYPY, help="PyPy command")
+    args = parser.parse_args()
+
+    inputs = benchmark_inputs(args.pairs)
+    workers = {
+        "cpython-worker": EELSRemote([sys.executable], workers=1),
+        "pypy": EELSRemote(args.pypy.split(), workers=1),
+    }
+    try:
+        names = ["cpython", *workers]
+        print(
+            f"{'op (ms/call)':<16}"
+            + "".join(f"{name:>16}" for name in names)
+            + f"{'speedup':>10}"
+        )
+        for op in OPS:
+            functions = {
+                "cpython": getattr(EELSWrapper, op),
+                **{name: getattr(worker, op) for name, worker in workers.items()},
+            }
+            latencies = []
+            for name, function in functions.items():
+                for _ in range(args.warmup if name in workers else 1):
+                    function(inputs[op])
+                latencies.append(
+                    time_per_call(function, inputs[op], args.iterations) / 1e3
+                )
+            # Of PyPy over the CPython process
+            speedup = latencies[0] / latencies[-1]
+            print(
+                f"{op:<16}"
+                + "".join(f"{latency:>16.2f}" for latency in latencies)
+                + f"{speedup:>9.1f}x"
+            )
+    finally:
+        for worker in workers.values():
+            worker.close()
+
+
+if __name__ == "__main__":
+    main()
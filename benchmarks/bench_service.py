@@ -0,0 +1,104 @@
+"""
+Throughput of the differential check service (tests/service.py).
+
+Starts the service on a temporary Unix socket and sends it the same valid
+input of one op from client threads, one request at a time (sequential, every
+request its own batch) and pipelined through check_many() by 1 to --clients
+connections, whose concurrent requests the service coalesces. The mean batch
+size comes from the service counters.
+
+Usage:
+    uv run python -m benchmarks.bench_service [--op g1_add] [--requests 2048]
+        [--clients 16] [--pairs 2] [--eels-workers 0]
+"""
+
+import argparse
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.bench_backends import benchmark_inputs
+from tests.service_client import DiffCheckClient
+
+
+def run_clients(socket_path: str, clients: int, requests, pipelined: bool) -> float:
+    """Send `requests` from each of `clients` connections, in seconds."""
+    connections = [DiffCheckClient(socket_path) for _ in range(clients)]
+
+    def send(client: DiffCheckClient):
+        if pipelined:
+            client.check_many(requests)
+        else:
+            for op, input_bytes in requests:
+                client.check(op, input_bytes)
+
+    threads = [threading.Thread(target=send, args=(client,)) for client in connections]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    for client in connections:
+        client.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential check service load")
+    parser.add_argument("--op", default="g1_add")
+    parser.add_argument("--requests", type=int, default=2048, help="per client")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--pairs", type=int, default=2)
+    parser.add_argument("--eels-workers", type=int, default=0)
+    args = parser.parse_args()
+
+    requests = [(args.op, benchmark_inputs(args.pairs)[args.op])] * args.requests
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = str(Path(directory) / "diffcheck.sock")
+        service = subprocess.Popen(
+            [sys.executable, "-m", "tests.service", "--socket", socket_path]
+            + ["--eels-workers", str(args.eels_workers)],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            # Printed once listening
+            service.stdout.readline()
+            with DiffCheckClient(socket_path) as client:
+                # Warm up the EELS workers
+                client.check_many(requests[:64])
+                runs = [("sequential", 1, False)]
+                clients = 1
+                while clients <= args.clients:
+                    runs.append(("pipelined", clients, True))
+                    clients *= 4
+                print(
+                    f"{'mode':<12}{'clients':>8}{'requests':>10}{'req/s':>10}"
+                    f"{'mean batch':>12}"
+                )
+                for mode, clients, pipelined in runs:
+                    # Fewer one-at-a-time requests: each waits for a whole batch
+                    sent = requests if pipelined else requests[: len(requests) // 8]
+                    before = client.stats()
+                    elapsed = run_clients(socket_path, clients, sent, pipelined)
+                    after = client.stats()
+                    batches = after.get("batches", 0) - before.get("batches", 0)
+                    inputs = after.get("inputs", 0) - before.get("inputs", 0)
+                    total = clients * len(sent)
+                    print(
+                        f"{mode:<12}{clients:>8}{total:>10}{total / elapsed:>10.0f}"
+                        f"{inputs / max(batches, 1):>12.1f}"
+                    )
+        finally:
+            # Stopped like with Ctrl-C, which closes the EELS pool
+            service.send_signal(signal.SIGINT)
+            service.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,133 @@
-import ctypes
+import hashlib
+import os
+import shutil
+import sys
+import time
 from pathlib import Path
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
-# Import the Python wrapper
+# Import the Python wrappers
+from wrappers.python.eels_evm import EELSEvmWrapper
+from wrappers.python.eels_pool import EELSPool
+from wrappers.python.eels_remote import EELSRemote
 from wrappers.python.eels_wrapper import EELSWrapper
 
-# Constants for output sizes
-G1_MAX_OUTPUT_SIZE = 256  # For G1 operations
-G2_MAX_OUTPUT_SIZE = 512  # For G2 operations
-PAIRING_MAX_OUTPUT_SIZE = 32  # For pairing operations
+from . import eels_profiler, metrics, settings, timing
+from .ffi_backends import ProcessBackend, create_backend, select_fastest_backend
+from .layouts import (
+    BUILD_PROFILES,
+    G1_MAX_OUTPUT_SIZE,
+    OPS,
+    PRECOMPILE_FUNCTIONS,
+    RUST_BACKEND_LIBS,
+    rust_implementation_name,
+)
+from .native_coverage import EdgeCoverage
+from .versions import is_go_library
+
+# Seconds a changed library must stay unchanged before it is reloaded, so that
+# a build still being written is not loaded
+RELOAD_SETTLE_SECONDS = 0.5
+
+# Snapshots of the loaded builds of the libraries, with FUZZ_HOT_RELOAD
+HOT_RELOAD_DIR = Path(__file__).parent.parent / "build" / "hot-reload"
+
+
+def library_version(lib_path: str) -> Tuple[int, int]:
+    """Modification time (in nanoseconds) and size of a library file."""
+    stat = os.stat(lib_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def snapshot_library(lib_path: str) -> Tuple[str, str]:
+    """
+    Copy a library to HOT_RELOAD_DIR, named after its content hash.
+
+    The build rewrites the library in place, and dlopen() returns the library
+    already loaded from a path: each build is loaded from its own copy.
+
+    Returns:
+        Path of the copy and SHA-256 hex digest of its content
+    """
+    source = Path(lib_path)
+    HOT_RELOAD_DIR.mkdir(parents=True, exist_ok=True)
+    # Hash the copy rather than the source, which the build may be rewriting
+    temporary = HOT_RELOAD_DIR / f".{source.name}.{os.getpid()}"
+    shutil.copyfile(source, temporary)
+    digest = hashlib.sha256(temporary.read_bytes()).hexdigest()
+    path = HOT_RELOAD_DIR / f"{source.stem}-{digest[:16]}{source.suffix}"
+    os.replace(temporary, path)
+    return str(path), digest
+
+
+def remove_snapshot(path: str):
+    """
+    Remove a snapshot of HOT_RELOAD_DIR once its build is replaced.
+
+    Loaded copies stay mapped after their file is removed. Snapshots are
+    shared by content hash, so another process may have removed it already.
+    """
+    if Path(path).parent != HOT_RELOAD_DIR:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
 
 
 class LibCallerWrapper:
     """
     Enhanced wrapper class for calling functions in shared libraries.
-    Provides functionality for loading libraries and calling multiple C functions.
+    Provides functionality for loading libraries and calling multiple C functions
+    through an interchangeable FFI backend (see ffi_backends.py).
     """
 
-    def __init__(self, lib_path: str):
+    def __init__(
+        self, lib_path: str, backend: Optional[str] = None, name: Optional[str] = None
+    ):
         """
         Initialize the wrapper with a library path.
 
         Args:
             lib_path: Path to the shared library
+            backend: Name of the FFI backend (defaults to the FUZZ_FFI_BACKEND setting)
+            name: Implementation name in the metrics (defaults to the library name)
         """
-        self.lib = ctypes.CDLL(lib_path)
+        self.backend_name = backend or get_backend_name()
         self.lib_path = lib_path
+        self.name = name or Path(lib_path).stem
+        # With FUZZ_HOT_RELOAD, every build is loaded from its own snapshot
+        self.loaded_path = lib_path
+        self.digest: Optional[str] = None
+        self.reloads = 0
+        if settings.HOT_RELOAD:
+            self._version = library_version(lib_path)
+            self.loaded_path, self.digest = snapshot_library(lib_path)
+        self.backend = create_backend(self.backend_name, self.loaded_path)
+        self.coverage = (
+            EdgeCoverage(self.loaded_path) if settings.NATIVE_COVERAGE else None
+        )
         self._function_cache: Dict[str, Callable] = {}
+        # (C function name, maximum output size, method name) of each function
+        self._registered: List[Tuple[str, int, str]] = []
+
+    def _bind(
+        self,
+        backend,
+        coverage: Optional[EdgeCoverage],
+        function_name: str,
+        max_output_size: int,
+        method_name: str,
+    ) -> Callable:
+        """Bind a C function through `backend`, with the enabled instrumentation."""
+        call_function = backend.bind(function_name, max_output_size)
+        if coverage is not None:
+            call_function = coverage.track(method_name, call_function)
+        if settings.METRICS_DIR:
+            call_function = metrics.instrument(self.name, method_name, call_function)
+        if settings.TIMING:
+            call_function = timing.time_calls(self.name, call_function)
+        return call_function
 
     def register_function(
         self,
@@ -45,38 +146,11 @@ class LibCallerWrapper:
         if method_name is None:
             method_name = function_name.replace("_wrapper", "")
 
-        # Get the function from the library
-        function = getattr(self.lib, function_name)
-
-        # Define common function signature
-        function.argtypes = [
-            ctypes.POINTER(ctypes.c_uint8),  # input
-            ctypes.c_size_t,  # input_len
-            ctypes.POINTER(ctypes.c_uint8),  # output
-            ctypes.c_size_t,  # output_capacity
-            ctypes.POINTER(ctypes.c_size_t),  # output_len
-        ]
-        function.restype = ctypes.c_int
-
-        # Create a closure to capture the function and max_output_size
-        def call_function(input_bytes: bytes) -> bytes:
-            input_len = len(input_bytes)
-            input_array = (ctypes.c_uint8 * input_len)(*input_bytes)
-            output_buffer = (ctypes.c_uint8 * max_output_size)()
-            output_len = ctypes.c_size_t()
-
-            result = function(
-                input_array,
-                input_len,
-                output_buffer,
-                max_output_size,
-                ctypes.byref(output_len),
-            )
-
-            if result != 0:
-                raise RuntimeError(f"{function_name} failed with error code: {result}")
-
-            return bytes(output_buffer[: output_len.value])
+        # Bind the C function through the backend
+        call_function = self._bind(
+            self.backend, self.coverage, function_name, max_output_size, method_name
+        )
+        self._registered.append((function_name, max_output_size, method_name))
 
         # Store the function in the cache
         self._function_cache[method_name] = call_function
@@ -84,6 +158,77 @@ class LibCallerWrapper:
         # Add the method to the instance
         setattr(self, method_name, call_function)
 
+    def check_reload(self) -> bool:
+        """
+        Load a new build of the library if its file changed (FUZZ_HOT_RELOAD).
+
+        The file is reloaded once it was last modified RELOAD_SETTLE_SECONDS
+        ago, if its content hash differs from the loaded build. All the
+        registered functions are bound on the new build first, then swapped
+        together, so a call never mixes two builds; when the new build fails
+        to load, the loaded one is kept. Old builds stay mapped: their
+        functions may still be referenced, and dlclose() would not unload a Go
+        runtime anyway. Their snapshots are removed (the mappings stay valid),
+        as are the ones of builds that failed to load. A process cannot start a second Go runtime, so the builds of a
+        Go wrapper after the first one run in a worker process (a
+        ProcessBackend, without native coverage).
+
+        Returns:
+            Whether a new build was loaded
+        """
+        if not settings.HOT_RELOAD:
+            return False
+        try:
+            version = library_version(self.lib_path)
+        except FileNotFoundError:
+            # Removed while being rebuilt
+            return False
+        # Unchanged, or maybe still being written
+        settling = time.time() - version[0] / 1e9 < RELOAD_SETTLE_SECONDS
+        if version == self._version or settling:
+            return False
+        self._version = version
+        path = None
+        try:
+            path, digest = snapshot_library(self.lib_path)
+            if digest == self.digest:
+                return False
+            if is_go_library(self.loaded_path):
+                backend = ProcessBackend(path, self.backend_name)
+                coverage = None
+            else:
+                backend = create_backend(self.backend_name, path)
+                coverage = EdgeCoverage(path) if settings.NATIVE_COVERAGE else None
+            functions = {
+                method_name: self._bind(
+                    backend, coverage, function_name, max_output_size, method_name
+                )
+                for function_name, max_output_size, method_name in self._registered
+            }
+        except (OSError, AttributeError, RuntimeError) as e:
+            print(
+                f"{self.name}: keeping the loaded build, {self.lib_path} failed"
+                f" to load: {e}",
+                file=sys.stderr,
+            )
+            if path is not None:
+                remove_snapshot(path)
+            return False
+
+        previous, previous_path = self.backend, self.loaded_path
+        self.backend, self.coverage = backend, coverage
+        self.loaded_path, self.digest = path, digest
+        self._function_cache = functions
+        for method_name, call_function in functions.items():
+            setattr(self, method_name, call_function)
+        # A replaced worker process is stopped, libraries loaded here stay mapped
+        if isinstance(previous, ProcessBackend):
+            previous.close()
+        remove_snapshot(previous_path)
+        self.reloads += 1
+        print(f"{self.name}: reloaded {self.lib_path} ({digest[:16]})", file=sys.stderr)
+        return True
+
     def __getattr__(self, name):
         """
         Handle attribute access for methods that haven't been registered yet.
@@ -104,32 +249,130 @@ class LibCallerWrapper:
         )
 
 
+_selected_backend: Optional[str] = None
+
+
+def get_backend_name() -> str:
+    """
+    Resolve the FFI backend setting.
+    With "auto", the available backends are benchmarked once on a cheap call
+    (G1 addition of two points at infinity) and the fastest one is kept.
+    """
+    global _selected_backend
+    if settings.FFI_BACKEND != "auto":
+        return settings.FFI_BACKEND
+    if _selected_backend is None:
+        probe = ("g1_add_wrapper", G1_MAX_OUTPUT_SIZE, bytes(256))
+        _selected_backend = select_fastest_backend(
+            get_lib_path("librevm_wrapper.so"), probe
+        )
+    return _selected_backend
+
+
 def get_lib_path(lib_name: str) -> str:
     """
     Helper function to get the path to a shared library.
+    The instrumented builds of `make coverage` are used with FUZZ_NATIVE_COVERAGE,
+    those of `make evm` with FUZZ_EXECUTION_MODE=evm and those of `make profiles`
+    with FUZZ_BUILD_PROFILE.
     """
     build_dir = Path(__file__).parent.parent / "build"
+    if settings.BUILD_PROFILE and settings.BUILD_PROFILE not in BUILD_PROFILES:
+        raise ValueError(f"Unknown build profile: {settings.BUILD_PROFILE}")
+    variants = [
+        variant
+        for variant, enabled in (
+            ("coverage", settings.NATIVE_COVERAGE),
+            ("evm", settings.EXECUTION_MODE == "evm"),
+            (settings.BUILD_PROFILE, bool(settings.BUILD_PROFILE)),
+        )
+        if enabled
+    ]
+    if len(variants) > 1:
+        raise ValueError(f"The {' and '.join(variants)} builds cannot be combined")
+    if variants:
+        build_dir = build_dir / variants[0]
     return str(build_dir / lib_name)
 
 
-# Create the shared wrapper instances (but don't register functions yet)
-_rust_wrapper = LibCallerWrapper(get_lib_path("librevm_wrapper.so"))
-_go_wrapper = LibCallerWrapper(get_lib_path("libgo_ethereum_wrapper.so"))
-
-# Register all the functions for the Rust wrapper
-_rust_wrapper.register_function("g1_add_wrapper", G1_MAX_OUTPUT_SIZE)
-_rust_wrapper.register_function("g2_add_wrapper", G2_MAX_OUTPUT_SIZE)
-_rust_wrapper.register_function("g1_msm_wrapper", G1_MAX_OUTPUT_SIZE)
-_rust_wrapper.register_function("g2_msm_wrapper", G2_MAX_OUTPUT_SIZE)
-_rust_wrapper.register_function("map_fp_to_g1_wrapper", G1_MAX_OUTPUT_SIZE)
-_rust_wrapper.register_function("map_fp2_to_g2_wrapper", G2_MAX_OUTPUT_SIZE)
-_rust_wrapper.register_function("pairing_wrapper", PAIRING_MAX_OUTPUT_SIZE)
-
-# Register all the functions for the Go wrapper
-_go_wrapper.register_function("g1_add_wrapper", G1_MAX_OUTPUT_SIZE)
-_go_wrapper.register_function("g2_add_wrapper", G2_MAX_OUTPUT_SIZE)
-_go_wrapper.register_function("g1_msm_wrapper", G1_MAX_OUTPUT_SIZE)
-_go_wrapper.register_function("g2_msm_wrapper", G2_MAX_OUTPUT_SIZE)
-_go_wrapper.register_function("map_fp_to_g1_wrapper", G1_MAX_OUTPUT_SIZE)
-_go_wrapper.register_function("map_fp2_to_g2_wrapper", G2_MAX_OUTPUT_SIZE)
-_go_wrapper.register_function("pairing_wrapper", PAIRING_MAX_OUTPUT_SIZE)
+# Rust backends with an EVM build (revm executes its blst precompiles)
+EVM_RUST_BACKENDS = ("blst",)
+
+
+def create_native_wrapper(lib_name: str, name: str) -> LibCallerWrapper:
+    """
+    Load a native wrapper library and register all the precompile functions,
+    their `*_evm_wrapper` variants with FUZZ_EXECUTION_MODE=evm.
+    """
+    wrapper = LibCallerWrapper(get_lib_path(lib_name), name=name)
+    for function_name, max_output_size in PRECOMPILE_FUNCTIONS:
+        method_name = function_name.replace("_wrapper", "")
+        if settings.EXECUTION_MODE == "evm":
+            function_name = function_name.replace("_wrapper", "_evm_wrapper")
+        wrapper.register_function(function_name, max_output_size, method_name)
+    return wrapper
+
+
+def create_rust_wrappers() -> Dict[str, LibCallerWrapper]:
+    """Rust wrappers of the backends of the FUZZ_RUST_BACKENDS setting, by backend."""
+    wrappers = {}
+    for backend in settings.RUST_BACKENDS.split(","):
+        if backend not in RUST_BACKEND_LIBS:
+            raise ValueError(f"Unknown Rust backend: {backend}")
+        if settings.EXECUTION_MODE == "evm" and backend not in EVM_RUST_BACKENDS:
+            raise ValueError(f"The {backend} Rust backend has no EVM mode")
+        wrappers[backend] = create_native_wrapper(
+            RUST_BACKEND_LIBS[backend], rust_implementation_name(backend)
+        )
+    return wrappers
+
+
+# Create the shared wrapper instances
+_rust_wrappers = create_rust_wrappers()
+_rust_wrapper = next(iter(_rust_wrappers.values()))
+_go_wrapper = create_native_wrapper("libgo_ethereum_wrapper.so", "go")
+
+
+def create_eels_oracle():
+    """
+    Create the EELS oracle selected by the FUZZ_EELS_MODE setting: EELSWrapper
+    itself, an EELSPool of FUZZ_EELS_WORKERS processes, or an EELSRemote of
+    FUZZ_EELS_WORKERS processes of the FUZZ_PYPY interpreter. With
+    FUZZ_EXECUTION_MODE=evm, EELSEvmWrapper runs in process.
+    """
+    if settings.EXECUTION_MODE == "evm":
+        if settings.EELS_MODE != "inprocess":
+            raise ValueError("The EVM mode runs EELS in process")
+        return EELSEvmWrapper
+    if settings.EELS_MODE == "inprocess":
+        return EELSWrapper
+    if settings.EELS_MODE == "pool":
+        return EELSPool(settings.EELS_WORKERS or None)
+    if settings.EELS_MODE == "pypy":
+        return EELSRemote(settings.PYPY.split(), settings.EELS_WORKERS or None)
+    raise ValueError(f"Unknown EELS mode: {settings.EELS_MODE}")
+
+
+_eels_oracle = create_eels_oracle()
+
+# The profiler samples the main thread: in pool mode EELS runs in the workers
+if settings.EELS_PROFILE_DIR and settings.EELS_MODE == "inprocess":
+    _eels_oracle = eels_profiler.ProfiledImplementation(
+        eels_profiler.get_profiler(), _eels_oracle, OPS
+    )
+
+if settings.METRICS_DIR:
+    _eels_oracle = metrics.InstrumentedImplementation("python", _eels_oracle, OPS)
+    metrics.start_exporter()
+if settings.TIMING:
+    _eels_oracle = timing.TimedImplementation("python", _eels_oracle, OPS)
+
+# All implementations under test, by name (same names as the pytest fixtures)
+IMPLEMENTATIONS = {
+    **{
+        rust_implementation_name(backend): wrapper
+        for backend, wrapper in _rust_wrappers.items()
+    },
+    "go": _go_wrapper,
+    "python": _eels_oracle,
+}
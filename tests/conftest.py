@@ -1,21 +1,163 @@
+from collections import Counter
+from pathlib import Path
+from time import perf_counter_ns
+
 import pytest
+from hypothesis import Phase
+from hypothesis import settings as hypothesis_settings
 
-from .LibCallerWrapper import EELSWrapper, _go_wrapper, _rust_wrapper
+from . import dedup, eels_profiler, metrics, settings, timing
+from .differential import reload_changed
+from .layouts import TEST_MODULE_OPS
+from .LibCallerWrapper import (
+    IMPLEMENTATIONS,
+    _eels_oracle,
+    _go_wrapper,
+    _rust_wrappers,
+    rust_implementation_name,
+)
+from .tiered import LastOutcome, TieredOracle, format_stats
 
+# Native wrappers of the tests: in tiered mode, shared with the oracle, which
+# reuses the outcomes of the calls of the test
+if settings.ORACLE_MODE == "tiered":
+    _test_rust_wrappers = {
+        backend: LastOutcome(wrapper) for backend, wrapper in _rust_wrappers.items()
+    }
+    _test_go_wrapper = LastOutcome(_go_wrapper)
+else:
+    _test_rust_wrappers = _rust_wrappers
+    _test_go_wrapper = _go_wrapper
 
-@pytest.fixture(scope="module")
-def rust_wrapper():
-    """Fixture that returns the shared Rust wrapper instance."""
-    return _rust_wrapper
+
+def create_python_wrapper():
+    """
+    Wrap the EELS oracle according to the FUZZ_ORACLE_MODE setting: as is
+    ("full"), or behind a TieredOracle over the native wrappers ("tiered").
+    """
+    if settings.ORACLE_MODE == "full":
+        return _eels_oracle
+    if settings.ORACLE_MODE == "tiered":
+        return TieredOracle(
+            {
+                **{
+                    rust_implementation_name(backend): wrapper
+                    for backend, wrapper in _test_rust_wrappers.items()
+                },
+                "go": _test_go_wrapper,
+            },
+            _eels_oracle,
+            sample_rate=settings.EELS_SAMPLE_RATE,
+        )
+    raise ValueError(f"Unknown oracle mode: {settings.ORACLE_MODE}")
+
+
+_python_wrapper = create_python_wrapper()
+
+if not settings.HYPOTHESIS_SHRINK:
+    hypothesis_settings.register_profile(
+        "no-shrink",
+        phases=[Phase.explicit, Phase.reuse, Phase.generate, Phase.target],
+    )
+    hypothesis_settings.load_profile("no-shrink")
+
+# Tiered oracle counters reported by the pytest-xdist workers
+_worker_stats = Counter()
+
+_deduplicator = dedup.create_deduplicator()
+# Dedup counters reported by the pytest-xdist workers
+_worker_dedup_stats = Counter()
+
+
+@pytest.fixture(scope="module", params=list(_rust_wrappers))
+def rust_wrapper(request):
+    """
+    Fixture that returns the shared Rust wrapper instance of each BLS12-381
+    backend (FUZZ_RUST_BACKENDS): every test runs once per backend.
+    """
+    return _test_rust_wrappers[request.param]
 
 
 @pytest.fixture(scope="module")
 def go_wrapper():
     """Fixture that returns the shared Go wrapper instance."""
-    return _go_wrapper
+    return _test_go_wrapper
 
 
 @pytest.fixture(scope="module")
 def python_wrapper():
-    """Fixture that returns the Python wrapper."""
-    return EELSWrapper
+    """Fixture that returns the Python wrapper (in-process or pooled EELS)."""
+    return _python_wrapper
+
+
+def pytest_collection_modifyitems(items):
+    if _deduplicator is None:
+        return
+    # An item per Rust backend shares each test function: wrap it once
+    tests = {}
+    for item in items:
+        op = TEST_MODULE_OPS.get(item.module.__name__.rsplit(".", 1)[-1])
+        if op is not None and hasattr(item.obj, "hypothesis"):
+            tests[item.obj] = op
+    for test, op in tests.items():
+        dedup.deduplicate_test(test, op, _deduplicator)
+
+
+def pytest_runtest_setup(item):
+    # New builds of the native wrappers are loaded between tests
+    if settings.HOT_RELOAD:
+        reload_changed(IMPLEMENTATIONS)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    if not settings.TIMING:
+        yield
+        return
+    timing.REPORT.current_test = item.nodeid
+    start = perf_counter_ns()
+    yield
+    timing.REPORT.add_test(item.nodeid, perf_counter_ns() - start)
+    timing.REPORT.current_test = None
+
+
+def pytest_sessionfinish(session):
+    if settings.METRICS_DIR:
+        metrics.REGISTRY.write(Path(settings.METRICS_DIR))
+    if settings.EELS_PROFILE_DIR:
+        eels_profiler.get_profiler().write(Path(settings.EELS_PROFILE_DIR))
+    # Hand the tiered oracle counters of an xdist worker to the controller
+    if isinstance(_python_wrapper, TieredOracle) and hasattr(
+        session.config, "workeroutput"
+    ):
+        session.config.workeroutput["tiered_stats"] = dict(_python_wrapper.stats)
+    if settings.TIMING and hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["timing"] = timing.REPORT.to_dict()
+    if _deduplicator is not None and hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["dedup_stats"] = dict(_deduplicator.stats)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    workeroutput = getattr(node, "workeroutput", {})
+    _worker_stats.update(workeroutput.get("tiered_stats", {}))
+    if "timing" in workeroutput:
+        timing.REPORT.merge(workeroutput["timing"])
+    _worker_dedup_stats.update(workeroutput.get("dedup_stats", {}))
+
+
+def pytest_terminal_summary(terminalreporter):
+    if isinstance(_python_wrapper, TieredOracle):
+        terminalreporter.section("tiered oracle")
+        for line in format_stats(_worker_stats + _python_wrapper.stats):
+            terminalreporter.write_line(line)
+    if settings.TIMING:
+        terminalreporter.section("generation vs execution time")
+        for line in timing.format_report(timing.REPORT):
+            terminalreporter.write_line(line)
+    if _deduplicator is not None:
+        terminalreporter.section("input deduplication")
+        for line in dedup.format_report(
+            _worker_dedup_stats + _deduplicator.stats, _deduplicator.memory()
+        ):
+            terminalreporter.write_line(line)
@@ -0,0 +1,380 @@
+"""
+Fast BLS12-381 G1/G2 arithmetic for input generation.
+
+py_ecc's `multiply` works in affine coordinates with a field inversion per step,
+which makes valid point generation the slowest part of the strategies. This module
+only serves the harness: it is not constant time and must not be used to check
+the implementations under test.
+
+- points are handled in Jacobian coordinates internally
+- variable-base scalar multiplication uses a width-5 NAF
+- generator multiples use a fixed-base comb table (8 teeth) built once per process
+- lists of points are normalized to affine with a single inversion (Montgomery's trick)
+
+Affine points are (x, y) tuples, with x and y ints for G1 and (c0, c1) int
+tuples for G2. The point at infinity is None.
+"""
+
+# BLS12-381 base field prime
+FIELD_MODULUS = 0x1A0111EA397FE69A4B1BA7B6434BACD764774B84F38512BF6730D2A0F6B0F6241EABFFFEB153FFFFB9FEFFFFFFFFAAAB
+# BLS12-381 subgroup order
+CURVE_ORDER = 0x73EDA753299D7D483339D80809A1D80553BDA402FFFE5BFEFFFFFFFF00000001
+
+G1_GENERATOR = (
+    0x17F1D3A73197D7942695638C4FA9AC0FC3688C4F9774B905A14E3A3F171BAC586C55E83FF97A1AEFFB3AF00ADB22C6BB,
+    0x08B3F481E3AAA0F1A09E30ED741D8AE4FCF5E095D5D00AF600DB18CB2C04B3EDD03CC744A2888AE40CAA232946C5E7E1,
+)
+G2_GENERATOR = (
+    (
+        0x024AA2B2F08F0A91260805272DC51051C6E47AD4FA403B02B4510B647AE3D1770BAC0326A805BBEFD48056C8C121BDB8,
+        0x13E02B6052719F607DACD3A088274F65596BD0D09920B61AB5DA61BBDC7F5049334CF11213945D57E5AC7D055D042B7E,
+    ),
+    (
+        0x0CE5D527727D6E118CC9CDC6DA2E351AADFD9BAA8CBDD3A76D429A695160D12C923AC9CC3BACA289E193548608B82801,
+        0x0606C4A02EA734CC32ACD2B02BC28B99CB3E287E85A763AF267492AB572E99AB3F370D275CEC1DA1AAA9075FF05F79BE,
+    ),
+)
+
+# Width of the NAF used for variable-base multiplication
+WNAF_WIDTH = 5
+# Number of teeth of the fixed-base comb (table of 2^COMB_TEETH - 1 points)
+COMB_TEETH = 8
+# Largest scalar size handled by the comb (EIP-2537 scalars are 32 bytes)
+COMB_SCALAR_BITS = 256
+
+P = FIELD_MODULUS
+
+
+class Fp:
+    """Arithmetic in Fp on ints."""
+
+    zero = 0
+    one = 1
+
+    @staticmethod
+    def add(a, b):
+        return (a + b) % P
+
+    @staticmethod
+    def sub(a, b):
+        return (a - b) % P
+
+    @staticmethod
+    def mul(a, b):
+        return a * b % P
+
+    @staticmethod
+    def sqr(a):
+        return a * a % P
+
+    @staticmethod
+    def scale(a, k):
+        return a * k % P
+
+    @staticmethod
+    def neg(a):
+        return -a % P
+
+    @staticmethod
+    def inv(a):
+        return pow(a, -1, P)
+
+
+class Fp2:
+    """Arithmetic in Fp2 = Fp[u] / (u^2 + 1) on (c0, c1) tuples."""
+
+    zero = (0, 0)
+    one = (1, 0)
+
+    @staticmethod
+    def add(a, b):
+        return ((a[0] + b[0]) % P, (a[1] + b[1]) % P)
+
+    @staticmethod
+    def sub(a, b):
+        return ((a[0] - b[0]) % P, (a[1] - b[1]) % P)
+
+    @staticmethod
+    def mul(a, b):
+        a0, a1 = a
+        b0, b1 = b
+        t0 = a0 * b0
+        t1 = a1 * b1
+        return ((t0 - t1) % P, ((a0 + a1) * (b0 + b1) - t0 - t1) % P)
+
+    @staticmethod
+    def sqr(a):
+        a0, a1 = a
+        return ((a0 + a1) * (a0 - a1) % P, 2 * a0 * a1 % P)
+
+    @staticmethod
+    def scale(a, k):
+        return (a[0] * k % P, a[1] * k % P)
+
+    @staticmethod
+    def neg(a):
+        return (-a[0] % P, -a[1] % P)
+
+    @staticmethod
+    def inv(a):
+        a0, a1 = a
+        norm_inv = pow(a0 * a0 + a1 * a1, -1, P)
+        return (a0 * norm_inv % P, -a1 * norm_inv % P)
+
+
+class JacobianCurve:
+    """
+    Short Weierstrass curve y^2 = x^3 + b (a = 0) over `field`,
+    with Jacobian coordinates (X, Y, Z) representing (X / Z^2, Y / Z^3).
+    """
+
+    def __init__(self, field, b, generator):
+        self.field = field
+        self.b = b
+        self.generator = generator
+        self.infinity = (field.one, field.one, field.zero)
+        self._comb_table = None
+
+    def is_on_curve(self, point):
+        """Check that an affine point satisfies the curve equation."""
+        if point is None:
+            return True
+        f = self.field
+        x, y = point
+        return f.sqr(y) == f.add(f.mul(f.sqr(x), x), self.b)
+
+    def negate(self, point):
+        """Negate an affine point."""
+        if point is None:
+            return None
+        return (point[0], self.field.neg(point[1]))
+
+    def to_jacobian(self, point):
+        if point is None:
+            return self.infinity
+        return (point[0], point[1], self.field.one)
+
+    def double(self, p1):
+        """Jacobian doubling (dbl-2009-l)."""
+        f = self.field
+        x1, y1, z1 = p1
+        if z1 == f.zero:
+            return p1
+        a = f.sqr(x1)
+        b = f.sqr(y1)
+        c = f.sqr(b)
+        d = f.scale(f.sub(f.sub(f.sqr(f.add(x1, b)), a), c), 2)
+        e = f.scale(a, 3)
+        x3 = f.sub(f.sqr(e), f.scale(d, 2))
+        y3 = f.sub(f.mul(e, f.sub(d, x3)), f.scale(c, 8))
+        z3 = f.scale(f.mul(y1, z1), 2)
+        return (x3, y3, z3)
+
+    def add(self, p1, p2):
+        """Jacobian addition (add-2007-bl)."""
+        f = self.field
+        x1, y1, z1 = p1
+        x2, y2, z2 = p2
+        if z1 == f.zero:
+            return p2
+        if z2 == f.zero:
+            return p1
+        z1z1 = f.sqr(z1)
+        z2z2 = f.sqr(z2)
+        u1 = f.mul(x1, z2z2)
+        u2 = f.mul(x2, z1z1)
+        s1 = f.mul(f.mul(y1, z2), z2z2)
+        s2 = f.mul(f.mul(y2, z1), z1z1)
+        h = f.sub(u2, u1)
+        r = f.scale(f.sub(s2, s1), 2)
+        if h == f.zero:
+            return self.double(p1) if r == f.zero else self.infinity
+        i = f.sqr(f.scale(h, 2))
+        j = f.mul(h, i)
+        v = f.mul(u1, i)
+        x3 = f.sub(f.sub(f.sqr(r), j), f.scale(v, 2))
+        y3 = f.sub(f.mul(r, f.sub(v, x3)), f.scale(f.mul(s1, j), 2))
+        z3 = f.mul(f.sub(f.sub(f.sqr(f.add(z1, z2)), z1z1), z2z2), h)
+        return (x3, y3, z3)
+
+    def add_affine(self, p1, point):
+        """Mixed addition of a Jacobian point and an affine point (madd-2007-bl)."""
+        f = self.field
+        if point is None:
+            return p1
+        x1, y1, z1 = p1
+        x2, y2 = point
+        if z1 == f.zero:
+            return (x2, y2, f.one)
+        z1z1 = f.sqr(z1)
+        u2 = f.mul(x2, z1z1)
+        s2 = f.mul(f.mul(y2, z1), z1z1)
+        h = f.sub(u2, x1)
+        r = f.scale(f.sub(s2, y1), 2)
+        if h == f.zero:
+            return self.double(p1) if r == f.zero else self.infinity
+        hh = f.sqr(h)
+        i = f.scale(hh, 4)
+        j = f.mul(h, i)
+        v = f.mul(x1, i)
+        x3 = f.sub(f.sub(f.sqr(r), j), f.scale(v, 2))
+        y3 = f.sub(f.mul(r, f.sub(v, x3)), f.scale(f.mul(y1, j), 2))
+        z3 = f.sub(f.sub(f.sqr(f.add(z1, h)), z1z1), hh)
+        return (x3, y3, z3)
+
+    def normalize(self, p1):
+        """Convert a Jacobian point to affine coordinates."""
+        return self.normalize_batch([p1])[0]
+
+    def normalize_batch(self, points):
+        """
+        Convert Jacobian points to affine coordinates with a single field
+        inversion (Montgomery's trick).
+        """
+        f = self.field
+        # Prefix products of the non-zero Z coordinates
+        prefix = []
+        acc = f.one
+        for _, _, z in points:
+            if z != f.zero:
+                acc = f.mul(acc, z)
+            prefix.append(acc)
+        acc_inv = f.inv(acc)
+
+        result = [None] * len(points)
+        for index in range(len(points) - 1, -1, -1):
+            x, y, z = points[index]
+            if z == f.zero:
+                continue
+            previous = prefix[index - 1] if index > 0 else f.one
+            z_inv = f.mul(acc_inv, previous)
+            acc_inv = f.mul(acc_inv, z)
+            z_inv2 = f.sqr(z_inv)
+            result[index] = (f.mul(x, z_inv2), f.mul(f.mul(y, z_inv2), z_inv))
+        return result
+
+    def _multiply_jacobian(self, point, scalar):
+        """Variable-base scalar multiplication using a width-w NAF."""
+        if point is None or scalar == 0:
+            return self.infinity
+        if scalar < 0:
+            return self._multiply_jacobian(self.negate(point), -scalar)
+
+        # Odd multiples P, 3P, ..., (2^(w-1) - 1)P as affine points
+        base = self.to_jacobian(point)
+        twice = self.double(base)
+        odd_multiples = [base]
+        for _ in range((1 << (WNAF_WIDTH - 2)) - 1):
+            odd_multiples.append(self.add(odd_multiples[-1], twice))
+        table = self.normalize_batch(odd_multiples)
+
+        acc = self.infinity
+        for digit in reversed(wnaf(scalar, WNAF_WIDTH)):
+            acc = self.double(acc)
+            if digit > 0:
+                acc = self.add_affine(acc, table[digit >> 1])
+            elif digit < 0:
+                acc = self.add_affine(acc, self.negate(table[-digit >> 1]))
+        return acc
+
+    def multiply(self, point, scalar):
+        """Multiply an affine point by an integer scalar."""
+        return self.normalize(self._multiply_jacobian(point, scalar))
+
+    def multiply_many(self, pairs):
+        """Multiply each (point, scalar) pair and return the affine results."""
+        return self.normalize_batch(
+            [self._multiply_jacobian(point, scalar) for point, scalar in pairs]
+        )
+
+    def comb_table(self):
+        """
+        Fixed-base comb table for the generator, built on first use: entry i - 1 is
+        sum(2^(j * d) * G for each bit j set in i), with d = COMB_SCALAR_BITS / COMB_TEETH.
+        """
+        if self._comb_table is not None:
+            return self._comb_table
+        spacing = COMB_SCALAR_BITS // COMB_TEETH
+        teeth = [self.to_jacobian(self.generator)]
+        for _ in range(COMB_TEETH - 1):
+            tooth = teeth[-1]
+            for _ in range(spacing):
+                tooth = self.double(tooth)
+            teeth.append(tooth)
+
+        entries = [self.infinity]
+        for tooth in teeth:
+            entries += [self.add(entry, tooth) for entry in entries]
+        self._comb_table = self.normalize_batch(entries[1:])
+        return self._comb_table
+
+    def _generator_multiply_jacobian(self, scalar):
+        """Multiply the generator by 0 <= scalar < 2^COMB_SCALAR_BITS with the comb."""
+        if not 0 <= scalar < 1 << COMB_SCALAR_BITS:
+            return self._multiply_jacobian(self.generator, scalar)
+        table = self.comb_table()
+        spacing = COMB_SCALAR_BITS // COMB_TEETH
+        mask = (1 << spacing) - 1
+        rows = [(scalar >> (tooth * spacing)) & mask for tooth in range(COMB_TEETH)]
+
+        acc = self.infinity
+        for column in range(spacing - 1, -1, -1):
+            acc = self.double(acc)
+            index = 0
+            for tooth in range(COMB_TEETH):
+                index |= ((rows[tooth] >> column) & 1) << tooth
+            if index:
+                acc = self.add_affine(acc, table[index - 1])
+        return acc
+
+    def generator_multiply(self, scalar):
+        """Multiply the generator by an integer scalar."""
+        return self.normalize(self._generator_multiply_jacobian(scalar))
+
+    def generator_multiply_many(self, scalars):
+        """Multiply the generator by each scalar and return the affine results."""
+        return self.normalize_batch(
+            [self._generator_multiply_jacobian(scalar) for scalar in scalars]
+        )
+
+
+def wnaf(scalar, width):
+    """Width-w non-adjacent form of a non-negative scalar, least significant digit first."""
+    digits = []
+    modulus = 1 << width
+    while scalar > 0:
+        if scalar & 1:
+            digit = scalar % modulus
+            if digit >= modulus >> 1:
+                digit -= modulus
+            scalar -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        scalar >>= 1
+    return digits
+
+
+G1 = JacobianCurve(Fp, 4, G1_GENERATOR)
+G2 = JacobianCurve(Fp2, (4, 4), G2_GENERATOR)
+
+
+def g1_to_bytes(point):
+    """Serialize an affine G1 point into the 128-byte EIP-2537 encoding."""
+    if point is None:
+        return bytes(128)
+    x, y = point
+    return x.to_bytes(64, byteorder="big") + y.to_bytes(64, byteorder="big")
+
+
+def g2_to_bytes(point):
+    """Serialize an affine G2 point into the 256-byte EIP-2537 encoding."""
+    if point is None:
+        return bytes(256)
+    (x_c0, x_c1), (y_c0, y_c1) = point
+    return (
+        x_c0.to_bytes(64, byteorder="big")
+        + x_c1.to_bytes(64, byteorder="big")
+        + y_c0.to_bytes(64, byteorder="big")
+        + y_c1.to_bytes(64, byteorder="big")
+    )
@@ -0,0 +1,213 @@
+"""
+Probabilistic deduplication of the inputs before execution (FUZZ_DEDUP).
+
+Some strategies (e.g. the MSM and pairing inputs built on the generator point)
+often produce byte-identical inputs, and Hypothesis replays its minimal
+examples; duplicates are skipped instead of being executed again on every
+implementation.
+
+Each precompile has its own Bloom filter, sized by DEDUP_CAPACITY for the
+inputs that one run executes (more for the cheap precompiles, which run more
+inputs). A filter holds two generations of the same size: when the current one
+is full, it becomes the previous one and a fresh one starts, so the memory is
+bounded. An input is looked up in both generations, each sized for half the
+configured false positive rate, so that their combined rate stays below it.
+Inputs seen only in a dropped generation are executed again.
+"""
+
+import functools
+import hashlib
+import math
+from collections import Counter
+from typing import Callable, Dict, List, Mapping, Optional
+
+from . import settings
+from .layouts import OPS
+
+# Inputs per generation of each filter
+DEDUP_CAPACITY = {
+    "g1_add": 1 << 20,
+    "g2_add": 1 << 20,
+    "map_fp_to_g1": 1 << 20,
+    "map_fp2_to_g2": 1 << 18,
+    "g1_msm": 1 << 18,
+    "g2_msm": 1 << 17,
+    "pairing": 1 << 16,
+}
+
+
+class BloomFilter:
+    """Bloom filter with double hashing of a 128-bit BLAKE2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Args:
+            capacity: Number of items at which the false positive rate reaches
+                error_rate
+            error_rate: False positive rate at capacity
+        """
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _indices(self, item: bytes) -> List[int]:
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item: bytes) -> bool:
+        return all(
+            self.bits[index >> 3] & (1 << (index & 7)) for index in self._indices(item)
+        )
+
+    def add(self, item: bytes):
+        for index in self._indices(item):
+            self.bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+
+class RotatingFilter:
+    """Two Bloom filter generations, the oldest dropped when the newest is full."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Args:
+            capacity: Number of items per generation
+            error_rate: False positive rate of a lookup in both generations
+        """
+        self.capacity = capacity
+        # Each generation contributes at most half the rate
+        self.error_rate = error_rate / 2
+        self.current = BloomFilter(capacity, self.error_rate)
+        self.previous: Optional[BloomFilter] = None
+
+    def __contains__(self, item: bytes) -> bool:
+        return item in self.current or (
+            self.previous is not None and item in self.previous
+        )
+
+    def add(self, item: bytes):
+        if self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+        self.current.add(item)
+
+    @property
+    def memory(self) -> int:
+        """Size of the bit arrays in bytes."""
+        return sum(
+            len(generation.bits)
+            for generation in (self.current, self.previous)
+            if generation is not None
+        )
+
+
+class Deduplicator:
+    """Filters of inputs already executed, by op, with duplicate counters."""
+
+    def __init__(
+        self,
+        error_rate: float = 1e-4,
+        capacities: Mapping[str, int] = DEDUP_CAPACITY,
+    ):
+        self.error_rate = error_rate
+        self.capacities = capacities
+        self.filters: Dict[str, RotatingFilter] = {}
+        # "<op>.checked" and "<op>.duplicates" counters
+        self.stats = Counter()
+
+    def _filter(self, op: str) -> RotatingFilter:
+        if op not in self.filters:
+            capacity = self.capacities.get(op, max(self.capacities.values()))
+            self.filters[op] = RotatingFilter(capacity, self.error_rate)
+        return self.filters[op]
+
+    def seen(self, op: str, input_bytes: bytes) -> bool:
+        """Whether `input_bytes` was (probably) executed already, counted."""
+        self.stats[f"{op}.checked"] += 1
+        if input_bytes in self._filter(op):
+            self.stats[f"{op}.duplicates"] += 1
+            return True
+        return False
+
+    def add(self, op: str, input_bytes: bytes):
+        """Record an executed input."""
+        self._filter(op).add(input_bytes)
+
+    def unique(self, op: str, inputs: List[bytes]) -> List[bytes]:
+        """The inputs not seen before, each recorded as executed."""
+        kept = []
+        for input_bytes in inputs:
+            if not self.seen(op, input_bytes):
+                self.add(op, input_bytes)
+                kept.append(input_bytes)
+        return kept
+
+    def reset(self):
+        """Forget the executed inputs (e.g. when a new build is loaded)."""
+        self.filters.clear()
+
+    def memory(self) -> int:
+        return sum(dedup_filter.memory for dedup_filter in self.filters.values())
+
+
+def format_report(stats: Mapping[str, int], memory: int = 0) -> List[str]:
+    """Duplicate rate by op, from the counters of one or more Deduplicators."""
+    lines = [f"{'op':<16}{'checked':>10}{'duplicates':>12}{'rate':>8}"]
+    ops = sorted(
+        {key.split(".")[0] for key in stats},
+        key=lambda op: OPS.index(op) if op in OPS else len(OPS),
+    )
+    for op in ops:
+        checked = stats.get(f"{op}.checked", 0)
+        duplicates = stats.get(f"{op}.duplicates", 0)
+        rate = duplicates / checked if checked else 0.0
+        lines.append(f"{op:<16}{checked:>10}{duplicates:>12}{rate:>8.1%}")
+    if memory:
+        lines.append(f"filter memory: {memory / 2**20:.1f} MiB")
+    return lines
+
+
+def create_deduplicator() -> Optional[Deduplicator]:
+    """Deduplicator of the FUZZ_DEDUP settings, None when disabled."""
+    if not settings.DEDUP:
+        return None
+    return Deduplicator(settings.DEDUP_ERROR_RATE)
+
+
+def deduplicate_test(test: Callable, op: str, deduplicator: Deduplicator):
+    """
+    Skip the examples of a Hypothesis test whose `input_data` already passed.
+
+    The key holds the test, the Rust backend under test and the builds of the
+    native wrappers, so every test, backend and build still sees each input
+    once. Failing inputs are not recorded:
+    Hypothesis replays the failing example at the end of the test.
+    """
+    inner_test = test.hypothesis.inner_test
+    prefix = f"{test.__module__}.{test.__qualname__}".encode()
+
+    @functools.wraps(inner_test)
+    def deduplicated(*args, **kwargs):
+        if "input_data" not in kwargs:
+            return inner_test(*args, **kwargs)
+        backend = getattr(kwargs.get("rust_wrapper"), "name", "")
+        # Inputs run again on the new builds of FUZZ_HOT_RELOAD
+        builds = [
+            getattr(kwargs.get(wrapper), "digest", None) or ""
+            for wrapper in ("rust_wrapper", "go_wrapper")
+        ]
+        key = b"\0".join(
+            (prefix, backend.encode(), *map(str.encode, builds), kwargs["input_data"])
+        )
+        if deduplicator.seen(op, key):
+            return
+        inner_test(*args, **kwargs)
+        deduplicator.add(op, key)
+
+    test.hypothesis.inner_test = deduplicated
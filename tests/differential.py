@@ -0,0 +1,115 @@
+"""
+Differential execution of one precompile input on several implementations.
+
+An outcome is (True, output_bytes) on success and (False, error_message) when
+the implementation raised RuntimeError. Implementations agree when they all
+succeed with the same output, or all fail (error messages differ between
+implementations and are not compared).
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+Outcome = Tuple[bool, object]
+
+
+def run_one(implementation, op: str, input_bytes: bytes) -> Outcome:
+    """Run `op` on one implementation and capture its outcome."""
+    try:
+        return True, getattr(implementation, op)(input_bytes)
+    except RuntimeError as e:
+        return False, str(e)
+
+
+def run_all(
+    implementations: Mapping[str, object], op: str, input_bytes: bytes
+) -> Dict[str, Outcome]:
+    """Run `op` on every implementation and return the outcomes by name."""
+    return {
+        name: run_one(implementation, op, input_bytes)
+        for name, implementation in implementations.items()
+    }
+
+
+def run_batch(
+    implementations: Mapping[str, object], op: str, inputs: Sequence[bytes]
+) -> List[Dict[str, Outcome]]:
+    """
+    Run `op` on every input and every implementation. Implementations with a
+    run_batch() method (e.g. the EELS process pool) get the whole batch at once.
+
+    Returns:
+        The outcomes by name of each input
+    """
+    batch_outcomes = {}
+    for name, implementation in implementations.items():
+        if hasattr(implementation, "run_batch"):
+            batch_outcomes[name] = implementation.run_batch(op, inputs)
+        else:
+            batch_outcomes[name] = [
+                run_one(implementation, op, input_bytes) for input_bytes in inputs
+            ]
+    return [
+        {name: outcomes[index] for name, outcomes in batch_outcomes.items()}
+        for index in range(len(inputs))
+    ]
+
+
+def reload_changed(implementations: Mapping[str, object]) -> List[str]:
+    """
+    Load the new builds of the native implementations whose library changed
+    (FUZZ_HOT_RELOAD, see LibCallerWrapper.check_reload), between batches.
+
+    Returns:
+        Names of the reloaded implementations
+    """
+    return [
+        name
+        for name, implementation in implementations.items()
+        if hasattr(implementation, "check_reload") and implementation.check_reload()
+    ]
+
+
+def outcome_key(outcome: Outcome):
+    """Comparable form of an outcome: the output on success, None on failure."""
+    ok, value = outcome
+    return value if ok else None
+
+
+def is_divergent(outcomes: Mapping[str, Outcome]) -> bool:
+    """Check whether the implementations disagree."""
+    return len({outcome_key(outcome) for outcome in outcomes.values()}) > 1
+
+
+def behaviour_key(outcomes: Mapping[str, Outcome]) -> Tuple:
+    """
+    Behaviour of the implementations on an input, ignoring output values:
+    who succeeded, the error messages and whether they disagree.
+    """
+    return is_divergent(outcomes), tuple(
+        sorted(
+            (name, ok, None if ok else value) for name, (ok, value) in outcomes.items()
+        )
+    )
+
+
+def outcome_groups(outcomes: Mapping[str, Outcome]) -> Dict[object, list]:
+    """Group implementation names by outcome key."""
+    groups: Dict[object, list] = {}
+    for name, outcome in outcomes.items():
+        groups.setdefault(outcome_key(outcome), []).append(name)
+    return groups
+
+
+def record_divergence(output_dir: Path, op: str, input_bytes: bytes, outcomes) -> Path:
+    """Write a divergent input and the outcome groups next to it."""
+    digest = hashlib.sha256(input_bytes).hexdigest()[:16]
+    path = output_dir / op / f"{digest}.bin"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(input_bytes)
+    with open(path.with_suffix(".txt"), "w") as f:
+        for key, names in outcome_groups(outcomes).items():
+            value = key.hex() if key is not None else "error"
+            f.write(f"{','.join(names)}: {value}\n")
+    return path
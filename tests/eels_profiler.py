@@ -0,0 +1,141 @@
+"""
+Sampling profiler for the EELS reference implementation (FUZZ_EELS_PROFILE_DIR).
+
+While an EELS call runs on the main thread, an ITIMER_PROF timer delivers
+SIGPROF every FUZZ_EELS_PROFILE_INTERVAL seconds of CPU time and the handler
+records the interrupted Python stack, from the EELSWrapper method down. No
+timer runs outside EELS calls, so the native implementations and Hypothesis
+are not sampled.
+
+Stacks are written per precompile in the collapsed format of flamegraph.pl
+and speedscope, one `eels-<op>-<process>.folded` file per process:
+
+    cat build/profile/eels-pairing-*.folded | flamegraph.pl > pairing.svg
+
+The time spent in the handler is tracked: when it exceeds OVERHEAD_BUDGET of
+the profiled time, the sampling interval is doubled.
+"""
+
+import atexit
+import signal
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Dict, Iterable, List, Optional
+
+from . import settings
+from .metrics import PROCESS_NAME
+
+# Maximum fraction of the profiled time spent taking samples
+OVERHEAD_BUDGET = 0.03
+
+# Profiled time before the overhead is checked, in nanoseconds
+OVERHEAD_CHECK_NS = 10**9
+
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class SamplingProfiler:
+    """SIGPROF-based sampling profiler of the functions wrapped by profile()."""
+
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval: Sampling interval in seconds of CPU time
+        """
+        self.interval = interval
+        self.stacks: Dict[str, Counter] = {}
+        self.samples = 0
+        self.handler_ns = 0
+        self.profiled_ns = 0
+        self._op: Optional[str] = None
+        self._boundary = None
+        signal.signal(signal.SIGPROF, self._sample)
+
+    def _sample(self, signum, frame):
+        if self._op is None:
+            return
+        start = perf_counter_ns()
+        labels = []
+        while frame is not None and frame is not self._boundary:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        labels.append(self._op)
+        self.stacks.setdefault(self._op, Counter())[";".join(reversed(labels))] += 1
+        self.samples += 1
+        self.handler_ns += perf_counter_ns() - start
+
+    def _check_overhead(self):
+        if self.profiled_ns < OVERHEAD_CHECK_NS:
+            return
+        if self.handler_ns > OVERHEAD_BUDGET * self.profiled_ns:
+            self.interval *= 2
+        self.handler_ns = 0
+        self.profiled_ns = 0
+
+    def profile(self, op: str, function):
+        """Wrap a precompile function so that its calls are sampled."""
+        main_thread = threading.main_thread()
+
+        def profiled(input_bytes):
+            # Signals are only delivered to the main thread; nested calls are
+            # already covered by the outer one
+            if threading.current_thread() is not main_thread or self._op is not None:
+                return function(input_bytes)
+            self._op = op
+            self._boundary = sys._getframe()
+            start = perf_counter_ns()
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            try:
+                return function(input_bytes)
+            finally:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+                self._op = None
+                self._boundary = None
+                self.profiled_ns += perf_counter_ns() - start
+                self._check_overhead()
+
+        return profiled
+
+    def write(self, directory: Path) -> List[Path]:
+        """Write one collapsed-stack file per precompile."""
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for op, stacks in self.stacks.items():
+            path = directory / f"eels-{op}-{PROCESS_NAME}.folded"
+            with open(path, "w") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(path)
+        return paths
+
+
+class ProfiledImplementation:
+    """Proxy sampling the calls of an implementation object (EELSWrapper)."""
+
+    def __init__(self, profiler: SamplingProfiler, implementation, ops: Iterable[str]):
+        self._implementation = implementation
+        for op in ops:
+            setattr(self, op, profiler.profile(op, getattr(implementation, op)))
+
+    def __getattr__(self, name):
+        return getattr(self._implementation, name)
+
+
+_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """
+    The profiler of the process, created on first use with the FUZZ_EELS_PROFILE_*
+    settings; its stacks are written at exit.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler(settings.EELS_PROFILE_INTERVAL)
+        atexit.register(_profiler.write, Path(settings.EELS_PROFILE_DIR))
+    return _profiler
@@ -0,0 +1,305 @@
+import ctypes
+import importlib.util
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib.machinery import EXTENSION_SUFFIXES
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+BUILD_DIR = Path(__file__).parent.parent / "build"
+
+# Name of the compiled CPython extension built by `make ext`
+EXTENSION_MODULE_NAME = "_fastcall"
+
+
+class CtypesBackend:
+    """
+    Calls the `*_wrapper` symbols through ctypes.
+    Always available, but has the highest per-call overhead.
+    """
+
+    name = "ctypes"
+
+    def __init__(self, lib_path: str):
+        self.lib = ctypes.CDLL(lib_path)
+        self.lib_path = lib_path
+
+    def bind(self, function_name: str, max_output_size: int) -> Callable:
+        """
+        Return a callable taking the input bytes and returning the output bytes.
+
+        Args:
+            function_name: Name of the C function in the library
+            max_output_size: Maximum size of the output buffer
+        """
+        # Get the function from the library
+        function = getattr(self.lib, function_name)
+
+        # Define common function signature
+        function.argtypes = [
+            ctypes.POINTER(ctypes.c_uint8),  # input
+            ctypes.c_size_t,  # input_len
+            ctypes.POINTER(ctypes.c_uint8),  # output
+            ctypes.c_size_t,  # output_capacity
+            ctypes.POINTER(ctypes.c_size_t),  # output_len
+        ]
+        function.restype = ctypes.c_int
+
+        def call_function(input_bytes: bytes) -> bytes:
+            input_len = len(input_bytes)
+            input_array = (ctypes.c_uint8 * input_len)(*input_bytes)
+            output_buffer = (ctypes.c_uint8 * max_output_size)()
+            output_len = ctypes.c_size_t()
+
+            result = function(
+                input_array,
+                input_len,
+                output_buffer,
+                max_output_size,
+                ctypes.byref(output_len),
+            )
+
+            if result != 0:
+                raise RuntimeError(f"{function_name} failed with error code: {result}")
+
+            return bytes(output_buffer[: output_len.value])
+
+        return call_function
+
+
+class CffiBackend:
+    """
+    Calls the `*_wrapper` symbols through cffi in ABI mode.
+    Requires the optional `cffi` dependency.
+    """
+
+    name = "cffi"
+
+    def __init__(self, lib_path: str):
+        import cffi
+
+        self.ffi = cffi.FFI()
+        self.lib_path = lib_path
+
+    def bind(self, function_name: str, max_output_size: int) -> Callable:
+        """
+        Return a callable taking the input bytes and returning the output bytes.
+
+        Args:
+            function_name: Name of the C function in the library
+            max_output_size: Maximum size of the output buffer
+        """
+        # The input is declared as `const char *` so that bytes objects are
+        # passed without a copy; the ABI is identical to `const uint8_t *`.
+        self.ffi.cdef(
+            f"int {function_name}(const char *input, size_t input_len,"
+            " uint8_t *output, size_t output_capacity, size_t *output_len);"
+        )
+        # dlopen is reference counted, so this returns the already loaded library
+        function = getattr(self.ffi.dlopen(self.lib_path), function_name)
+        new = self.ffi.new
+        buffer = self.ffi.buffer
+
+        def call_function(input_bytes: bytes) -> bytes:
+            output_buffer = new("uint8_t[]", max_output_size)
+            output_len = new("size_t *")
+
+            result = function(
+                bytes(input_bytes),
+                len(input_bytes),
+                output_buffer,
+                max_output_size,
+                output_len,
+            )
+
+            if result != 0:
+                raise RuntimeError(f"{function_name} failed with error code: {result}")
+
+            return buffer(output_buffer, output_len[0])[:]
+
+        return call_function
+
+
+class ExtensionBackend:
+    """
+    Calls the `*_wrapper` symbols from the compiled `_fastcall` extension
+    (see wrappers/cpython/fastcall.c), which skips all argument conversion.
+    """
+
+    name = "extension"
+
+    def __init__(self, lib_path: str):
+        self.module = load_extension_module()
+        self.lib_path = lib_path
+
+    def bind(self, function_name: str, max_output_size: int) -> Callable:
+        """
+        Return a callable taking the input bytes and returning the output bytes.
+
+        Args:
+            function_name: Name of the C function in the library
+            max_output_size: Maximum size of the output buffer
+        """
+        return self.module.bind(self.lib_path, function_name, max_output_size)
+
+
+BACKENDS = {
+    CtypesBackend.name: CtypesBackend,
+    CffiBackend.name: CffiBackend,
+    ExtensionBackend.name: ExtensionBackend,
+}
+
+# Library and bound functions of a ProcessBackend worker process
+_worker_backend = None
+_worker_functions: Dict[str, Callable] = {}
+
+
+def _init_process_worker(backend: str, lib_path: str):
+    global _worker_backend
+    _worker_backend = create_backend(backend, lib_path)
+
+
+def _call_in_worker(function_name: str, max_output_size: int, input_bytes: bytes):
+    if function_name not in _worker_functions:
+        _worker_functions[function_name] = _worker_backend.bind(
+            function_name, max_output_size
+        )
+    return _worker_functions[function_name](input_bytes)
+
+
+class ProcessBackend:
+    """
+    Calls the `*_wrapper` symbols of a library loaded in a worker process,
+    through another backend. A process cannot host two Go runtimes: this runs
+    the builds of a Go wrapper loaded after the first one (see
+    LibCallerWrapper.check_reload). Each call is a round trip to the worker.
+    """
+
+    name = "process"
+
+    def __init__(self, lib_path: str, backend: str):
+        """
+        Args:
+            lib_path: Path to the shared library
+            backend: Name of the backend calling it in the worker process
+        """
+        self.lib_path = lib_path
+        # Spawned: forking a process that loaded the Go runtime is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process_worker,
+            initargs=(backend, lib_path),
+        )
+        # Start the worker now: it loads the library, which may be removed
+        # later (see LibCallerWrapper.check_reload), and load errors surface here
+        self._executor.submit(int).result()
+
+    def bind(self, function_name: str, max_output_size: int) -> Callable:
+        """
+        Return a callable taking the input bytes and returning the output bytes.
+
+        Args:
+            function_name: Name of the C function in the library
+            max_output_size: Maximum size of the output buffer
+        """
+        submit = self._executor.submit
+
+        def call_function(input_bytes: bytes) -> bytes:
+            return submit(
+                _call_in_worker, function_name, max_output_size, bytes(input_bytes)
+            ).result()
+
+        return call_function
+
+    def close(self):
+        """Stop the worker process."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def load_extension_module():
+    """
+    Load the `_fastcall` extension from the build directory.
+
+    Raises:
+        ImportError: If the extension has not been built
+    """
+    for suffix in EXTENSION_SUFFIXES:
+        path = BUILD_DIR / f"{EXTENSION_MODULE_NAME}{suffix}"
+        if path.exists():
+            spec = importlib.util.spec_from_file_location(EXTENSION_MODULE_NAME, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+    raise ImportError(
+        f"{EXTENSION_MODULE_NAME} extension not found in {BUILD_DIR}, run `make ext`"
+    )
+
+
+def create_backend(name: str, lib_path: str):
+    """
+    Instantiate the backend called `name` for the library at `lib_path`.
+
+    Raises:
+        ValueError: If the backend name is unknown
+        ImportError: If the backend's dependency is not available
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown FFI backend '{name}', expected one of {sorted(BACKENDS)}"
+        )
+    return BACKENDS[name](lib_path)
+
+
+def available_backends(lib_path: str) -> Dict[str, object]:
+    """Instantiate every backend whose dependencies are available."""
+    backends = {}
+    for name in BACKENDS:
+        try:
+            backends[name] = create_backend(name, lib_path)
+        except ImportError:
+            continue
+    return backends
+
+
+def benchmark_backends(
+    lib_path: str,
+    probe: Tuple[str, int, bytes],
+    iterations: int = 2000,
+    backends: Optional[List[str]] = None,
+) -> Dict[str, float]:
+    """
+    Measure the per-call latency of each available backend.
+
+    Args:
+        lib_path: Path to the shared library
+        probe: (function_name, max_output_size, input_bytes) of a cheap call
+        iterations: Number of timed calls per backend
+        backends: Restrict the measurement to these backend names
+
+    Returns:
+        Mapping of backend name to the best observed nanoseconds per call
+    """
+    function_name, max_output_size, input_bytes = probe
+    timings = {}
+    for name, backend in available_backends(lib_path).items():
+        if backends is not None and name not in backends:
+            continue
+        function = backend.bind(function_name, max_output_size)
+        function(input_bytes)  # warm up
+        best = float("inf")
+        # Keep the best of a few rounds to filter out scheduling noise
+        for _ in range(5):
+            start = time.perf_counter_ns()
+            for _ in range(iterations // 5):
+                function(input_bytes)
+            best = min(best, (time.perf_counter_ns() - start) / (iterations // 5))
+        timings[name] = best
+    return timings
+
+
+def select_fastest_backend(lib_path: str, probe: Tuple[str, int, bytes]) -> str:
+    """Return the name of the available backend with the lowest call latency."""
+    timings = benchmark_backends(lib_path, probe)
+    return min(timings, key=timings.get)
@@ -0,0 +1,193 @@
+"""
+Pure-byte validation classes of precompile inputs, and adaptive budgets.
+
+classify() labels an input with the first EIP-2537 check it fails, without
+running any implementation: "length", "padding", "field", "curve", or for
+inputs passing these checks "valid" and "valid_edge" (with a point at
+infinity or a zero scalar). Subgroup membership is left to the
+implementations.
+
+Most generated inputs quickly stop finding anything new in the rejected
+classes. ClassBudget tracks the executions and new behaviours of every
+(op, class), and once a rejected class has gone `patience` executions
+without new behaviour, only a `floor` share of its inputs is still executed.
+The valid classes, which reach the deep arithmetic paths, are never throttled.
+"""
+
+from random import Random
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .curve import FIELD_MODULUS, G1, G2
+from .layouts import FP_PADDING_SIZE, FP_SIZE, G1_POINT_SIZE, LAYOUTS, SCALAR_SIZE
+
+CLASSES = ("length", "padding", "field", "curve", "valid", "valid_edge")
+VALID_CLASSES = ("valid", "valid_edge")
+
+
+def _read_fp(input_bytes: bytes, offset: int) -> int:
+    return int.from_bytes(input_bytes[offset : offset + FP_SIZE], byteorder="big")
+
+
+def _field_stage(input_bytes: bytes, slots: Sequence[int]) -> Optional[str]:
+    if any(any(input_bytes[slot : slot + FP_PADDING_SIZE]) for slot in slots):
+        return "padding"
+    if any(_read_fp(input_bytes, slot) >= FIELD_MODULUS for slot in slots):
+        return "field"
+    return None
+
+
+def failure_stage(op: str, input_bytes: bytes) -> str:
+    """
+    First EIP-2537 check the input fails, using only byte-level and curve
+    equation checks: "length", "padding", "field", "curve" or "valid".
+    Points and field elements are decoded in input order, as the precompiles
+    do. Subgroup membership is left to the implementations.
+    """
+    layout = LAYOUTS[op]
+    if not layout.is_valid_length(len(input_bytes)):
+        return "length"
+    items = sorted(
+        [(offset, 1, None) for offset in layout.field_elements]
+        + [(offset, 2, G1) for offset in layout.g1_points]
+        + [(offset, 4, G2) for offset in layout.g2_points]
+    )
+    for unit in range(0, len(input_bytes), layout.unit_size):
+        for offset, width, curve in items:
+            slots = [unit + offset + i * FP_SIZE for i in range(width)]
+            stage = _field_stage(input_bytes, slots)
+            if stage is not None:
+                return stage
+            if curve is None:
+                continue
+            c = [_read_fp(input_bytes, slot) for slot in slots]
+            point = (c[0], c[1]) if curve is G1 else ((c[0], c[1]), (c[2], c[3]))
+            if any(c) and not curve.is_on_curve(point):
+                return "curve"
+    return "valid"
+
+
+def edge_features(op: str, input_bytes: bytes) -> Tuple[bool, bool]:
+    """Whether a well-sized input has a point at infinity, and a zero scalar."""
+    layout = LAYOUTS[op]
+    units = range(0, len(input_bytes), layout.unit_size)
+    point_sizes = [(offset, G1_POINT_SIZE) for offset in layout.g1_points] + [
+        (offset, 2 * G1_POINT_SIZE) for offset in layout.g2_points
+    ]
+    has_infinity = any(
+        not any(input_bytes[unit + offset : unit + offset + size])
+        for unit in units
+        for offset, size in point_sizes
+    )
+    has_zero_scalar = any(
+        not any(input_bytes[unit + offset : unit + offset + SCALAR_SIZE])
+        for unit in units
+        for offset in layout.scalars
+    )
+    return has_infinity, has_zero_scalar
+
+
+def classify(op: str, input_bytes: bytes) -> str:
+    """Validation class of an input (one of CLASSES)."""
+    stage = failure_stage(op, input_bytes)
+    if stage == "valid" and any(edge_features(op, input_bytes)):
+        return "valid_edge"
+    return stage
+
+
+class ClassStats:
+    """Counters of one (op, class)."""
+
+    __slots__ = ("generated", "executed", "skipped", "new_behaviours", "last_new")
+
+    def __init__(self):
+        self.generated = 0
+        self.executed = 0
+        self.skipped = 0
+        self.new_behaviours = 0
+        # Value of `executed` when the class last produced a new behaviour
+        self.last_new = 0
+
+
+class ClassBudget:
+    """Adaptive execution budget of the validation classes."""
+
+    def __init__(
+        self,
+        warmup: int = 1000,
+        patience: int = 2000,
+        floor: float = 0.02,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            warmup: Executions of a class before it can be throttled
+            patience: Executions without new behaviour after which a class is
+                saturated
+            floor: Share of the inputs of a saturated class still executed
+            seed: Seed of the admission draws
+        """
+        self.warmup = warmup
+        self.patience = patience
+        self.floor = floor
+        self.rng = Random(seed)
+        self.stats: Dict[Tuple[str, str], ClassStats] = {}
+        self.behaviours: Dict[Tuple[str, str], set] = {}
+
+    def _stats(self, op: str, input_class: str) -> ClassStats:
+        key = (op, input_class)
+        if key not in self.stats:
+            self.stats[key] = ClassStats()
+            self.behaviours[key] = set()
+        return self.stats[key]
+
+    def saturated(self, op: str, input_class: str) -> bool:
+        """Whether a rejected class has stopped producing new behaviours."""
+        if input_class in VALID_CLASSES:
+            return False
+        stats = self._stats(op, input_class)
+        return (
+            stats.executed >= self.warmup
+            and stats.executed - stats.last_new >= self.patience
+        )
+
+    def admit(self, op: str, input_class: str) -> bool:
+        """Decide whether an input of this class is executed."""
+        stats = self._stats(op, input_class)
+        stats.generated += 1
+        if not self.saturated(op, input_class) or self.rng.random() < self.floor:
+            return True
+        stats.skipped += 1
+        return False
+
+    def record(self, op: str, input_class: str, behaviour: Hashable) -> bool:
+        """
+        Record the behaviour of an executed input.
+
+        Returns:
+            Whether the behaviour is new for its class
+        """
+        stats = self._stats(op, input_class)
+        stats.executed += 1
+        seen = self.behaviours[(op, input_class)]
+        if behaviour in seen:
+            return False
+        seen.add(behaviour)
+        stats.new_behaviours += 1
+        stats.last_new = stats.executed
+        return True
+
+    def format_report(self) -> List[str]:
+        """Per-class counts, by op."""
+        lines = [
+            f"{'op':<16}{'class':<12}{'generated':>11}{'executed':>10}"
+            f"{'skipped':>10}{'new':>6}  saturated"
+        ]
+        for (op, input_class), stats in sorted(
+            self.stats.items(), key=lambda item: (item[0][0], CLASSES.index(item[0][1]))
+        ):
+            lines.append(
+                f"{op:<16}{input_class:<12}{stats.generated:>11}{stats.executed:>10}"
+                f"{stats.skipped:>10}{stats.new_behaviours:>6}  "
+                f"{'yes' if self.saturated(op, input_class) else 'no'}"
+            )
+        return lines
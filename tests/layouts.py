@@ -0,0 +1,146 @@
+"""
+Byte layouts of the EIP-2537 precompile inputs.
+
+Every input is a sequence of fixed-size units (a pair for MSM and pairing,
+the whole input otherwise). Each unit holds G1/G2 points, 64-byte field
+element slots (16 zero bytes followed by a 48-byte big-endian value) and
+32-byte scalars at fixed offsets.
+
+Also the functions and builds of the native wrapper libraries, read by the
+tools comparing builds without loading the default ones (LibCallerWrapper).
+"""
+
+from typing import NamedTuple, Tuple
+
+from .strategies import (
+    LENGTH_PER_PAIR_G1,
+    LENGTH_PER_PAIR_G2,
+    LENGTH_PER_PAIR_PAIRING,
+)
+
+FP_SIZE = 64  # Padded field element
+FP_PADDING_SIZE = 16  # Leading bytes that must be zero in a field element
+G1_POINT_SIZE = 2 * FP_SIZE
+G2_POINT_SIZE = 4 * FP_SIZE
+SCALAR_SIZE = 32
+
+# Precompile addresses (EIP-2537)
+PRECOMPILE_ADDRESSES = {
+    "g1_add": 0x0B,
+    "g1_msm": 0x0C,
+    "g2_add": 0x0D,
+    "g2_msm": 0x0E,
+    "pairing": 0x0F,
+    "map_fp_to_g1": 0x10,
+    "map_fp2_to_g2": 0x11,
+}
+
+
+class OpLayout(NamedTuple):
+    """
+    Layout of one unit of a precompile input.
+
+    unit_size: Size of one unit in bytes
+    repeated: Whether the input is any positive number of units (MSM, pairing)
+        or exactly one unit
+    g1_points: Offsets of the G1 points within the unit
+    g2_points: Offsets of the G2 points within the unit
+    field_elements: Offsets of the field element slots not part of a point
+    scalars: Offsets of the scalars within the unit
+    """
+
+    unit_size: int
+    repeated: bool
+    g1_points: Tuple[int, ...] = ()
+    g2_points: Tuple[int, ...] = ()
+    field_elements: Tuple[int, ...] = ()
+    scalars: Tuple[int, ...] = ()
+
+    def fp_slots(self) -> Tuple[int, ...]:
+        """Offsets of every 64-byte field element slot within the unit."""
+        slots = list(self.field_elements)
+        for offset in self.g1_points:
+            slots += [offset, offset + FP_SIZE]
+        for offset in self.g2_points:
+            slots += [offset + i * FP_SIZE for i in range(4)]
+        return tuple(sorted(slots))
+
+    def is_valid_length(self, length: int) -> bool:
+        """Check that an input length matches the layout."""
+        if self.repeated:
+            return length > 0 and length % self.unit_size == 0
+        return length == self.unit_size
+
+
+LAYOUTS = {
+    "g1_add": OpLayout(2 * G1_POINT_SIZE, False, g1_points=(0, G1_POINT_SIZE)),
+    "g2_add": OpLayout(2 * G2_POINT_SIZE, False, g2_points=(0, G2_POINT_SIZE)),
+    "g1_msm": OpLayout(
+        LENGTH_PER_PAIR_G1, True, g1_points=(0,), scalars=(G1_POINT_SIZE,)
+    ),
+    "g2_msm": OpLayout(
+        LENGTH_PER_PAIR_G2, True, g2_points=(0,), scalars=(G2_POINT_SIZE,)
+    ),
+    "map_fp_to_g1": OpLayout(FP_SIZE, False, field_elements=(0,)),
+    "map_fp2_to_g2": OpLayout(2 * FP_SIZE, False, field_elements=(0, FP_SIZE)),
+    "pairing": OpLayout(
+        LENGTH_PER_PAIR_PAIRING,
+        True,
+        g1_points=(0,),
+        g2_points=(G1_POINT_SIZE,),
+    ),
+}
+
+OPS = tuple(LAYOUTS)
+
+# Precompile of the Hypothesis tests of each test module
+TEST_MODULE_OPS = {
+    "test_g1_add": "g1_add",
+    "test_g2_add": "g2_add",
+    "test_g1_msm": "g1_msm",
+    "test_g2_msm": "g2_msm",
+    "test_pairing": "pairing",
+    "test_bls12_map_fp_to_g1": "map_fp_to_g1",
+    "test_bls12_map_fp_to_g2": "map_fp2_to_g2",
+}
+
+# Output buffer sizes of the native wrapper functions
+G1_MAX_OUTPUT_SIZE = 256  # For G1 operations
+G2_MAX_OUTPUT_SIZE = 512  # For G2 operations
+PAIRING_MAX_OUTPUT_SIZE = 32  # For pairing operations
+
+# C functions of the native wrappers and their output buffer sizes
+PRECOMPILE_FUNCTIONS = (
+    ("g1_add_wrapper", G1_MAX_OUTPUT_SIZE),
+    ("g2_add_wrapper", G2_MAX_OUTPUT_SIZE),
+    ("g1_msm_wrapper", G1_MAX_OUTPUT_SIZE),
+    ("g2_msm_wrapper", G2_MAX_OUTPUT_SIZE),
+    ("map_fp_to_g1_wrapper", G1_MAX_OUTPUT_SIZE),
+    ("map_fp2_to_g2_wrapper", G2_MAX_OUTPUT_SIZE),
+    ("pairing_wrapper", PAIRING_MAX_OUTPUT_SIZE),
+)
+
+# Build profiles of `make profiles`, each in build/<profile>/
+BUILD_PROFILES = ("debug", "release", "lto", "pgo")
+
+
+# Libraries of the Rust wrapper, built once per BLS12-381 backend of revm
+RUST_BACKEND_LIBS = {
+    "blst": "librevm_wrapper.so",
+    "arkworks": "librevm_wrapper_arkworks.so",
+}
+
+# revm-precompile release built by each backend (wrappers/rust/Cargo.toml),
+# the same one with and without its `blst` feature
+RUST_BACKEND_VERSIONS = {
+    "blst": "21.0.0",
+    "arkworks": "21.0.0",
+}
+
+# revm-precompile release run by the revm of the `evm` feature (revm =19.0.0)
+RUST_EVM_VERSION = "16.0.0"
+
+
+def rust_implementation_name(backend: str) -> str:
+    """Implementation name of a Rust backend: "rust" for blst, "rust_<backend>" otherwise."""
+    return "rust" if backend == "blst" else f"rust_{backend}"
@@ -0,0 +1,299 @@
+"""
+Per-call instrumentation of the implementations under test.
+
+Each (implementation, op) series counts calls and errors and records call
+latencies in an HDR-style histogram: log-linear buckets with
+2^HISTOGRAM_PRECISION_BITS sub-buckets per power of two nanoseconds (about 3%
+relative error), held in preallocated lists that recording only increments.
+
+Enabled by FUZZ_METRICS_DIR. Every process writes metrics-<process>.json and
+metrics-<process>.prom (Prometheus text format) to that directory at exit, and
+every FUZZ_METRICS_INTERVAL seconds when set. <process> is the pytest-xdist
+worker id, or "main".
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from . import settings
+
+HISTOGRAM_PRECISION_BITS = 5
+SUB_BUCKETS = 1 << HISTOGRAM_PRECISION_BITS
+# Highest recorded latency: 2^40 ns (about 18 minutes)
+MAX_VALUE_BITS = 40
+HISTOGRAM_SIZE = (MAX_VALUE_BITS - HISTOGRAM_PRECISION_BITS + 1) * SUB_BUCKETS
+
+# Quantiles exported as gauges
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+# Bucket bounds of the exported Prometheus histograms, in seconds
+PROMETHEUS_BUCKETS = tuple(
+    mantissa * 10.0**exponent for exponent in range(-6, 2) for mantissa in (1, 2, 5)
+)
+
+PROCESS_NAME = os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+def bucket_index(value: int) -> int:
+    """Histogram bucket of a latency in nanoseconds."""
+    shift = value.bit_length() - HISTOGRAM_PRECISION_BITS - 1
+    if shift <= 0:
+        return value
+    return min(
+        (shift << HISTOGRAM_PRECISION_BITS) + (value >> shift), HISTOGRAM_SIZE - 1
+    )
+
+
+def bucket_lower_bound(index: int) -> int:
+    """Smallest latency in nanoseconds falling in a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = (index >> HISTOGRAM_PRECISION_BITS) - 1
+    return (index - (shift << HISTOGRAM_PRECISION_BITS)) << shift
+
+
+# Indices of the Series.totals counters
+ERRORS = 0
+TOTAL_NS = 1
+
+
+class Series:
+    """Call count, error count and latency histogram of one (implementation, op)."""
+
+    __slots__ = ("implementation", "op", "totals", "histogram")
+
+    def __init__(self, implementation: str, op: str):
+        self.implementation = implementation
+        self.op = op
+        self.totals = [0, 0]
+        self.histogram = [0] * HISTOGRAM_SIZE
+
+    @property
+    def calls(self) -> int:
+        return sum(self.histogram)
+
+    @property
+    def errors(self) -> int:
+        return self.totals[ERRORS]
+
+    @property
+    def total_ns(self) -> int:
+        return self.totals[TOTAL_NS]
+
+    def record(self, elapsed_ns: int, error: bool = False):
+        self.totals[ERRORS] += error
+        self.totals[TOTAL_NS] += elapsed_ns
+        self.histogram[bucket_index(elapsed_ns)] += 1
+
+    def quantile(self, q: float) -> int:
+        """Latency quantile in nanoseconds (lower bound of its bucket)."""
+        target = q * self.calls
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return bucket_lower_bound(index)
+        return 0
+
+    def count_below(self, bound_ns: float) -> int:
+        """Number of calls faster than bound_ns."""
+        return sum(
+            count
+            for index, count in enumerate(self.histogram)
+            if count and bucket_lower_bound(index) < bound_ns
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "implementation": self.implementation,
+            "op": self.op,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": self.total_ns / 1e9,
+            "mean_seconds": self.total_ns / self.calls / 1e9 if self.calls else 0.0,
+            "quantiles_seconds": {str(q): self.quantile(q) / 1e9 for q in QUANTILES},
+            # Non-empty buckets: lower bound in nanoseconds -> count
+            "histogram_ns": {
+                str(bucket_lower_bound(index)): count
+                for index, count in enumerate(self.histogram)
+                if count
+            },
+        }
+
+
+class Registry:
+    """All the series of the process."""
+
+    def __init__(self):
+        self.series: Dict[Tuple[str, str], Series] = {}
+
+    def get(self, implementation: str, op: str) -> Series:
+        key = (implementation, op)
+        if key not in self.series:
+            self.series[key] = Series(implementation, op)
+        return self.series[key]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "process": PROCESS_NAME,
+                "series": [series.to_dict() for series in self.series.values()],
+            },
+            indent=2,
+        )
+
+    def to_prometheus(self) -> str:
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(series: Series, **extra) -> str:
+            values = {
+                "implementation": series.implementation,
+                "op": series.op,
+                "process": PROCESS_NAME,
+                **extra,
+            }
+            return ",".join(f'{key}="{value}"' for key, value in values.items())
+
+        metric("fuzz_calls_total", "counter", "Calls per implementation and op")
+        for series in self.series.values():
+            lines.append(f"fuzz_calls_total{{{labels(series)}}} {series.calls}")
+        metric("fuzz_errors_total", "counter", "Calls that raised RuntimeError")
+        for series in self.series.values():
+            lines.append(f"fuzz_errors_total{{{labels(series)}}} {series.errors}")
+        metric("fuzz_call_duration_seconds", "histogram", "Call latency")
+        for series in self.series.values():
+            for bound in PROMETHEUS_BUCKETS:
+                count = series.count_below(bound * 1e9)
+                lines.append(
+                    "fuzz_call_duration_seconds_bucket"
+                    f"{{{labels(series, le=f'{bound:g}')}}} {count}"
+                )
+            lines.append(
+                "fuzz_call_duration_seconds_bucket"
+                f"{{{labels(series, le='+Inf')}}} {series.calls}"
+            )
+            lines.append(
+                f"fuzz_call_duration_seconds_sum{{{labels(series)}}} "
+                f"{series.total_ns / 1e9}"
+            )
+            lines.append(
+                f"fuzz_call_duration_seconds_count{{{labels(series)}}} {series.calls}"
+            )
+        metric("fuzz_call_duration_quantile_seconds", "gauge", "Latency quantiles")
+        for series in self.series.values():
+            for q in QUANTILES:
+                lines.append(
+                    "fuzz_call_duration_quantile_seconds"
+                    f"{{{labels(series, quantile=str(q))}}} {series.quantile(q) / 1e9}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: Path):
+        """Write metrics-<process>.json and .prom, replacing them atomically."""
+        directory.mkdir(parents=True, exist_ok=True)
+        for suffix, content in (
+            (".json", self.to_json()),
+            (".prom", self.to_prometheus()),
+        ):
+            path = directory / f"metrics-{PROCESS_NAME}{suffix}"
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(content)
+            os.replace(tmp_path, path)
+
+
+REGISTRY = Registry()
+
+
+def instrument(implementation: str, op: str, function: Callable) -> Callable:
+    """Wrap a precompile function to record its calls in REGISTRY."""
+    series = REGISTRY.get(implementation, op)
+    histogram = series.histogram
+    totals = series.totals
+    precision = HISTOGRAM_PRECISION_BITS
+    min_shift = precision + 1
+    last_bucket = HISTOGRAM_SIZE - 1
+
+    # Series.record() inlined: this runs on every call of every implementation
+    def instrumented(input_bytes):
+        start = perf_counter_ns()
+        try:
+            return function(input_bytes)
+        except RuntimeError:
+            totals[ERRORS] += 1
+            raise
+        finally:
+            elapsed = perf_counter_ns() - start
+            totals[TOTAL_NS] += elapsed
+            shift = elapsed.bit_length() - min_shift
+            if shift <= 0:
+                histogram[elapsed] += 1
+            else:
+                histogram[
+                    min((shift << precision) + (elapsed >> shift), last_bucket)
+                ] += 1
+
+    return instrumented
+
+
+class InstrumentedImplementation:
+    """
+    Proxy recording the calls of an implementation object (e.g. EELSWrapper).
+    Batches of run_batch() are recorded as one call per input, with the
+    average latency of the batch.
+    """
+
+    def __init__(self, name: str, implementation, ops: Iterable[str]):
+        self._implementation = implementation
+        self._name = name
+        for op in ops:
+            setattr(self, op, instrument(name, op, getattr(implementation, op)))
+        if hasattr(implementation, "run_batch"):
+            self.run_batch = self._run_batch
+
+    def _run_batch(self, op: str, inputs):
+        start = perf_counter_ns()
+        outcomes = self._implementation.run_batch(op, inputs)
+        if outcomes:
+            series = REGISTRY.get(self._name, op)
+            elapsed = (perf_counter_ns() - start) // len(outcomes)
+            for ok, _ in outcomes:
+                series.record(elapsed, error=not ok)
+        return outcomes
+
+    def __getattr__(self, name):
+        return getattr(self._implementation, name)
+
+
+_exporter_started = False
+
+
+def start_exporter(directory: Optional[Path] = None, interval: Optional[float] = None):
+    """
+    Write the metrics at exit, and every `interval` seconds from a daemon
+    thread when it is positive (defaults to the FUZZ_METRICS_* settings).
+    """
+    global _exporter_started
+    if _exporter_started:
+        return
+    _exporter_started = True
+    directory = Path(directory or settings.METRICS_DIR)
+    interval = settings.METRICS_INTERVAL if interval is None else interval
+    atexit.register(REGISTRY.write, directory)
+
+    def export_periodically():
+        while True:
+            time.sleep(interval)
+            REGISTRY.write(directory)
+
+    if interval > 0:
+        threading.Thread(target=export_periodically, daemon=True).start()
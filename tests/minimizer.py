@@ -0,0 +1,302 @@
+"""
+Delta-debugging minimizer for divergent EIP-2537 inputs.
+
+Byte-level shrinking does not know the input structure and runs every
+implementation, EELS included, on every candidate. This minimizer works on
+the units and slots described in layouts.py:
+
+1. ddmin over the pairs of MSM and pairing inputs (keep or drop chunks of pairs)
+2. replace points with infinity or the generator, scalars and standalone
+   field elements with 0 or 1
+
+Only one implementation of each disagreeing outcome group is re-run (natives
+preferred over the EELS oracle), and the candidates of each step are
+evaluated in parallel; the first divergent candidate in order is kept, so the
+result does not depend on the number of workers. A candidate is divergent
+when it splits the implementations into the same groups as the original
+input, so that the minimized input reproduces the same divergence rather
+than another one found on the way.
+
+Usage:
+    uv run python -m tests.minimizer g2_msm build/divergences/g2_msm-1234.bin
+    uv run python -m tests.minimizer pairing --input "b'\\x00...'"
+        [--implementations rust,go,python] [--workers 8] [--output out.bin]
+"""
+
+import argparse
+import ast
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .curve import G1_GENERATOR, G2_GENERATOR, g1_to_bytes, g2_to_bytes
+from .differential import Outcome, is_divergent, outcome_groups, run_all
+from .layouts import FP_SIZE, G1_POINT_SIZE, G2_POINT_SIZE, LAYOUTS, SCALAR_SIZE
+
+# Replacement values of each kind of slot, simplest first
+G1_REPLACEMENTS = (bytes(G1_POINT_SIZE), g1_to_bytes(G1_GENERATOR))
+G2_REPLACEMENTS = (bytes(G2_POINT_SIZE), g2_to_bytes(G2_GENERATOR))
+SCALAR_REPLACEMENTS = (bytes(SCALAR_SIZE), (1).to_bytes(SCALAR_SIZE, "big"))
+FP_REPLACEMENTS = (bytes(FP_SIZE), (1).to_bytes(FP_SIZE, "big"))
+
+# Edit of an input: (start offset, replacement bytes)
+Edit = Tuple[int, bytes]
+
+
+def _slot_replacements(op: str) -> List[Tuple[int, Tuple[bytes, ...]]]:
+    layout = LAYOUTS[op]
+    slots = (
+        [(offset, G1_REPLACEMENTS) for offset in layout.g1_points]
+        + [(offset, G2_REPLACEMENTS) for offset in layout.g2_points]
+        + [(offset, SCALAR_REPLACEMENTS) for offset in layout.scalars]
+        + [(offset, FP_REPLACEMENTS) for offset in layout.field_elements]
+    )
+    return sorted(slots)
+
+
+def outcome_partition(outcomes: Mapping[str, Outcome]) -> FrozenSet[FrozenSet[str]]:
+    """Groups of the implementations with the same outcome, whatever the outcomes."""
+    return frozenset(frozenset(names) for names in outcome_groups(outcomes).values())
+
+
+def disagreeing_implementations(
+    implementations: Mapping[str, object],
+    outcomes: Mapping[str, Outcome],
+    oracle_name: str = "python",
+) -> Dict[str, object]:
+    """One implementation of each outcome group, preferring the natives."""
+    chosen = {}
+    for names in outcome_groups(outcomes).values():
+        name = min(names, key=lambda name: name == oracle_name)
+        chosen[name] = implementations[name]
+    return chosen
+
+
+class Minimizer:
+    """Structure-aware minimizer of the divergent inputs of one precompile."""
+
+    def __init__(
+        self,
+        op: str,
+        implementations: Mapping[str, object],
+        workers: Optional[int] = None,
+        max_calls: int = 5000,
+    ):
+        """
+        Args:
+            op: Precompile name
+            implementations: Implementations that disagree on the input
+            workers: Number of candidates evaluated in parallel
+            max_calls: Maximum number of candidates evaluated
+        """
+        self.op = op
+        self.layout = LAYOUTS[op]
+        self.implementations = dict(implementations)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_calls = max_calls
+        self.calls = 0
+        # Outcome groups of the input being minimized, set by minimize()
+        self.partition: Optional[FrozenSet[FrozenSet[str]]] = None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def is_divergent(self, input_bytes: bytes) -> bool:
+        """Whether the input reproduces the outcome groups of the original one."""
+        outcomes = run_all(self.implementations, self.op, input_bytes)
+        if self.partition is None:
+            return is_divergent(outcomes)
+        return is_divergent(outcomes) and outcome_partition(outcomes) == self.partition
+
+    def first_divergent(self, candidates: Sequence[bytes]) -> Optional[int]:
+        """Index of the first divergent candidate, evaluating them in parallel."""
+        for start in range(0, len(candidates), self.workers):
+            if self.calls >= self.max_calls:
+                return None
+            window = candidates[start : start + self.workers]
+            self.calls += len(window)
+            for index, divergent in enumerate(
+                self._executor.map(self.is_divergent, window), start=start
+            ):
+                if divergent:
+                    return index
+        return None
+
+    def drop_units(self, input_bytes: bytes) -> bytes:
+        """ddmin over the units of a repeated layout (at least one unit is kept)."""
+        size = self.layout.unit_size
+        units = [input_bytes[i : i + size] for i in range(0, len(input_bytes), size)]
+        parts = 2
+        while len(units) > 1:
+            parts = min(parts, len(units))
+            bounds = [len(units) * i // parts for i in range(parts + 1)]
+            chunks = [units[bounds[i] : bounds[i + 1]] for i in range(parts)]
+            subsets = [b"".join(chunk) for chunk in chunks]
+            index = self.first_divergent(subsets)
+            if index is not None:
+                units, parts = chunks[index], 2
+                continue
+            complements = [
+                b"".join(units[: bounds[i]] + units[bounds[i + 1] :])
+                for i in range(parts)
+            ]
+            index = self.first_divergent(complements) if parts > 2 else None
+            if index is not None:
+                units = units[: bounds[index]] + units[bounds[index + 1] :]
+                parts = max(parts - 1, 2)
+                continue
+            if parts == len(units) or self.calls >= self.max_calls:
+                break
+            parts = min(2 * parts, len(units))
+        return b"".join(units)
+
+    def _edits(self, input_bytes: bytes) -> Iterator[Edit]:
+        slots = _slot_replacements(self.op)
+        for unit in range(0, len(input_bytes), self.layout.unit_size):
+            for offset, replacements in slots:
+                start = unit + offset
+                current = input_bytes[start : start + len(replacements[0])]
+                for replacement in replacements:
+                    if replacement == current:
+                        break
+                    yield start, replacement
+
+    @staticmethod
+    def _apply(input_bytes: bytes, edit: Edit) -> bytes:
+        start, replacement = edit
+        return (
+            input_bytes[:start] + replacement + input_bytes[start + len(replacement) :]
+        )
+
+    def simplify_slots(self, input_bytes: bytes) -> bytes:
+        """Replace points, scalars and field elements with the simplest values."""
+        edits = list(self._edits(input_bytes))
+        position = 0
+        while position < len(edits) and self.calls < self.max_calls:
+            window = edits[position : position + self.workers]
+            candidates = [self._apply(input_bytes, edit) for edit in window]
+            index = self.first_divergent(candidates)
+            if index is None:
+                position += len(window)
+                continue
+            input_bytes = candidates[index]
+            start = window[index][0]
+            # Skip the other (more complex) replacements of the same slot
+            position += index + 1
+            while position < len(edits) and edits[position][0] == start:
+                position += 1
+        return input_bytes
+
+    def minimize(self, input_bytes: bytes) -> bytes:
+        """Minimize a divergent input until no reduction applies."""
+        if not self.layout.is_valid_length(len(input_bytes)):
+            return input_bytes
+        self.partition = outcome_partition(
+            run_all(self.implementations, self.op, input_bytes)
+        )
+        while True:
+            reduced = input_bytes
+            if self.layout.repeated:
+                reduced = self.drop_units(reduced)
+            reduced = self.simplify_slots(reduced)
+            if reduced == input_bytes or self.calls >= self.max_calls:
+                return reduced
+            input_bytes = reduced
+
+    def close(self):
+        self._executor.shutdown()
+
+
+def minimize_divergence(
+    op: str,
+    input_bytes: bytes,
+    implementations: Mapping[str, object],
+    outcomes: Optional[Mapping[str, Outcome]] = None,
+    workers: Optional[int] = None,
+    max_calls: int = 5000,
+) -> bytes:
+    """
+    Minimize an input on which the implementations disagree, re-running only
+    one implementation of each disagreeing group.
+    """
+    if outcomes is None:
+        outcomes = run_all(implementations, op, input_bytes)
+    if not is_divergent(outcomes):
+        return input_bytes
+    minimizer = Minimizer(
+        op, disagreeing_implementations(implementations, outcomes), workers, max_calls
+    )
+    try:
+        return minimizer.minimize(input_bytes)
+    finally:
+        minimizer.close()
+
+
+def _parse_input(value: str) -> bytes:
+    """Hex string or Python bytes literal (as printed by Hypothesis)."""
+    if value.startswith(("b'", 'b"')):
+        return ast.literal_eval(value)
+    return bytes.fromhex(value.removeprefix("0x"))
+
+
+def main():
+    from .LibCallerWrapper import IMPLEMENTATIONS
+
+    parser = argparse.ArgumentParser(description="Minimize a divergent input")
+    parser.add_argument("op", choices=LAYOUTS)
+    parser.add_argument("path", nargs="?", type=Path, help="raw input file")
+    parser.add_argument("--input", help="hex string or Python bytes literal")
+    parser.add_argument("--implementations", default=",".join(IMPLEMENTATIONS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-calls", type=int, default=5000)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.input is not None:
+        input_bytes = _parse_input(args.input)
+    elif args.path is not None:
+        input_bytes = args.path.read_bytes()
+    else:
+        parser.error("either a path or --input is required")
+
+    implementations = {
+        name: IMPLEMENTATIONS[name] for name in args.implementations.split(",")
+    }
+    outcomes = run_all(implementations, args.op, input_bytes)
+    if not is_divergent(outcomes):
+        parser.exit(1, "the implementations agree on this input\n")
+
+    chosen = disagreeing_implementations(implementations, outcomes)
+    start = time.perf_counter()
+    minimizer = Minimizer(args.op, chosen, args.workers, args.max_calls)
+    try:
+        minimized = minimizer.minimize(input_bytes)
+    finally:
+        minimizer.close()
+    elapsed = time.perf_counter() - start
+
+    output = args.output or (args.path or Path(f"{args.op}")).with_suffix(".min.bin")
+    output.write_bytes(minimized)
+    print(f"re-run: {', '.join(chosen)}")
+    print(
+        f"{len(input_bytes)} -> {len(minimized)} bytes, "
+        f"{minimizer.calls} candidates, {elapsed:.2f}s"
+    )
+    for key, names in outcome_groups(
+        run_all(implementations, args.op, minimized)
+    ).items():
+        print(f"{','.join(names)}: {key.hex() if key is not None else 'error'}")
+    print(f"written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Structure-aware mutator for EIP-2537 encodings.
+
+Most interesting divergences sit a few bytes away from a valid encoding. The
+mutator takes already valid inputs and applies targeted edits to the field
+element slots, points and scalars described in layouts.py, which is far
+cheaper than generating new curve points.
+"""
+
+from random import Random
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from hypothesis import strategies as st
+
+from .layouts import FP_PADDING_SIZE, FP_SIZE, LAYOUTS, SCALAR_SIZE, OpLayout
+from .strategies import BLS12_381_PRIME, BLS12_381_SCALAR_FIELD
+from .timing import composite
+
+# Field element values on the edge of the canonical range
+EDGE_FIELD_VALUES = (
+    0,
+    1,
+    BLS12_381_PRIME - 1,
+    BLS12_381_PRIME,
+    BLS12_381_PRIME + 1,
+    2 ** (8 * (FP_SIZE - FP_PADDING_SIZE)) - 1,
+)
+
+# Scalar values on the edge of the scalar field
+EDGE_SCALAR_VALUES = (
+    0,
+    1,
+    BLS12_381_SCALAR_FIELD - 1,
+    BLS12_381_SCALAR_FIELD,
+    BLS12_381_SCALAR_FIELD + 1,
+    2 ** (8 * SCALAR_SIZE) - 1,
+)
+
+
+def _units(data: bytearray, layout: OpLayout) -> int:
+    return len(data) // layout.unit_size
+
+
+def _random_unit_offset(data: bytearray, layout: OpLayout, rng: Random) -> int:
+    return rng.randrange(_units(data, layout)) * layout.unit_size
+
+
+def _points(layout: OpLayout) -> List[Tuple[int, int]]:
+    """(offset, number of field elements per coordinate) of each point in a unit."""
+    return [(offset, 1) for offset in layout.g1_points] + [
+        (offset, 2) for offset in layout.g2_points
+    ]
+
+
+def _write_fp(data: bytearray, offset: int, value: int):
+    data[offset : offset + FP_SIZE] = value.to_bytes(FP_SIZE, byteorder="big")
+
+
+def _read_fp(data: bytearray, offset: int) -> int:
+    return int.from_bytes(data[offset : offset + FP_SIZE], byteorder="big")
+
+
+def nonzero_padding(data: bytearray, layout: OpLayout, rng: Random):
+    """Set a byte of the 16 zero padding bytes of a field element slot."""
+    if not layout.fp_slots():
+        return
+    slot = _random_unit_offset(data, layout, rng) + rng.choice(layout.fp_slots())
+    data[slot + rng.randrange(FP_PADDING_SIZE)] = rng.randrange(1, 256)
+
+
+def edge_field_value(data: bytearray, layout: OpLayout, rng: Random):
+    """Replace a field element slot with a value around p (or 0, 1, 2^384 - 1)."""
+    if not layout.fp_slots():
+        return
+    slot = _random_unit_offset(data, layout, rng) + rng.choice(layout.fp_slots())
+    _write_fp(data, slot, rng.choice(EDGE_FIELD_VALUES))
+
+
+def add_modulus(data: bytearray, layout: OpLayout, rng: Random):
+    """Add p to a field element slot, giving a non-canonical encoding of the same value."""
+    if not layout.fp_slots():
+        return
+    slot = _random_unit_offset(data, layout, rng) + rng.choice(layout.fp_slots())
+    value = _read_fp(data, slot) + BLS12_381_PRIME
+    if value < 2 ** (8 * (FP_SIZE - FP_PADDING_SIZE)):
+        _write_fp(data, slot, value)
+
+
+def flip_y_sign(data: bytearray, layout: OpLayout, rng: Random):
+    """
+    Replace y with p - y. On a G2 point, only one of the two y components is
+    negated half of the time, which moves the point off the curve.
+    """
+    if not _points(layout):
+        return
+    offset, width = rng.choice(_points(layout))
+    y_offset = _random_unit_offset(data, layout, rng) + offset + width * FP_SIZE
+    components = range(width)
+    if width == 2 and rng.random() < 0.5:
+        components = [rng.randrange(2)]
+    for component in components:
+        slot = y_offset + component * FP_SIZE
+        _write_fp(data, slot, (-_read_fp(data, slot)) % BLS12_381_PRIME)
+
+
+def infinity_point(data: bytearray, layout: OpLayout, rng: Random):
+    """Replace a point with the all-zero encoding of the point at infinity."""
+    if not _points(layout):
+        return
+    offset, width = rng.choice(_points(layout))
+    start = _random_unit_offset(data, layout, rng) + offset
+    data[start : start + 2 * width * FP_SIZE] = bytes(2 * width * FP_SIZE)
+
+
+def zero_coordinate(data: bytearray, layout: OpLayout, rng: Random):
+    """Zero only one coordinate of a point (almost infinity)."""
+    if not _points(layout):
+        return
+    offset, width = rng.choice(_points(layout))
+    start = (
+        _random_unit_offset(data, layout, rng)
+        + offset
+        + rng.randrange(2) * width * FP_SIZE
+    )
+    data[start : start + width * FP_SIZE] = bytes(width * FP_SIZE)
+
+
+def edge_scalar(data: bytearray, layout: OpLayout, rng: Random):
+    """Replace a scalar with a value around r (or 0, 1, 2^256 - 1)."""
+    if not layout.scalars:
+        return
+    start = _random_unit_offset(data, layout, rng) + rng.choice(layout.scalars)
+    data[start : start + SCALAR_SIZE] = rng.choice(EDGE_SCALAR_VALUES).to_bytes(
+        SCALAR_SIZE, byteorder="big"
+    )
+
+
+def add_scalar_field(data: bytearray, layout: OpLayout, rng: Random):
+    """Add r to a scalar when it still fits in 32 bytes (same result, scalar >= r)."""
+    if not layout.scalars:
+        return
+    start = _random_unit_offset(data, layout, rng) + rng.choice(layout.scalars)
+    value = int.from_bytes(data[start : start + SCALAR_SIZE], byteorder="big")
+    value += BLS12_381_SCALAR_FIELD
+    if value < 2 ** (8 * SCALAR_SIZE):
+        data[start : start + SCALAR_SIZE] = value.to_bytes(SCALAR_SIZE, "big")
+
+
+def duplicate_unit(data: bytearray, layout: OpLayout, rng: Random):
+    """Duplicate a pair of a repeated input."""
+    if not layout.repeated:
+        return
+    start = _random_unit_offset(data, layout, rng)
+    data[start:start] = data[start : start + layout.unit_size]
+
+
+def drop_unit(data: bytearray, layout: OpLayout, rng: Random):
+    """Remove a pair of a repeated input, keeping at least one."""
+    if not layout.repeated or _units(data, layout) < 2:
+        return
+    start = _random_unit_offset(data, layout, rng)
+    del data[start : start + layout.unit_size]
+
+
+def swap_units(data: bytearray, layout: OpLayout, rng: Random):
+    """Swap two pairs of a repeated input."""
+    if not layout.repeated or _units(data, layout) < 2:
+        return
+    first = _random_unit_offset(data, layout, rng)
+    second = _random_unit_offset(data, layout, rng)
+    size = layout.unit_size
+    unit = data[first : first + size]
+    data[first : first + size] = data[second : second + size]
+    data[second : second + size] = unit
+
+
+def bit_flip(data: bytearray, layout: OpLayout, rng: Random):
+    """Flip a single bit anywhere in the input."""
+    if data:
+        data[rng.randrange(len(data))] ^= 1 << rng.randrange(8)
+
+
+def resize(data: bytearray, layout: OpLayout, rng: Random):
+    """Add or remove a few trailing bytes, breaking the length check."""
+    delta = rng.choice((-32, -1, 1, 32))
+    if delta < 0:
+        del data[delta:]
+    else:
+        data.extend(bytes(delta))
+
+
+MUTATIONS: Dict[str, Callable[[bytearray, OpLayout, Random], None]] = {
+    "nonzero_padding": nonzero_padding,
+    "edge_field_value": edge_field_value,
+    "add_modulus": add_modulus,
+    "flip_y_sign": flip_y_sign,
+    "infinity_point": infinity_point,
+    "zero_coordinate": zero_coordinate,
+    "edge_scalar": edge_scalar,
+    "add_scalar_field": add_scalar_field,
+    "duplicate_unit": duplicate_unit,
+    "drop_unit": drop_unit,
+    "swap_units": swap_units,
+    "bit_flip": bit_flip,
+    "resize": resize,
+}
+
+
+# Mutations that only apply to layouts with points, scalars or repeated units
+POINT_MUTATIONS = {"flip_y_sign", "infinity_point", "zero_coordinate"}
+SCALAR_MUTATIONS = {"edge_scalar", "add_scalar_field"}
+UNIT_MUTATIONS = {"duplicate_unit", "drop_unit", "swap_units"}
+
+
+def applicable_mutations(layout: OpLayout) -> List[str]:
+    """Names of the mutations that can change an input with this layout."""
+    excluded = set()
+    if not _points(layout):
+        excluded |= POINT_MUTATIONS
+    if not layout.scalars:
+        excluded |= SCALAR_MUTATIONS
+    if not layout.repeated:
+        excluded |= UNIT_MUTATIONS
+    return [name for name in MUTATIONS if name not in excluded]
+
+
+def mutate(
+    op: str, input_bytes: bytes, rng: Random, max_mutations: int = 3
+) -> Tuple[bytes, List[str]]:
+    """
+    Apply 1 to max_mutations random mutations to a valid input of `op`.
+
+    Returns:
+        The mutated input and the names of the applied mutations
+    """
+    layout = LAYOUTS[op]
+    names = applicable_mutations(layout)
+    data = bytearray(input_bytes)
+    applied = []
+    for _ in range(rng.randint(1, max_mutations)):
+        name = rng.choice(names)
+        # Structural mutations need whole units to work with
+        if not layout.is_valid_length(len(data)) and name != "bit_flip":
+            continue
+        MUTATIONS[name](data, layout, rng)
+        applied.append(name)
+    return bytes(data), applied
+
+
+def mutate_corpus(
+    op: str, corpus: Iterable[bytes], variants: int, seed: int = 0
+) -> Iterator[bytes]:
+    """Yield `variants` mutated inputs of `op` derived from the corpus inputs."""
+    corpus = list(corpus)
+    rng = Random(seed)
+    for _ in range(variants):
+        yield mutate(op, rng.choice(corpus), rng)[0]
+
+
+@composite
+def mutated_input_bytes(draw, op, base_strategy, max_mutations=3):
+    """
+    Draw a valid input from base_strategy and apply structure-aware mutations.
+    The randomness is drawn from Hypothesis, so failing examples still shrink.
+    """
+    input_bytes = draw(base_strategy)
+    rng = draw(st.randoms(use_true_random=False))
+    return mutate(op, input_bytes, rng, max_mutations)[0]
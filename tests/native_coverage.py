@@ -0,0 +1,168 @@
+"""
+Edge coverage feedback from the instrumented native builds (FUZZ_NATIVE_COVERAGE=1).
+
+`make coverage` builds both wrappers into build/coverage/ with 8-bit edge
+counters: SanitizerCoverage inline counters for the Rust wrapper and its
+dependencies (revm-precompile included), the libFuzzer instrumentation of the
+Go compiler for the Go wrapper and go-ethereum. Both libraries export the
+counters through the same C functions:
+
+    size_t coverage_counters_size(void);
+    int32_t coverage_collect(uint8_t *output, size_t output_capacity,
+                             size_t *output_len);
+
+coverage_collect copies the counters hit since the last collection and resets
+them. After each call, EdgeCoverage buckets the hit counts like AFL (1, 2, 3,
+4-7, 8-15, 16-31, 32-127, 128+) and an input setting a (edge, bucket) pair not
+seen before is kept in the corpus: written to FUZZ_CORPUS_DIR/<op>/ by every
+run, and mutated by the raw fuzz loop.
+"""
+
+import ctypes
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import settings
+
+DEFAULT_CORPUS_DIR = Path(__file__).parent.parent / "build" / "corpus"
+
+
+def _hit_bucket(count: int) -> int:
+    if count <= 3:
+        return (0, 1, 2, 4)[count]
+    for bit, upper in enumerate((7, 15, 31, 127), start=3):
+        if count <= upper:
+            return 1 << bit
+    return 128
+
+
+# bytes.translate table mapping a hit count to its bucket bit
+HIT_BUCKETS = bytes(_hit_bucket(count) for count in range(256))
+
+
+class Corpus:
+    """Inputs that reached new native edges, by op, mirrored to a directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._inputs: Dict[str, List[bytes]] = {}
+
+    def inputs(self, op: str) -> List[bytes]:
+        """Kept inputs of `op`, starting with those of previous runs."""
+        if op not in self._inputs:
+            op_dir = self.directory / op
+            paths = sorted(op_dir.glob("*.bin")) if op_dir.is_dir() else []
+            self._inputs[op] = [path.read_bytes() for path in paths]
+        return self._inputs[op]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of kept inputs of each op loaded so far."""
+        return {op: len(inputs) for op, inputs in self._inputs.items()}
+
+    def add(self, op: str, input_bytes: bytes) -> Path:
+        digest = hashlib.sha256(input_bytes).hexdigest()[:16]
+        path = self.directory / op / f"{digest}.bin"
+        inputs = self.inputs(op)
+        # Kept already, by another implementation or a previous run
+        if path.exists():
+            return path
+        inputs.append(input_bytes)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(input_bytes)
+        return path
+
+
+CORPUS = Corpus(Path(settings.CORPUS_DIR or DEFAULT_CORPUS_DIR))
+
+
+class EdgeCoverage:
+    """Edge counters of one instrumented library."""
+
+    def __init__(self, lib_path: str, corpus: Corpus = CORPUS):
+        """
+        Args:
+            lib_path: Path to a coverage build of a wrapper
+            corpus: Where the inputs reaching new edges are kept
+        """
+        lib = ctypes.CDLL(lib_path)
+        if not hasattr(lib, "coverage_collect"):
+            raise RuntimeError(
+                f"{lib_path} does not export coverage counters, run `make coverage`"
+            )
+        lib.coverage_counters_size.restype = ctypes.c_size_t
+        lib.coverage_collect.argtypes = [
+            ctypes.c_char_p,  # output
+            ctypes.c_size_t,  # output_capacity
+            ctypes.POINTER(ctypes.c_size_t),  # output_len
+        ]
+        lib.coverage_collect.restype = ctypes.c_int32
+        self._collect = lib.coverage_collect
+        self.lib_path = lib_path
+        self.corpus = corpus
+        self.size = lib.coverage_counters_size()
+        self._buffer = ctypes.create_string_buffer(max(self.size, 1))
+        self._length = ctypes.c_size_t()
+        # Union of the bucketed hits, one byte per counter
+        self.seen = 0
+        self.new_inputs = 0
+        # Hits of the library initialization are not attributed to an input
+        self.collect()
+
+    def collect(self) -> bytes:
+        """Counters hit since the last collection (which resets them)."""
+        result = self._collect(self._buffer, self.size, ctypes.byref(self._length))
+        if result != 0:
+            raise RuntimeError(f"coverage_collect failed with error code: {result}")
+        return self._buffer.raw[: self._length.value]
+
+    def update(self) -> int:
+        """
+        Collect the hits of the last call.
+
+        Returns:
+            Number of (edge, hit bucket) pairs not seen before
+        """
+        hits = int.from_bytes(self.collect().translate(HIT_BUCKETS), "little")
+        new = hits & ~self.seen
+        if not new:
+            return 0
+        self.seen |= hits
+        return new.bit_count()
+
+    @property
+    def edges(self) -> int:
+        """Number of edges hit so far."""
+        return self.size - self.seen.to_bytes(self.size, "little").count(0)
+
+    def track(self, op: str, function: Callable) -> Callable:
+        """Wrap a precompile function to keep the inputs reaching new edges."""
+
+        def tracked(input_bytes):
+            try:
+                return function(input_bytes)
+            finally:
+                if self.update():
+                    self.new_inputs += 1
+                    self.corpus.add(op, input_bytes)
+
+        return tracked
+
+
+def format_report(coverages: Dict[str, EdgeCoverage], corpus: Corpus) -> List[str]:
+    """Edges hit by implementation and kept inputs by op."""
+    lines = [f"{'implementation':<16}{'edges':>10}{'counters':>10}{'new inputs':>12}"]
+    for name, coverage in coverages.items():
+        lines.append(
+            f"{name:<16}{coverage.edges:>10}{coverage.size:>10}"
+            f"{coverage.new_inputs:>12}"
+        )
+    lines.append(f"corpus: {corpus.directory}")
+    for op, count in corpus.counts().items():
+        lines.append(f"  {op:<16}{count:>8} inputs")
+    return lines
+
+
+def get_coverage(implementation) -> Optional[EdgeCoverage]:
+    """EdgeCoverage of an implementation, None when it is not instrumented."""
+    return getattr(implementation, "coverage", None)
@@ -0,0 +1,87 @@
+"""
+Training run of the PGO build profile (`make profile-pgo`).
+
+Every precompile of the instrumented wrappers in a directory (build/pgo-train/)
+runs on the fuzz corpus (FUZZ_CORPUS_DIR), topped up with generated inputs for
+the precompiles with few kept inputs, so that the optimized builds favour the
+paths the fuzzer exercises. The Rust builds, compiled with
+-Cprofile-generate, write their .profraw files when this process exits. The Go
+build, compiled with the `pgo` tag, writes a CPU profile between its
+pgo_profile_start and pgo_profile_stop functions.
+
+Usage:
+    uv run python -m tests.pgo_train build/pgo-train --go-profile build/pgo-data/go.pprof
+"""
+
+import argparse
+import ctypes
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from .layouts import OPS
+from .native_coverage import CORPUS, Corpus
+from .versions import bind_library, generated_inputs, is_go_library
+
+# Output buffer size of the training calls, that of the largest output (G2 point)
+OUTPUT_SIZE = 512
+
+
+def training_inputs(
+    corpus: Corpus, ops: Sequence[str], minimum: int, seed: int
+) -> Dict[str, List[bytes]]:
+    """Kept inputs of each op, and generated ones up to `minimum` inputs."""
+    inputs = {}
+    for op in ops:
+        kept = corpus.inputs(op)
+        inputs[op] = kept + generated_inputs(op, max(0, minimum - len(kept)), seed)
+    return inputs
+
+
+def train(path: Path, inputs: Dict[str, List[bytes]], rounds: int):
+    """Run every input `rounds` times through the precompiles of a library."""
+    functions = bind_library(
+        str(path), "ctypes", [(f"{op}_wrapper", OUTPUT_SIZE) for op in inputs]
+    )
+    for _ in range(rounds):
+        for op, op_inputs in inputs.items():
+            function = functions[op]
+            for input_bytes in op_inputs:
+                try:
+                    function(input_bytes)
+                except RuntimeError:
+                    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PGO training run")
+    parser.add_argument("directory", type=Path, help="instrumented wrappers")
+    parser.add_argument("--go-profile", type=Path, required=True)
+    parser.add_argument("--corpus-dir", type=Path, default=CORPUS.directory)
+    parser.add_argument(
+        "--minimum", type=int, default=256, help="inputs per op, topped up"
+    )
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    inputs = training_inputs(Corpus(args.corpus_dir), OPS, args.minimum, args.seed)
+    for op, op_inputs in inputs.items():
+        print(f"{op:<16}{len(op_inputs):>8} inputs")
+    for path in sorted(args.directory.glob("*.so")):
+        print(f"training {path}")
+        if not is_go_library(path):
+            train(path, inputs, args.rounds)
+            continue
+        library = ctypes.CDLL(str(path))
+        args.go_profile.parent.mkdir(parents=True, exist_ok=True)
+        if library.pgo_profile_start(str(args.go_profile).encode()) != 0:
+            raise RuntimeError(f"Could not start the CPU profile of {path}")
+        try:
+            train(path, inputs, args.rounds)
+        finally:
+            if library.pgo_profile_stop() != 0:
+                raise RuntimeError(f"Could not write the CPU profile of {path}")
+
+
+if __name__ == "__main__":
+    main()
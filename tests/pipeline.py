@@ -0,0 +1,323 @@
+"""
+Chained pipeline mode: the agreed outputs of a precompile are the inputs of
+the next one.
+
+The points returned by map_fp_to_g1/map_fp2_to_g2, the additions and the MSMs
+are valid subgroup points the implementations computed anyway, so no point is
+generated in Python. Every round runs four stages on a batch of inputs:
+
+- map: random field elements through map_fp_to_g1 and map_fp2_to_g2
+- add: pairs of pool points through g1_add and g2_add, each checked against
+  the MSM of the same points with scalars 1 (A + B == 1*A + 1*B)
+- msm: pool points with random (and edge) scalars through g1_msm and g2_msm
+- pairing: pool points, and for each P, Q and scalar a the input
+  (a*P, Q), (-P, a*Q) built from g1_msm and g2_msm outputs, which must
+  return 1
+
+When all implementations agree, the output points replace the oldest ones of
+a rolling pool of fresh points per group. Divergent inputs are minimized and
+recorded like in the raw fuzz mode; agreed results that break an identity
+above are counted and recorded as consistency failures.
+
+Usage:
+    uv run python -m tests.pipeline [--rounds 100] [--batch-size 32] [--seed 0]
+        [--pool-size 1024] [--implementations rust,go,python]
+"""
+
+import argparse
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from random import Random
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from .curve import CURVE_ORDER, FIELD_MODULUS
+from .differential import (
+    is_divergent,
+    record_divergence,
+    reload_changed,
+    run_all,
+    run_batch,
+)
+from .layouts import FP_SIZE, SCALAR_SIZE
+from .minimizer import minimize_divergence
+
+# Points kept per group (G1, G2)
+POOL_SIZE = 1024
+
+# Pairs of the MSM and pairing inputs drawn from the pool
+MSM_MAX_PAIRS = 8
+PAIRING_MAX_PAIRS = 4
+
+# Scalars drawn instead of a random one, each with EDGE_SCALAR_RATE
+EDGE_SCALARS = (0, 1, 2, CURVE_ORDER - 1, CURVE_ORDER, 2**256 - 1)
+EDGE_SCALAR_RATE = 1 / 16
+
+# Output of a pairing check whose product is the identity
+PAIRING_TRUE = (1).to_bytes(32, "big")
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / "build" / "pipeline-diffs"
+
+
+def negate_fp(value: bytes) -> bytes:
+    """Negation of a padded field element."""
+    fp = int.from_bytes(value, "big")
+    return ((FIELD_MODULUS - fp) % FIELD_MODULUS).to_bytes(FP_SIZE, "big")
+
+
+def negate_g1(point: bytes) -> bytes:
+    """Negation of an encoded G1 point (the point at infinity is unchanged)."""
+    return point[:FP_SIZE] + negate_fp(point[FP_SIZE:])
+
+
+class PointPool:
+    """Rolling pools of the fresh G1 and G2 points of agreed outputs."""
+
+    def __init__(self, rng: Random, size: int = POOL_SIZE):
+        self.rng = rng
+        self.points = {"g1": deque(maxlen=size), "g2": deque(maxlen=size)}
+        # Points added to each pool since the start
+        self.added = {"g1": 0, "g2": 0}
+
+    def add(self, group: str, point: bytes):
+        self.points[group].append(point)
+        self.added[group] += 1
+
+    def sample(self, group: str, count: int) -> List[bytes]:
+        """`count` points of the pool, with repetitions (empty if the pool is)."""
+        if not self.points[group]:
+            return []
+        return self.rng.choices(self.points[group], k=count)
+
+
+class Pipeline:
+    """Map, add, MSM and pairing stages chained through a PointPool."""
+
+    def __init__(
+        self,
+        implementations: Mapping[str, object],
+        seed: int,
+        batch_size: int,
+        output_dir: Path,
+        pool_size: int = POOL_SIZE,
+        minimize: bool = True,
+    ):
+        self.implementations = implementations
+        self.rng = Random(seed)
+        self.batch_size = batch_size
+        self.output_dir = output_dir
+        self.minimize = minimize
+        self.pool = PointPool(self.rng, pool_size)
+        self.stats: Dict[str, Dict[str, float]] = {}
+        # Identity checks and failures, by identity
+        self.checks: Dict[str, List[int]] = {}
+        self.generation_seconds = 0.0
+
+    def _fp(self) -> bytes:
+        return self.rng.randrange(FIELD_MODULUS).to_bytes(FP_SIZE, "big")
+
+    def _scalar(self) -> bytes:
+        if self.rng.random() < EDGE_SCALAR_RATE:
+            scalar = self.rng.choice(EDGE_SCALARS)
+        else:
+            scalar = self.rng.randrange(CURVE_ORDER)
+        return scalar.to_bytes(SCALAR_SIZE, "big")
+
+    def run(self, op: str, inputs: Sequence[bytes]) -> List[Optional[bytes]]:
+        """
+        Run `op` on every input and implementation.
+
+        Returns:
+            The agreed output of each input, None when the implementations
+            diverge or all fail
+        """
+        stats = self.stats.setdefault(
+            op, {"execs": 0, "agreed": 0, "divergences": 0, "seconds": 0.0}
+        )
+        start = time.perf_counter()
+        batch_outcomes = run_batch(self.implementations, op, inputs)
+        stats["seconds"] += time.perf_counter() - start
+        outputs = []
+        for input_bytes, outcomes in zip(inputs, batch_outcomes, strict=True):
+            stats["execs"] += 1
+            if is_divergent(outcomes):
+                stats["divergences"] += 1
+                if self.minimize:
+                    input_bytes = minimize_divergence(
+                        op, input_bytes, self.implementations, outcomes
+                    )
+                    outcomes = run_all(self.implementations, op, input_bytes)
+                path = record_divergence(self.output_dir, op, input_bytes, outcomes)
+                print(f"[{op}] divergence: {path}")
+                outputs.append(None)
+                continue
+            ok, output = next(iter(outcomes.values()))
+            if ok:
+                stats["agreed"] += 1
+            outputs.append(output if ok else None)
+        return outputs
+
+    def _check(self, identity: str, op: str, input_bytes: bytes, expected, actual):
+        """Count an identity check between agreed results, recording failures."""
+        checks = self.checks.setdefault(identity, [0, 0])
+        if expected is None or actual is None:
+            return
+        checks[0] += 1
+        if expected == actual:
+            return
+        checks[1] += 1
+        outcomes = {"expected": (True, expected), "agreed": (True, actual)}
+        path = record_divergence(
+            self.output_dir / "consistency", op, input_bytes, outcomes
+        )
+        print(f"[{identity}] consistency failure: {path}")
+
+    @contextmanager
+    def _generating(self):
+        """Time the building of the inputs of a stage as generation."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.generation_seconds += time.perf_counter() - start
+
+    def _add_outputs(self, group: str, outputs: Sequence[Optional[bytes]]):
+        for output in outputs:
+            if output is not None:
+                self.pool.add(group, output)
+
+    def map_stage(self):
+        with self._generating():
+            fp = [self._fp() for _ in range(self.batch_size)]
+            fp2 = [self._fp() + self._fp() for _ in range(self.batch_size)]
+        self._add_outputs("g1", self.run("map_fp_to_g1", fp))
+        self._add_outputs("g2", self.run("map_fp2_to_g2", fp2))
+
+    def add_stage(self):
+        one = (1).to_bytes(SCALAR_SIZE, "big")
+        for group in ("g1", "g2"):
+            if not self.pool.points[group]:
+                continue
+            with self._generating():
+                pairs = [self.pool.sample(group, 2) for _ in range(self.batch_size)]
+                msm_inputs = [a + one + b + one for a, b in pairs]
+            sums = self.run(f"{group}_add", [a + b for a, b in pairs])
+            msms = self.run(f"{group}_msm", msm_inputs)
+            for msm_input, total, msm in zip(msm_inputs, sums, msms, strict=True):
+                self._check(
+                    f"{group}_add == {group}_msm", f"{group}_msm", msm_input, total, msm
+                )
+            self._add_outputs(group, sums)
+
+    def msm_stage(self):
+        for group in ("g1", "g2"):
+            if not self.pool.points[group]:
+                continue
+            with self._generating():
+                inputs = [
+                    b"".join(
+                        point + self._scalar()
+                        for point in self.pool.sample(
+                            group, self.rng.randint(1, MSM_MAX_PAIRS)
+                        )
+                    )
+                    for _ in range(self.batch_size)
+                ]
+            self._add_outputs(group, self.run(f"{group}_msm", inputs))
+
+    def pairing_stage(self):
+        if not self.pool.points["g1"] or not self.pool.points["g2"]:
+            return
+        with self._generating():
+            inputs = []
+            for _ in range(self.batch_size):
+                pairs = self.rng.randint(1, PAIRING_MAX_PAIRS)
+                g1 = self.pool.sample("g1", pairs)
+                g2 = self.pool.sample("g2", pairs)
+                inputs.append(b"".join(p + q for p, q in zip(g1, g2, strict=True)))
+        self.run("pairing", inputs)
+
+        # e(a*P, Q) * e(-P, a*Q) == 1, with a*P and a*Q computed by the MSMs
+        with self._generating():
+            g1 = self.pool.sample("g1", self.batch_size)
+            g2 = self.pool.sample("g2", self.batch_size)
+            scalars = [self._scalar() for _ in g1]
+        g1_multiples = self.run(
+            "g1_msm", [p + a for p, a in zip(g1, scalars, strict=True)]
+        )
+        g2_multiples = self.run(
+            "g2_msm", [q + a for q, a in zip(g2, scalars, strict=True)]
+        )
+        with self._generating():
+            checks = [
+                a_p + q + negate_g1(p) + a_q
+                for p, q, a_p, a_q in zip(
+                    g1, g2, g1_multiples, g2_multiples, strict=True
+                )
+                if a_p is not None and a_q is not None
+            ]
+        outputs = self.run("pairing", checks)
+        for input_bytes, output in zip(checks, outputs, strict=True):
+            self._check("pairing == 1", "pairing", input_bytes, PAIRING_TRUE, output)
+
+    def round(self):
+        self.map_stage()
+        self.add_stage()
+        self.msm_stage()
+        self.pairing_stage()
+
+    def format_report(self) -> List[str]:
+        execution = sum(stats["seconds"] for stats in self.stats.values())
+        lines = [
+            f"{'op':<16}{'execs':>10}{'execs/s':>10}{'agreed':>10}{'divergences':>14}"
+        ]
+        for op, stats in self.stats.items():
+            rate = stats["execs"] / stats["seconds"] if stats["seconds"] else 0
+            lines.append(
+                f"{op:<16}{stats['execs']:>10}{rate:>10.0f}{stats['agreed']:>10}"
+                f"{stats['divergences']:>14}"
+            )
+        lines.append(f"{'identity':<32}{'checks':>10}{'failures':>10}")
+        for identity, (checks, failures) in self.checks.items():
+            lines.append(f"{identity:<32}{checks:>10}{failures:>10}")
+        for group, points in self.pool.points.items():
+            lines.append(
+                f"{group} pool: {len(points)} points, {self.pool.added[group]} added"
+            )
+        lines.append(
+            f"generation {self.generation_seconds:.2f}s, execution {execution:.2f}s"
+        )
+        return lines
+
+
+def main():
+    from .LibCallerWrapper import IMPLEMENTATIONS
+
+    parser = argparse.ArgumentParser(description="Chained pipeline mode")
+    parser.add_argument("--implementations", default=",".join(IMPLEMENTATIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE)
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--no-minimize", action="store_true")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(
+        {name: IMPLEMENTATIONS[name] for name in args.implementations.split(",")},
+        args.seed,
+        args.batch_size,
+        args.output_dir,
+        pool_size=args.pool_size,
+        minimize=not args.no_minimize,
+    )
+    for _ in range(args.rounds):
+        reload_changed(pipeline.implementations)
+        pipeline.round()
+    for line in pipeline.format_report():
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,539 @@
+"""
+Raw high-throughput fuzz mode, bypassing Hypothesis.
+
+Inputs for all seven precompiles are generated in bulk from a seeded NumPy
+Generator into preallocated bytearrays, following the distributions of the
+strategies in strategies.py (each sampler is named after the strategy it
+reproduces). The batches are run through the implementations back to back and
+only divergent inputs are handed to the minimizer.
+
+Usage:
+    uv run python -m tests.raw_fuzz [--ops g1_add,pairing] [--seed 0]
+        [--batches 10] [--batch-size 256] [--implementations rust,go,python]
+
+Inputs of saturated validation classes are mostly skipped (see
+input_classes.py, disabled by --no-budget). With FUZZ_ORACLE_MODE=tiered, the
+python implementation only confirms the inputs selected by the tiered oracle
+(see tiered.py). With FUZZ_NATIVE_COVERAGE=1, half of the batches are mutations
+of the inputs that reached new edges of the instrumented native builds (see
+native_coverage.py). With FUZZ_DEDUP=1, inputs already executed are dropped
+(see dedup.py).
+"""
+
+import argparse
+import time
+from pathlib import Path
+from random import Random
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "raw fuzz mode requires numpy, install it with `uv sync --extra raw`"
+    ) from e
+
+from . import native_coverage, settings
+from .curve import CURVE_ORDER, G1, G2, g1_to_bytes, g2_to_bytes
+from .dedup import Deduplicator, create_deduplicator
+from .dedup import format_report as format_dedup_report
+from .differential import (
+    behaviour_key,
+    is_divergent,
+    record_divergence,
+    reload_changed,
+    run_all,
+    run_batch,
+)
+from .input_classes import ClassBudget, classify
+from .layouts import FP_PADDING_SIZE, FP_SIZE, LAYOUTS, OPS, SCALAR_SIZE
+from .minimizer import minimize_divergence
+from .mutator import mutate_corpus
+from .native_coverage import Corpus, get_coverage
+from .strategies import BLS12_381_PRIME, BLS12_381_SCALAR_FIELD
+from .tiered import TieredOracle, format_stats
+
+# Upper 64-bit limbs of p and r: values below them are always canonical
+FIELD_TOP_LIMB = BLS12_381_PRIME >> (8 * (FP_SIZE - FP_PADDING_SIZE - 8))
+SCALAR_TOP_LIMB = BLS12_381_SCALAR_FIELD >> (8 * (SCALAR_SIZE - 8))
+
+# Number of precomputed points sampled by the point distributions
+POINT_POOL_SIZE = 256
+
+# Share of the batches mutated from the native coverage corpus, when it is used
+CORPUS_SHARE = 0.5
+
+# Weight of the past in the sampler weights (exponential moving average)
+SAMPLER_WEIGHT_DECAY = 0.8
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / "build" / "divergences"
+
+
+def _curve_point(rng: Random) -> Tuple[int, int]:
+    """Random point on y^2 = x^3 + 4, as bls12_381_point (not in the subgroup)."""
+    p = BLS12_381_PRIME
+    while True:
+        x = rng.randrange(p)
+        rhs = (pow(x, 3, p) + 4) % p
+        y = pow(rhs, (p + 1) // 4, p)
+        if y * y % p == rhs:
+            return x, y if rng.random() < 0.5 else (-y) % p
+
+
+class BatchGenerator:
+    """
+    Bulk input generator. Each sampler fills `count` inputs of the same length
+    into one preallocated bytearray and returns (buffer, input_size).
+    """
+
+    def __init__(self, seed: int, pool_size: int = POINT_POOL_SIZE):
+        self.rng = np.random.default_rng(seed)
+        self._buffers: Dict[Tuple[int, int], Tuple[bytearray, "np.ndarray"]] = {}
+        py_rng = Random(seed)
+
+        # Valid points are expensive, so they are drawn from precomputed pools
+        scalars = [py_rng.randrange(1, CURVE_ORDER) for _ in range(pool_size)]
+        self.g1_subgroup_pool = self._pool(
+            [g1_to_bytes(point) for point in G1.generator_multiply_many(scalars)]
+        )
+        self.g2_subgroup_pool = self._pool(
+            [g2_to_bytes(point) for point in G2.generator_multiply_many(scalars)]
+        )
+        self.g1_curve_pool = self._pool(
+            [g1_to_bytes(_curve_point(py_rng)) for _ in range(pool_size)]
+        )
+        self.g1_generator = self._pool([g1_to_bytes(G1.generator)])
+        self.g2_generator = self._pool([g2_to_bytes(G2.generator)])
+
+        # (name, sampler) pairs of every distribution, by op
+        self.samplers: Dict[str, List[Tuple[str, Callable]]] = {
+            "g1_add": [
+                ("two_bls12_381_points_bytes", self.two_bls12_381_points_bytes),
+                ("binary", lambda count: self.binary(count, 256)),
+                (
+                    "invalid_size_bytes",
+                    lambda count: self.invalid_size_bytes(count, 256),
+                ),
+            ],
+            "g2_add": [
+                ("two_bls12_381_g2_points_bytes", self.two_bls12_381_g2_points_bytes),
+                ("binary", lambda count: self.binary(count, 512)),
+                (
+                    "invalid_size_bytes",
+                    lambda count: self.invalid_size_bytes(count, 512),
+                ),
+            ],
+            "g1_msm": [
+                ("g1_msm_input_bytes", self.g1_msm_input_bytes),
+                (
+                    "g1_msm_valid_subgroup_input_bytes",
+                    self.g1_msm_valid_subgroup_input_bytes,
+                ),
+                (
+                    "g1_msm_invalid_subgroup_input_bytes",
+                    self.g1_msm_invalid_subgroup_input_bytes,
+                ),
+                ("g1_msm_with_zero_scalar", self.g1_msm_with_zero_scalar),
+                (
+                    "invalid_size_bytes_multiple_of",
+                    lambda count: self.invalid_size_bytes_multiple_of(count, "g1_msm"),
+                ),
+            ],
+            "g2_msm": [
+                ("g2_msm_input_bytes", self.g2_msm_input_bytes),
+                ("g2_msm_with_zero_scalar", self.g2_msm_with_zero_scalar),
+                (
+                    "g2_msm_valid_subgroup_with_zero_scalar",
+                    self.g2_msm_valid_subgroup_with_zero_scalar,
+                ),
+                (
+                    "invalid_size_bytes_multiple_of",
+                    lambda count: self.invalid_size_bytes_multiple_of(count, "g2_msm"),
+                ),
+            ],
+            "map_fp_to_g1": [
+                ("valid_fp_field_element_bytes", self.valid_fp_field_element_bytes),
+                ("invalid_fp_field_element_bytes", self.invalid_fp_field_element_bytes),
+                ("binary", lambda count: self.binary(count, 64)),
+                (
+                    "invalid_size_bytes",
+                    lambda count: self.invalid_size_bytes(count, 64),
+                ),
+            ],
+            "map_fp2_to_g2": [
+                ("valid_fp2_field_element_bytes", self.valid_fp2_field_element_bytes),
+                (
+                    "invalid_fp2_field_element_bytes",
+                    self.invalid_fp2_field_element_bytes,
+                ),
+                ("binary", lambda count: self.binary(count, 128)),
+                (
+                    "invalid_size_bytes",
+                    lambda count: self.invalid_size_bytes(count, 128),
+                ),
+            ],
+            "pairing": [
+                ("pairing_input_bytes", self.pairing_input_bytes),
+                ("binary", lambda count: self.binary(count, 384 * self._pairs(1, 3))),
+                ("invalid_size_pairing_bytes", self.invalid_size_pairing_bytes),
+            ],
+        }
+
+    @staticmethod
+    def _pool(encodings: List[bytes]) -> "np.ndarray":
+        return np.frombuffer(b"".join(encodings), dtype=np.uint8).reshape(
+            len(encodings), -1
+        )
+
+    def _new_batch(self, count: int, size: int) -> Tuple[bytearray, "np.ndarray"]:
+        """
+        Return a preallocated batch and a (count, size) uint8 view writing into it.
+        Buffers are reused across batches of the same shape, so a batch is only
+        valid until the next call to sample().
+        """
+        if (count, size) not in self._buffers:
+            buffer = bytearray(count * size)
+            view = np.frombuffer(buffer, dtype=np.uint8).reshape(count, size)
+            self._buffers[(count, size)] = (buffer, view)
+        return self._buffers[(count, size)]
+
+    def _pairs(self, low: int, high: int) -> int:
+        return int(self.rng.integers(low, high, endpoint=True))
+
+    def _fill_fp(self, view: "np.ndarray", offset: int, valid: bool = True):
+        """Fill a field element slot: canonical (< p) or an arbitrary 64-byte value."""
+        count = len(view)
+        if not valid:
+            view[:, offset : offset + FP_SIZE] = self.rng.integers(
+                0, 256, (count, FP_SIZE), dtype=np.uint8
+            )
+            return
+        value_start = offset + FP_PADDING_SIZE
+        top = self.rng.integers(0, FIELD_TOP_LIMB, count, dtype=np.uint64)
+        view[:, offset:value_start] = 0
+        view[:, value_start : value_start + 8] = (
+            top.astype(">u8").view(np.uint8).reshape(count, 8)
+        )
+        view[:, value_start + 8 : offset + FP_SIZE] = self.rng.integers(
+            0, 256, (count, FP_SIZE - FP_PADDING_SIZE - 8), dtype=np.uint8
+        )
+
+    def _fill_scalar(self, view: "np.ndarray", offset: int, below_order: bool):
+        """Fill a scalar: below r (bls12_381_scalar) or any 256-bit value."""
+        count = len(view)
+        view[:, offset : offset + SCALAR_SIZE] = self.rng.integers(
+            0, 256, (count, SCALAR_SIZE), dtype=np.uint8
+        )
+        if below_order:
+            top = self.rng.integers(0, SCALAR_TOP_LIMB, count, dtype=np.uint64)
+            view[:, offset : offset + 8] = (
+                top.astype(">u8").view(np.uint8).reshape(count, 8)
+            )
+
+    def _fill_points(self, view: "np.ndarray", offset: int, pool: "np.ndarray"):
+        indices = self.rng.integers(0, len(pool), len(view))
+        view[:, offset : offset + pool.shape[1]] = pool[indices]
+
+    def _msm_batch(self, count, op, pool, below_order, num_pairs, zero_scalar=False):
+        layout = LAYOUTS[op]
+        buffer, view = self._new_batch(count, num_pairs * layout.unit_size)
+        pairs = view.reshape(count * num_pairs, layout.unit_size)
+        self._fill_points(pairs, 0, pool)
+        self._fill_scalar(pairs, layout.scalars[0], below_order)
+        if zero_scalar:
+            # At least one scalar set to zero in every input
+            index = (
+                self.rng.integers(0, num_pairs, count) + np.arange(count) * num_pairs
+            )
+            scalar = layout.scalars[0]
+            pairs[index, scalar : scalar + SCALAR_SIZE] = 0
+        return buffer, num_pairs * layout.unit_size
+
+    # Samplers, named after the strategies they reproduce
+
+    def binary(self, count: int, size: int):
+        buffer, view = self._new_batch(count, size)
+        view[:] = self.rng.integers(0, 256, (count, size), dtype=np.uint8)
+        return buffer, size
+
+    def invalid_size_bytes(self, count: int, expected_size: int):
+        size = expected_size
+        while size == expected_size:
+            size = int(self.rng.integers(0, max(expected_size * 2, 1024)))
+        return self.binary(count, size)
+
+    def invalid_size_bytes_multiple_of(self, count: int, op: str):
+        unit_size = LAYOUTS[op].unit_size
+        size = unit_size
+        while size % unit_size == 0:
+            size = int(self.rng.integers(1, 1000))
+        return self.binary(count, size)
+
+    def invalid_size_pairing_bytes(self, count: int):
+        valid_size = 384 * self._pairs(1, 3)
+        delta = self._pairs(1, 100)
+        size = valid_size + delta if self.rng.random() < 0.5 else valid_size - delta
+        return self.binary(count, size)
+
+    def valid_fp_field_element_bytes(self, count: int):
+        buffer, view = self._new_batch(count, FP_SIZE)
+        self._fill_fp(view, 0)
+        return buffer, FP_SIZE
+
+    def invalid_fp_field_element_bytes(self, count: int):
+        buffer, view = self._new_batch(count, FP_SIZE)
+        self._fill_fp(view, 0, valid=False)
+        return buffer, FP_SIZE
+
+    def valid_fp2_field_element_bytes(self, count: int):
+        buffer, view = self._new_batch(count, 2 * FP_SIZE)
+        self._fill_fp(view, 0)
+        self._fill_fp(view, FP_SIZE)
+        return buffer, 2 * FP_SIZE
+
+    def invalid_fp2_field_element_bytes(self, count: int):
+        buffer, view = self._new_batch(count, 2 * FP_SIZE)
+        invalid_c0 = self.rng.random() < 0.5
+        invalid_c1 = not invalid_c0 or self.rng.random() < 0.5
+        self._fill_fp(view, 0, valid=not invalid_c0)
+        self._fill_fp(view, FP_SIZE, valid=not invalid_c1)
+        return buffer, 2 * FP_SIZE
+
+    def two_bls12_381_points_bytes(self, count: int):
+        buffer, view = self._new_batch(count, 256)
+        self._fill_points(view, 0, self.g1_curve_pool)
+        self._fill_points(view, 128, self.g1_curve_pool)
+        return buffer, 256
+
+    def two_bls12_381_g2_points_bytes(self, count: int):
+        buffer, view = self._new_batch(count, 512)
+        self._fill_points(view, 0, self.g2_subgroup_pool)
+        self._fill_points(view, 256, self.g2_subgroup_pool)
+        return buffer, 512
+
+    def g1_msm_input_bytes(self, count: int):
+        return self._msm_batch(
+            count, "g1_msm", self.g1_curve_pool, True, self._pairs(1, 5)
+        )
+
+    def g1_msm_valid_subgroup_input_bytes(self, count: int):
+        return self._msm_batch(
+            count, "g1_msm", self.g1_generator, True, self._pairs(1, 5)
+        )
+
+    def g1_msm_invalid_subgroup_input_bytes(self, count: int):
+        num_pairs = self._pairs(1, 5)
+        buffer, size = self._msm_batch(
+            count, "g1_msm", self.g1_generator, True, num_pairs
+        )
+        # Replace one point per input with an on-curve, non-subgroup point
+        pairs = np.frombuffer(buffer, dtype=np.uint8).reshape(count * num_pairs, -1)
+        index = self.rng.integers(0, num_pairs, count) + np.arange(count) * num_pairs
+        pool = self.g1_curve_pool
+        pairs[index, : pool.shape[1]] = pool[self.rng.integers(0, len(pool), count)]
+        return buffer, size
+
+    def g1_msm_with_zero_scalar(self, count: int):
+        return self._msm_batch(
+            count, "g1_msm", self.g1_curve_pool, True, self._pairs(1, 5), True
+        )
+
+    def g2_msm_input_bytes(self, count: int):
+        return self._msm_batch(
+            count, "g2_msm", self.g2_subgroup_pool, False, self._pairs(1, 6)
+        )
+
+    def g2_msm_with_zero_scalar(self, count: int):
+        return self._msm_batch(
+            count, "g2_msm", self.g2_subgroup_pool, True, self._pairs(1, 5), True
+        )
+
+    def g2_msm_valid_subgroup_with_zero_scalar(self, count: int):
+        return self._msm_batch(
+            count, "g2_msm", self.g2_generator, True, self._pairs(1, 5), True
+        )
+
+    def pairing_input_bytes(self, count: int):
+        num_pairs = self._pairs(1, 3)
+        size = num_pairs * LAYOUTS["pairing"].unit_size
+        buffer, view = self._new_batch(count, size)
+        pairs = view.reshape(count * num_pairs, LAYOUTS["pairing"].unit_size)
+        self._fill_points(pairs, 0, self.g1_subgroup_pool)
+        self._fill_points(pairs, 128, self.g2_subgroup_pool)
+        return buffer, size
+
+    def sample(
+        self, op: str, count: int, weights: Optional[Sequence[float]] = None
+    ) -> Tuple[str, bytearray, int]:
+        """
+        Pick one of the distributions of `op` (uniformly, or with the given
+        relative weights) and generate a batch from it.
+        """
+        samplers = self.samplers[op]
+        p = None if weights is None else np.asarray(weights) / sum(weights)
+        name, sampler = samplers[int(self.rng.choice(len(samplers), p=p))]
+        buffer, size = sampler(count)
+        return name, buffer, size
+
+    def mutate_corpus(
+        self, op: str, corpus: Sequence[bytes], count: int
+    ) -> List[bytes]:
+        """Mutate `count` inputs drawn from the corpus (see mutator.py)."""
+        seed = int(self.rng.integers(0, 2**63))
+        return list(mutate_corpus(op, corpus, count, seed))
+
+
+def fuzz(
+    ops,
+    implementations,
+    seed: int,
+    batches: int,
+    batch_size: int,
+    output_dir: Path,
+    minimize: bool = True,
+    tiered: Optional[TieredOracle] = None,
+    budget: Optional[ClassBudget] = None,
+    corpus: Optional[Corpus] = None,
+    dedup: Optional[Deduplicator] = None,
+):
+    """
+    Run the raw fuzz loop and print per-op throughput and divergence counts.
+    With `tiered`, batches go through the tiered oracle instead of running
+    every implementation on every input. With `budget`, inputs are classified
+    before execution, saturated classes are throttled, and distributions are
+    drawn in proportion to the share of their inputs that get executed.
+    With `corpus`, CORPUS_SHARE of the batches are mutations of the inputs
+    that reached new native edges (see native_coverage.py). With `dedup`,
+    inputs already executed are dropped from the batches.
+    """
+    generator = BatchGenerator(seed)
+    stats = {op: {"execs": 0, "divergences": 0, "seconds": 0.0} for op in ops}
+    weights = {op: {name: 1.0 for name, _ in generator.samplers[op]} for op in ops}
+
+    for _ in range(batches):
+        # Inputs already executed run again on the new builds
+        if reload_changed(implementations) and dedup is not None:
+            dedup.reset()
+        for op in ops:
+            start = time.perf_counter()
+            if (
+                corpus is not None
+                and corpus.inputs(op)
+                and generator.rng.random() < CORPUS_SHARE
+            ):
+                name = "corpus"
+                inputs = generator.mutate_corpus(op, corpus.inputs(op), batch_size)
+            else:
+                name, buffer, size = generator.sample(
+                    op, batch_size, list(weights[op].values())
+                )
+                inputs = [
+                    bytes(buffer[index * size : (index + 1) * size])
+                    for index in range(batch_size)
+                ]
+            if dedup is not None:
+                inputs = dedup.unique(op, inputs)
+            if budget is not None:
+                classes = [classify(op, input_bytes) for input_bytes in inputs]
+                admitted = [
+                    index
+                    for index, input_class in enumerate(classes)
+                    if budget.admit(op, input_class)
+                ]
+                share = len(admitted) / batch_size
+                if name in weights[op]:
+                    weights[op][name] = SAMPLER_WEIGHT_DECAY * weights[op][name] + (
+                        1 - SAMPLER_WEIGHT_DECAY
+                    ) * max(share, budget.floor)
+                inputs = [inputs[index] for index in admitted]
+                classes = [classes[index] for index in admitted]
+            if tiered is not None:
+                batch_outcomes = tiered.check_batch(op, inputs)
+            else:
+                batch_outcomes = run_batch(implementations, op, inputs)
+            for index, (input_bytes, outcomes) in enumerate(
+                zip(inputs, batch_outcomes, strict=True)
+            ):
+                stats[op]["execs"] += 1
+                if budget is not None:
+                    budget.record(op, classes[index], behaviour_key(outcomes))
+                if not is_divergent(outcomes):
+                    continue
+                stats[op]["divergences"] += 1
+                if minimize:
+                    input_bytes = minimize_divergence(
+                        op, input_bytes, implementations, outcomes
+                    )
+                    outcomes = run_all(implementations, op, input_bytes)
+                path = record_divergence(output_dir, op, input_bytes, outcomes)
+                print(f"[{op}] divergence from {name}: {path}")
+            stats[op]["seconds"] += time.perf_counter() - start
+
+    print(f"{'op':<16}{'execs':>10}{'execs/s':>12}{'divergences':>14}")
+    for op, op_stats in stats.items():
+        rate = op_stats["execs"] / op_stats["seconds"] if op_stats["seconds"] else 0
+        print(
+            f"{op:<16}{op_stats['execs']:>10}{rate:>12.0f}{op_stats['divergences']:>14}"
+        )
+    if tiered is not None:
+        for line in format_stats(tiered.stats):
+            print(line)
+    if budget is not None:
+        for line in budget.format_report():
+            print(line)
+    if corpus is not None:
+        coverages = {
+            name: get_coverage(implementation)
+            for name, implementation in implementations.items()
+            if get_coverage(implementation) is not None
+        }
+        for line in native_coverage.format_report(coverages, corpus):
+            print(line)
+    if dedup is not None:
+        for line in format_dedup_report(dedup.stats, dedup.memory()):
+            print(line)
+    return stats
+
+
+def main():
+    from .LibCallerWrapper import IMPLEMENTATIONS
+
+    parser = argparse.ArgumentParser(description="Raw high-throughput fuzz mode")
+    parser.add_argument("--ops", default=",".join(OPS))
+    parser.add_argument("--implementations", default=",".join(IMPLEMENTATIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--no-minimize", action="store_true")
+    parser.add_argument(
+        "--no-budget", action="store_true", help="execute every generated input"
+    )
+    args = parser.parse_args()
+
+    implementations = {
+        name: IMPLEMENTATIONS[name] for name in args.implementations.split(",")
+    }
+    tiered = None
+    if settings.ORACLE_MODE == "tiered" and "python" in implementations:
+        natives = {n: i for n, i in implementations.items() if n != "python"}
+        tiered = TieredOracle(
+            natives, implementations["python"], sample_rate=settings.EELS_SAMPLE_RATE
+        )
+    fuzz(
+        args.ops.split(","),
+        implementations,
+        args.seed,
+        args.batches,
+        args.batch_size,
+        args.output_dir,
+        minimize=not args.no_minimize,
+        tiered=tiered,
+        budget=None if args.no_budget else ClassBudget(seed=args.seed),
+        corpus=native_coverage.CORPUS if settings.NATIVE_COVERAGE else None,
+        dedup=create_deduplicator(),
+    )
+
+
+if __name__ == "__main__":
+    main()
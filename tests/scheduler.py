@@ -0,0 +1,339 @@
+"""
+Bandit scheduler of the Hypothesis tests for long runs.
+
+Under pytest every @given test gets the same max_examples, however saturated
+its strategy. The scheduler treats each test, a (precompile, strategy) pair,
+as an arm of a multi-armed bandit. A pull runs the test for --slice examples
+on every Rust backend, the Go wrapper and EELS, and its reward is the number
+of findings per second of the pull, in wall time:
+
+- native edges hit for the first time (with FUZZ_NATIVE_COVERAGE=1)
+- new behaviours: (input class, behaviour) pairs of the op not seen before,
+  the input class being the first EIP-2537 check the input fails (see
+  input_classes.py) and the behaviour who failed with which error message
+- failures (divergences or other test errors) of a new behaviour, weighted
+  by FAILURE_WEIGHT
+
+The time of a pull is wall time, not the CPU time of this process: with
+FUZZ_EELS_MODE=pool or pypy, EELS runs in worker processes, and the pull
+waits for them. The policy is discounted UCB1 (see BanditScheduler): past
+findings and time decay by --discount per pull, so an arm whose strategy saturates loses
+its share of the time, while arms that found nothing are still explored in
+proportion to the best current rate. The
+per-arm statistics are printed at the end of the run (or on Ctrl-C).
+
+Usage:
+    uv run python -m tests.scheduler [--duration 3600] [--slice 20]
+        [--discount 0.99] [--exploration 1.0] [--ops g1_msm,pairing]
+"""
+
+import argparse
+import functools
+import importlib
+import inspect
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from hypothesis import HealthCheck, Phase
+from hypothesis import settings as hypothesis_settings
+
+from . import settings
+from .differential import Outcome, behaviour_key, reload_changed
+from .input_classes import classify
+from .layouts import OPS, TEST_MODULE_OPS
+from .native_coverage import get_coverage
+
+# Reward of a failure of a new behaviour, in findings
+FAILURE_WEIGHT = 10
+
+# Fixtures of the differential tests, all provided by the scheduler
+FIXTURES = {"rust_wrapper", "go_wrapper", "python_wrapper"}
+
+
+@dataclass
+class Arm:
+    """A test and its statistics."""
+
+    op: str
+    name: str
+    test: Callable
+    pulls: int = 0
+    examples: int = 0
+    seconds: float = 0.0
+    edges: int = 0
+    behaviours: int = 0
+    failures: int = 0
+    # Findings and seconds of the pulls, both decayed by the discount
+    discounted_findings: float = 0.0
+    discounted_seconds: float = 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{self.op}/{self.name}"
+
+
+class BanditScheduler:
+    """
+    Discounted UCB1 over arms, rewarded in findings per wall-clock second.
+
+    The mean of an arm is its discounted findings per discounted second, and
+    its exploration bonus shrinks with its discounted time, scaled by
+    the best mean: cheap arms are pulled more often for the same share of the
+    time, and nothing is explored for its own sake until something is found.
+    """
+
+    def __init__(self, arms: Sequence[Arm], discount: float, exploration: float):
+        """
+        Args:
+            arms: Arms to schedule
+            discount: Decay of the past findings and time at every pull, in (0, 1]
+            exploration: Weight of the exploration bonus
+        """
+        self.arms = list(arms)
+        self.discount = discount
+        self.exploration = exploration
+
+    @staticmethod
+    def mean(arm: Arm) -> float:
+        return arm.discounted_findings / max(arm.discounted_seconds, 1e-6)
+
+    def score(self, arm: Arm, scale: float, total_seconds: float) -> float:
+        """Upper confidence bound of the findings per second of an arm."""
+        seconds = max(arm.discounted_seconds, 1e-6)
+        bonus = math.sqrt(2 * math.log1p(total_seconds) / seconds)
+        return self.mean(arm) + self.exploration * scale * bonus
+
+    def select(self) -> Arm:
+        """Next arm to pull: unpulled arms first, then the highest bound."""
+        for arm in self.arms:
+            if arm.pulls == 0:
+                return arm
+        scale = max(self.mean(arm) for arm in self.arms)
+        total_seconds = sum(arm.discounted_seconds for arm in self.arms)
+        # Ties (nothing found) go to the arm with the least recent time
+        return max(
+            self.arms,
+            key=lambda arm: (
+                self.score(arm, scale, total_seconds),
+                -arm.discounted_seconds,
+            ),
+        )
+
+    def update(self, arm: Arm, findings: float, seconds: float):
+        """Record the findings of a pull of `arm`."""
+        for other in self.arms:
+            other.discounted_findings *= self.discount
+            other.discounted_seconds *= self.discount
+        arm.discounted_findings += findings
+        arm.discounted_seconds += seconds
+        arm.pulls += 1
+        arm.seconds += seconds
+
+
+class RecordingImplementation:
+    """Implementation proxy recording the outcome of its calls by name."""
+
+    def __init__(self, name: str, implementation, outcomes: Dict[str, Outcome]):
+        self._name = name
+        self._implementation = implementation
+        self._outcomes = outcomes
+
+    def __getattr__(self, op: str):
+        function = getattr(self._implementation, op)
+
+        def call(input_bytes):
+            try:
+                output = function(input_bytes)
+            except RuntimeError as e:
+                self._outcomes[self._name] = (False, str(e))
+                raise
+            self._outcomes[self._name] = (True, output)
+            return output
+
+        return call
+
+
+class Session:
+    """Arms of the differential tests, run against the implementations."""
+
+    def __init__(self, implementations: Dict[str, object], ops: Sequence[str]):
+        """
+        Args:
+            implementations: Implementations under test, by name (every Rust
+                backend, "go" and "python")
+            ops: Precompiles whose tests are scheduled
+        """
+        self.implementations = implementations
+        self.outcomes: Dict[str, Outcome] = {}
+        self.recorders = {
+            name: RecordingImplementation(name, implementation, self.outcomes)
+            for name, implementation in implementations.items()
+        }
+        self.rust_names = [
+            name for name in implementations if name not in ("go", "python")
+        ]
+        # (input class, behaviour) pairs seen, by op
+        self.behaviours: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self.failure_keys: Set[Tuple[str, str, Hashable]] = set()
+        self._new_behaviours = 0
+        self._examples = 0
+        self._last_behaviour: Optional[Hashable] = None
+        self._last_input = b""
+        self.arms = [
+            Arm(op, test.__name__, test)
+            for module, op in TEST_MODULE_OPS.items()
+            if op in ops
+            for test in self._tests(module, op)
+        ]
+
+    def _tests(self, module_name: str, op: str) -> List[Callable]:
+        """The differential Hypothesis tests of a module, observed."""
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        tests = []
+        for name in dir(module):
+            test = getattr(module, name)
+            if (
+                name.startswith("test_")
+                and hasattr(test, "hypothesis")
+                and set(inspect.signature(test).parameters) == FIXTURES
+            ):
+                self._observe(test, op)
+                tests.append(test)
+        return tests
+
+    def _observe(self, test: Callable, op: str):
+        """Record the behaviour of every example of `test`."""
+        inner_test = test.hypothesis.inner_test
+
+        @functools.wraps(inner_test)
+        def observed(*args, **kwargs):
+            self.outcomes.clear()
+            try:
+                return inner_test(*args, **kwargs)
+            finally:
+                if "input_data" in kwargs:
+                    self._record(op, kwargs["input_data"])
+
+        test.hypothesis.inner_test = observed
+
+    def _record(self, op: str, input_bytes: bytes):
+        self._examples += 1
+        self._last_input = input_bytes
+        key = (classify(op, input_bytes), behaviour_key(self.outcomes))
+        self._last_behaviour = key
+        seen = self.behaviours.setdefault(op, set())
+        if key not in seen:
+            seen.add(key)
+            self._new_behaviours += 1
+
+    def _edges(self) -> int:
+        return sum(
+            coverage.edges
+            for coverage in map(get_coverage, self.implementations.values())
+            if coverage is not None
+        )
+
+    def pull(self, arm: Arm) -> Tuple[float, float]:
+        """
+        Run the test of `arm` on every Rust backend.
+
+        Returns:
+            Findings and wall-clock seconds of the pull, EELS workers included
+        """
+        edges = self._edges()
+        self._new_behaviours = 0
+        self._examples = 0
+        failures = 0
+        start = time.perf_counter()
+        for rust_name in self.rust_names:
+            self._last_behaviour = None
+            try:
+                arm.test(
+                    rust_wrapper=self.recorders[rust_name],
+                    go_wrapper=self.recorders["go"],
+                    python_wrapper=self.recorders["python"],
+                )
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            # pytest.fail() and the groups of distinct failures are BaseExceptions
+            except BaseException as e:
+                # The last example run is the (shrunk) failing one
+                key = (arm.label, type(e).__name__, self._last_behaviour)
+                if key not in self.failure_keys:
+                    self.failure_keys.add(key)
+                    failures += 1
+                    message = str(e).splitlines()[0] if str(e) else ""
+                    print(f"FAILURE {arm.label} ({rust_name}): {type(e).__name__}")
+                    print(f"  {message}")
+                    print(f"  input: {self._last_input.hex()}")
+        seconds = time.perf_counter() - start
+        new_edges = self._edges() - edges
+        arm.examples += self._examples
+        arm.edges += new_edges
+        arm.behaviours += self._new_behaviours
+        arm.failures += failures
+        findings = new_edges + self._new_behaviours + FAILURE_WEIGHT * failures
+        return findings, seconds
+
+
+def format_report(arms: Sequence[Arm]) -> List[str]:
+    """Per-arm statistics, by share of the time."""
+    total = sum(arm.seconds for arm in arms) or 1.0
+    lines = [
+        f"{'arm':<52}{'pulls':>7}{'examples':>10}{'wall s':>9}{'share':>8}"
+        f"{'edges':>8}{'behav.':>8}{'fails':>7}{'per s':>8}"
+    ]
+    for arm in sorted(arms, key=lambda arm: arm.seconds, reverse=True):
+        findings = arm.edges + arm.behaviours + FAILURE_WEIGHT * arm.failures
+        rate = findings / arm.seconds if arm.seconds else 0.0
+        lines.append(
+            f"{arm.label:<52}{arm.pulls:>7}{arm.examples:>10}"
+            f"{arm.seconds:>9.1f}{arm.seconds / total:>8.1%}"
+            f"{arm.edges:>8}{arm.behaviours:>8}{arm.failures:>7}{rate:>8.2f}"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandit scheduler of the tests")
+    parser.add_argument("--duration", type=float, default=3600, help="seconds")
+    parser.add_argument("--slice", type=int, default=20, help="examples per pull")
+    parser.add_argument("--discount", type=float, default=0.99)
+    parser.add_argument("--exploration", type=float, default=1.0)
+    parser.add_argument("--ops", default=",".join(OPS))
+    args = parser.parse_args()
+
+    # Test settings are resolved when the test modules are imported
+    phases = [Phase.explicit, Phase.generate, Phase.target]
+    if settings.HYPOTHESIS_SHRINK:
+        phases.append(Phase.shrink)
+    hypothesis_settings.register_profile(
+        "scheduler",
+        max_examples=args.slice,
+        phases=phases,
+        database=None,
+        suppress_health_check=[HealthCheck.too_slow],
+    )
+    hypothesis_settings.load_profile("scheduler")
+
+    from .LibCallerWrapper import IMPLEMENTATIONS
+
+    session = Session(IMPLEMENTATIONS, args.ops.split(","))
+    scheduler = BanditScheduler(session.arms, args.discount, args.exploration)
+    deadline = time.monotonic() + args.duration
+    try:
+        while time.monotonic() < deadline:
+            reload_changed(IMPLEMENTATIONS)
+            arm = scheduler.select()
+            findings, seconds = session.pull(arm)
+            scheduler.update(arm, findings, seconds)
+    except KeyboardInterrupt:
+        pass
+    for line in format_report(session.arms):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Differential check service: other tools ask whether all the implementations
+agree on a precompile input, without importing the harness.
+
+The service listens on a Unix domain socket (--socket) or a localhost TCP port
+(--port) and speaks JSON lines. A request is
+
+    {"id": 1, "op": "g1_msm", "input": "0x..."}
+
+and its response, written when its batch completes (responses of a connection
+may come out of order, matched by "id"):
+
+    {"id": 1, "op": "g1_msm", "verdict": "agree", "gas": 12000,
+     "results": {"rust": {"ok": true, "output": "0x...", "latency_us": 181.2},
+                 "python": {"ok": false, "error": "...", "latency_us": 90.5}}}
+
+The verdict is "agree" when all implementations succeed with the same output
+or all fail, "diverge" otherwise, and "gas" is the gas charged by the
+precompile (null for an invalid input length). {"id": 2, "op": "stats"}
+returns the request and batch counters, and a request that cannot be checked
+gets {"id": ..., "error": "..."}.
+
+Requests arriving while a batch runs, from any connection, are coalesced into
+the next batches (at most --max-batch inputs of one op each). The native
+wrappers run them one call at a time in a thread of their own, while the EELS
+process pool runs the same batch in parallel; latencies are those of each
+call, measured where it runs. See tests/service_client.py for a client.
+
+Usage:
+    uv run python -m tests.service [--socket build/diffcheck.sock | --port 8545]
+        [--max-batch 256] [--max-delay-ms 1] [--eels-workers 0]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from wrappers.python.eels_pool import EELSPool
+from wrappers.python.eels_wrapper import gas_cost
+
+from . import settings
+from .differential import Outcome, is_divergent, reload_changed, run_one
+from .layouts import OPS
+
+DEFAULT_SOCKET = Path(__file__).parent.parent / "build" / "diffcheck.sock"
+
+# Inputs of one op per batch
+MAX_BATCH = 256
+
+# Time the dispatcher waits for more requests once one is pending, in seconds
+MAX_DELAY = 0.001
+
+# Largest request line accepted (a pairing of 1000 pairs is 768 KB in hex)
+MAX_LINE = 1 << 22
+
+# Outcome of an input on one implementation and the call time in nanoseconds
+TimedOutcome = Tuple[Outcome, int]
+
+
+def format_response(
+    request_id,
+    op: str,
+    outcomes: Mapping[str, TimedOutcome],
+    gas: Optional[int],
+) -> dict:
+    """JSON response of a checked input."""
+    results = {}
+    for name, ((ok, value), elapsed) in outcomes.items():
+        result = {"ok": ok}
+        if ok:
+            result["output"] = "0x" + value.hex()
+        else:
+            result["error"] = value
+        result["latency_us"] = round(elapsed / 1e3, 1)
+        results[name] = result
+    divergent = is_divergent({name: outcome for name, (outcome, _) in outcomes.items()})
+    return {
+        "id": request_id,
+        "op": op,
+        "verdict": "diverge" if divergent else "agree",
+        "gas": gas,
+        "results": results,
+    }
+
+
+class DiffCheckService:
+    """Batches the pending requests and checks them on every implementation."""
+
+    def __init__(
+        self,
+        natives: Mapping[str, object],
+        eels: EELSPool,
+        max_batch: int = MAX_BATCH,
+        max_delay: float = MAX_DELAY,
+    ):
+        """
+        Args:
+            natives: Native implementations, by name
+            eels: EELS process pool, the "python" implementation
+            max_batch: Inputs of one op per batch
+            max_delay: Seconds to wait for more requests once one is pending
+        """
+        self.natives = natives
+        self.eels = eels
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        # Requests of the next batches: (input, future of the response) by op
+        self._pending: Dict[str, List[Tuple[bytes, asyncio.Future]]] = {}
+        self._count = 0
+        self._ready = asyncio.Event()
+        # Native calls are not concurrent, so that they do not slow each other
+        self._native_thread = ThreadPoolExecutor(1, thread_name_prefix="natives")
+        self._eels_thread = ThreadPoolExecutor(1, thread_name_prefix="eels")
+        # "requests", "batches", "inputs" (batched), "divergences"
+        self.stats = Counter()
+
+    async def check(self, op: str, input_bytes: bytes) -> Tuple[Dict, Optional[int]]:
+        """Outcomes by implementation and gas of an input, once its batch ran."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(op, []).append((input_bytes, future))
+        self._count += 1
+        self._ready.set()
+        return await future
+
+    def _run_natives(self, op: str, inputs: List[bytes]):
+        # New builds (FUZZ_HOT_RELOAD) are loaded between batches
+        reload_changed(self.natives)
+        outcomes = {}
+        for name, implementation in self.natives.items():
+            timed = outcomes[name] = []
+            for input_bytes in inputs:
+                start = time.perf_counter_ns()
+                outcome = run_one(implementation, op, input_bytes)
+                timed.append((outcome, time.perf_counter_ns() - start))
+        gas = [gas_cost(op, input_bytes) for input_bytes in inputs]
+        return outcomes, gas
+
+    def _run_eels(self, op: str, inputs: List[bytes]) -> List[TimedOutcome]:
+        latencies: List[int] = []
+        outcomes = self.eels.run_batch(op, inputs, latencies)
+        return list(zip(outcomes, latencies, strict=True))
+
+    async def _run(self, op: str, requests: List[Tuple[bytes, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        inputs = [input_bytes for input_bytes, _ in requests]
+        try:
+            (native_outcomes, gas), eels_outcomes = await asyncio.gather(
+                loop.run_in_executor(
+                    self._native_thread, self._run_natives, op, inputs
+                ),
+                loop.run_in_executor(self._eels_thread, self._run_eels, op, inputs),
+            )
+        except Exception as e:
+            for _, future in requests:
+                future.set_exception(e)
+            return
+        self.stats["batches"] += 1
+        self.stats["inputs"] += len(inputs)
+        for index, (_, future) in enumerate(requests):
+            outcomes = {name: timed[index] for name, timed in native_outcomes.items()}
+            outcomes["python"] = eels_outcomes[index]
+            future.set_result((outcomes, gas[index]))
+
+    async def dispatch(self):
+        """Run the pending requests in batches, forever."""
+        while True:
+            await self._ready.wait()
+            # Let the requests sent at the same time join the batch
+            if self._count < self.max_batch:
+                await asyncio.sleep(self.max_delay)
+            self._ready.clear()
+            pending, self._pending, self._count = self._pending, {}, 0
+            for op, requests in pending.items():
+                for start in range(0, len(requests), self.max_batch):
+                    await self._run(op, requests[start : start + self.max_batch])
+
+    async def _respond(self, request: dict, writer: asyncio.StreamWriter):
+        request_id = request.get("id")
+        op = request.get("op")
+        try:
+            if op == "stats":
+                response = {"id": request_id, "stats": dict(self.stats)}
+            elif op not in OPS:
+                raise ValueError(f"Unknown op: {op}")
+            else:
+                input_hex = request["input"]
+                input_bytes = bytes.fromhex(input_hex.removeprefix("0x"))
+                self.stats["requests"] += 1
+                outcomes, gas = await self.check(op, input_bytes)
+                response = format_response(request_id, op, outcomes, gas)
+                if response["verdict"] == "diverge":
+                    self.stats["divergences"] += 1
+        # Any failure, e.g. of a batch, is answered rather than left unanswered
+        except Exception as e:
+            response = {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer the requests of a connection until it is closed."""
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("A request is a JSON object")
+                except ValueError as e:
+                    writer.write(json.dumps({"id": None, "error": str(e)}).encode())
+                    writer.write(b"\n")
+                    continue
+                task = asyncio.create_task(self._respond(request, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        # Closed by the client, a line over MAX_LINE, or the service stopping
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self._native_thread.shutdown()
+        self._eels_thread.shutdown()
+
+
+async def serve(service: DiffCheckService, socket: Optional[Path], port: Optional[int]):
+    if port is not None:
+        server = await asyncio.start_server(
+            service.handle, "127.0.0.1", port, limit=MAX_LINE
+        )
+        address = f"127.0.0.1:{port}"
+    else:
+        socket.parent.mkdir(parents=True, exist_ok=True)
+        socket.unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(
+            service.handle, str(socket), limit=MAX_LINE
+        )
+        address = str(socket)
+    dispatcher = asyncio.create_task(service.dispatch())
+    print(f"differential check service listening on {address}", flush=True)
+    async with server:
+        try:
+            await server.serve_forever()
+        finally:
+            dispatcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential check service")
+    parser.add_argument("--socket", type=Path, default=DEFAULT_SOCKET)
+    parser.add_argument("--port", type=int, help="listen on localhost TCP instead")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-delay-ms", type=float, default=MAX_DELAY * 1e3)
+    parser.add_argument(
+        "--eels-workers", type=int, default=settings.EELS_WORKERS, help="0: CPUs"
+    )
+    args = parser.parse_args()
+
+    from .LibCallerWrapper import IMPLEMENTATIONS
+
+    natives = {name: impl for name, impl in IMPLEMENTATIONS.items() if name != "python"}
+    eels = EELSPool(args.eels_workers or None)
+    service = DiffCheckService(natives, eels, args.max_batch, args.max_delay_ms / 1e3)
+    try:
+        asyncio.run(serve(service, args.socket, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        eels.close()
+        for key, value in sorted(service.stats.items()):
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Client of the differential check service (tests/service.py).
+
+Only depends on the standard library, so other tools can copy this file
+rather than import the harness.
+
+Example:
+    with DiffCheckClient(socket_path="build/diffcheck.sock") as client:
+        check = client.check("g1_add", input_bytes)
+        if check.verdict == "diverge":
+            ...
+        checks = client.check_many([("g1_msm", msm_input), ("pairing", pairing_input)])
+"""
+
+import json
+import socket
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Requests sent together by check_many(), at most two windows in flight
+WINDOW = 256
+
+
+class ImplementationResult(NamedTuple):
+    """Outcome of an input on one implementation."""
+
+    ok: bool
+    output: Optional[bytes]
+    error: Optional[str]
+    latency_us: float
+
+
+class Check(NamedTuple):
+    """Verdict of the service on an input, with the result of each implementation."""
+
+    op: str
+    verdict: str
+    gas: Optional[int]
+    results: Dict[str, ImplementationResult]
+
+
+class ServiceError(Exception):
+    """A request the service could not check."""
+
+
+def _parse_check(response: dict) -> Check:
+    if "error" in response:
+        raise ServiceError(response["error"])
+    return Check(
+        op=response["op"],
+        verdict=response["verdict"],
+        gas=response["gas"],
+        results={
+            name: ImplementationResult(
+                ok=result["ok"],
+                output=bytes.fromhex(result["output"][2:]) if result["ok"] else None,
+                error=result.get("error"),
+                latency_us=result["latency_us"],
+            )
+            for name, result in response["results"].items()
+        },
+    )
+
+
+class DiffCheckClient:
+    """Blocking connection to the service."""
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        port: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            socket_path: Unix domain socket of the service
+            port: Localhost TCP port of the service, instead of socket_path
+            timeout: Seconds to wait for a response, None to wait forever
+        """
+        if port is not None:
+            self._socket = socket.create_connection(("127.0.0.1", port), timeout)
+        elif socket_path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(socket_path)
+        else:
+            raise ValueError("Either socket_path or port is required")
+        self._reader = self._socket.makefile("rb")
+        self._next_id = 0
+        # Responses read while waiting for another one, by id
+        self._responses: Dict[int, dict] = {}
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, requests: List[dict]):
+        self._socket.sendall(
+            b"".join(json.dumps(request).encode() + b"\n" for request in requests)
+        )
+
+    def _request(self, op: str, input_bytes: bytes) -> Tuple[int, dict]:
+        self._next_id += 1
+        return self._next_id, {
+            "id": self._next_id,
+            "op": op,
+            "input": "0x" + input_bytes.hex(),
+        }
+
+    def _receive(self, request_id: int) -> dict:
+        while request_id not in self._responses:
+            line = self._reader.readline()
+            if not line:
+                raise ConnectionError("The service closed the connection")
+            response = json.loads(line)
+            self._responses[response["id"]] = response
+        return self._responses.pop(request_id)
+
+    def check(self, op: str, input_bytes: bytes) -> Check:
+        """
+        Check an input of `op` on every implementation.
+
+        Raises:
+            ServiceError: If the service could not check the input
+        """
+        request_id, request = self._request(op, input_bytes)
+        self._send([request])
+        return _parse_check(self._receive(request_id))
+
+    def check_many(self, inputs: Iterable[Tuple[str, bytes]]) -> List[Check]:
+        """
+        Check (op, input) pairs, sent in windows of WINDOW requests so that the
+        service batches them.
+
+        Raises:
+            ServiceError: If the service could not check an input
+        """
+        ids = []
+        checks = []
+        window = []
+        for op, input_bytes in inputs:
+            request_id, request = self._request(op, input_bytes)
+            ids.append(request_id)
+            window.append(request)
+            if len(window) == WINDOW:
+                self._send(window)
+                window = []
+                # The service runs this window while the previous one is read
+                while len(ids) - len(checks) > WINDOW:
+                    checks.append(_parse_check(self._receive(ids[len(checks)])))
+        if window:
+            self._send(window)
+        while len(checks) < len(ids):
+            checks.append(_parse_check(self._receive(ids[len(checks)])))
+        return checks
+
+    def stats(self) -> Dict[str, int]:
+        """Request, batch and divergence counters of the service."""
+        self._next_id += 1
+        self._send([{"id": self._next_id, "op": "stats"}])
+        return self._receive(self._next_id)["stats"]
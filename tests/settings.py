@@ -0,0 +1,90 @@
+"""
+Run-time settings for the fuzzing harness.
+
+Every setting is read from an environment variable so that it reaches the
+pytest-xdist workers and the standalone fuzz tools in the same way.
+"""
+
+import os
+
+# FFI backend used to call into the native wrappers: "ctypes", "cffi",
+# "extension" or "auto" (benchmark the available backends in each process and
+# use the fastest, which may differ between xdist workers).
+FFI_BACKEND = os.environ.get("FUZZ_FFI_BACKEND", "ctypes")
+
+# Comma-separated BLS12-381 backends of the Rust wrapper under test ("blst",
+# "arkworks"), each built into its own library and compared as a separate
+# implementation. Every test runs once per backend.
+RUST_BACKENDS = os.environ.get("FUZZ_RUST_BACKENDS", "blst,arkworks")
+
+# Build profile of the native wrappers under test, loaded from build/<profile>/
+# ("debug", "release", "lto" or "pgo", see `make profiles`); the builds of
+# `make rust go` in build/ are used when empty.
+BUILD_PROFILE = os.environ.get("FUZZ_BUILD_PROFILE", "")
+
+# How the implementations run the precompiles: "direct" (call the precompile
+# functions) or "evm" (call them from a contract run by revm, the geth
+# interpreter and EELS process_message; needs `make evm`, see eels_evm.py).
+EXECUTION_MODE = os.environ.get("FUZZ_EXECUTION_MODE", "direct")
+
+# Execution of the EELS oracle: "inprocess" (call EELSWrapper directly),
+# "pool" (EELSPool, a pool of pre-warmed worker processes) or "pypy"
+# (EELSRemote, worker processes of the FUZZ_PYPY interpreter).
+EELS_MODE = os.environ.get("FUZZ_EELS_MODE", "inprocess")
+
+# Number of EELSPool or EELSRemote worker processes (0: one per CPU).
+EELS_WORKERS = int(os.environ.get("FUZZ_EELS_WORKERS", "0"))
+
+# Interpreter command of the EELSRemote workers, with the `ethereum` package
+# installed (e.g. "/path/to/.venv-pypy/bin/python").
+PYPY = os.environ.get("FUZZ_PYPY", "pypy3")
+
+# Comparison mode of the tests: "full" (EELS runs on every input) or "tiered"
+# (natives on every input, EELS on divergences, new error classes and coverage
+# buckets, and a sample of the rest; see tiered.py).
+ORACLE_MODE = os.environ.get("FUZZ_ORACLE_MODE", "full")
+
+# Fraction of the remaining inputs confirmed by EELS in tiered mode.
+EELS_SAMPLE_RATE = float(os.environ.get("FUZZ_EELS_SAMPLE_RATE", "0.05"))
+
+# Set to 0 to disable Hypothesis shrinking and report failing examples as
+# found, for minimization with tests/minimizer.py instead.
+HYPOTHESIS_SHRINK = os.environ.get("FUZZ_HYPOTHESIS_SHRINK", "1") != "0"
+
+# Directory where per-call metrics (JSON and Prometheus text format) are
+# written; instrumentation is disabled when empty (see metrics.py).
+METRICS_DIR = os.environ.get("FUZZ_METRICS_DIR", "")
+
+# Interval in seconds between metrics exports, 0 to export only at exit.
+METRICS_INTERVAL = float(os.environ.get("FUZZ_METRICS_INTERVAL", "0"))
+
+# Set to 1 to report the generation vs execution time of each test and the
+# time spent in each named strategy at the end of the session (see timing.py).
+TIMING = os.environ.get("FUZZ_TIMING", "0") == "1"
+
+# Directory of the EELS sampling profiler output (one collapsed-stack file per
+# precompile); the profiler is disabled when empty (see eels_profiler.py).
+EELS_PROFILE_DIR = os.environ.get("FUZZ_EELS_PROFILE_DIR", "")
+
+# Sampling interval of the EELS profiler, in seconds of CPU time.
+EELS_PROFILE_INTERVAL = float(os.environ.get("FUZZ_EELS_PROFILE_INTERVAL", "0.002"))
+
+# Set to 1 to load the instrumented wrappers of `make coverage` from
+# build/coverage/ and keep the inputs reaching new native edges (see
+# native_coverage.py).
+NATIVE_COVERAGE = os.environ.get("FUZZ_NATIVE_COVERAGE", "0") == "1"
+
+# Directory of the inputs kept for reaching new native edges, one
+# subdirectory per precompile (defaults to build/corpus).
+CORPUS_DIR = os.environ.get("FUZZ_CORPUS_DIR", "")
+
+# Set to 1 to skip the inputs already executed in the tests and the raw fuzz
+# loop, tracked by per-precompile Bloom filters (see dedup.py).
+DEDUP = os.environ.get("FUZZ_DEDUP", "0") == "1"
+
+# False positive rate of the dedup filters (unique inputs wrongly skipped).
+DEDUP_ERROR_RATE = float(os.environ.get("FUZZ_DEDUP_ERROR_RATE", "0.0001"))
+
+# Set to 1 to reload the native wrappers when their library file changes, between
+# tests or batches, without restarting the run (see LibCallerWrapper.check_reload).
+HOT_RELOAD = os.environ.get("FUZZ_HOT_RELOAD", "0") == "1"
@@ -1,13 +1,19 @@
 from hypothesis import assume
 from hypothesis import strategies as st
-from hypothesis.strategies import composite
-from py_ecc.bls12_381.bls12_381_curve import G1, G2, curve_order, multiply
+
+from .curve import CURVE_ORDER, G1, G2, g1_to_bytes, g2_to_bytes
+from .timing import composite
 
 # BLS12-381 base field prime (Fp)
 BLS12_381_PRIME = 0x1A0111EA397FE69A4B1BA7B6434BACD764774B84F38512BF6730D2A0F6B0F6241EABFFFEB153FFFFB9FEFFFFFFFFAAAB
 
 LENGTH_PER_PAIR_G1 = 160  # 128 bytes for G1 point, 32 bytes for scalar
 LENGTH_PER_PAIR_G2 = 288  # 256 bytes for G2 point, 32 bytes for scalar
+LENGTH_PER_PAIR_PAIRING = 384  # 128 bytes for G1 point, 256 bytes for G2 point
+
+# Pairing precompile outputs (32-byte big-endian boolean)
+PAIRING_TRUE = (1).to_bytes(32, byteorder="big")
+PAIRING_FALSE = bytes(32)
 
 # BLS12-381 scalar field size
 BLS12_381_SCALAR_FIELD = (
@@ -447,8 +453,9 @@ def valid_g2_point_bytes(draw):
     """
     Generate a valid G2 point using scalar multiplication and serialize it into 256 bytes.
 
-    A random scalar between 1 and curve_order - 1 is drawn, then multiplied by the
-    known generator in G2 (py_ecc.G2). The resulting point is valid by construction.
+    A random scalar between 1 and CURVE_ORDER - 1 is drawn, then multiplied by the
+    known generator in G2 (fixed-base comb, see curve.py). The resulting point is
+    valid by construction.
 
     The point is serialized as (x.c0 || x.c1 || y.c0 || y.c1) with 64 bytes per coordinate.
 
@@ -456,24 +463,11 @@ def valid_g2_point_bytes(draw):
         bytes: 256-byte serialized representation of a valid G2 point
     """
     # Generate a valid G2 point
-    scalar = draw(st.integers(min_value=1, max_value=curve_order - 1))
-    pt = multiply(G2, scalar)
+    scalar = draw(st.integers(min_value=1, max_value=CURVE_ORDER - 1))
+    pt = G2.generator_multiply(scalar)
 
     # Serialize the point
-    x, y = pt
-    # Extract coefficients from FQ2 objects
-    x_c0 = int(x.coeffs[0])
-    x_c1 = int(x.coeffs[1])
-    y_c0 = int(y.coeffs[0])
-    y_c1 = int(y.coeffs[1])
-
-    # Serialize each integer to 64 bytes
-    serialized = (
-        x_c0.to_bytes(64, byteorder="big")
-        + x_c1.to_bytes(64, byteorder="big")
-        + y_c0.to_bytes(64, byteorder="big")
-        + y_c1.to_bytes(64, byteorder="big")
-    )
+    serialized = g2_to_bytes(pt)
 
     assert len(serialized) == 256, f"Expected 256 bytes, got {len(serialized)} bytes"
     return serialized
@@ -506,17 +500,7 @@ def non_bls12_381_g2_points_bytes(draw):
 
 def serialize_g2(pt):
     """Serialize G2 point into 256 bytes."""
-    x, y = pt
-    x_c0 = int(x.coeffs[0])
-    x_c1 = int(x.coeffs[1])
-    y_c0 = int(y.coeffs[0])
-    y_c1 = int(y.coeffs[1])
-    return (
-        x_c0.to_bytes(64, byteorder="big")
-        + x_c1.to_bytes(64, byteorder="big")
-        + y_c0.to_bytes(64, byteorder="big")
-        + y_c1.to_bytes(64, byteorder="big")
-    )
+    return g2_to_bytes(pt)
 
 
 @composite
@@ -524,8 +508,8 @@ def valid_g2_point(draw):
     """
     Generate a valid G2 point deterministically via scalar multiplication.
     """
-    scalar = draw(st.integers(min_value=1, max_value=curve_order - 1))
-    pt = multiply(G2, scalar)
+    scalar = draw(st.integers(min_value=1, max_value=CURVE_ORDER - 1))
+    pt = G2.generator_multiply(scalar)
     return pt
 
 
@@ -694,8 +678,8 @@ def bls12_381_g1_point(draw):
     """
     Generate a valid G1 subgroup element by taking a random multiple of the G1 generator.
     """
-    s = draw(st.integers(min_value=1, max_value=curve_order - 1))
-    return multiply(G1, s)
+    s = draw(st.integers(min_value=1, max_value=CURVE_ORDER - 1))
+    return G1.generator_multiply(s)
 
 
 @composite
@@ -703,8 +687,8 @@ def bls12_381_g2_point(draw):
     """
     Generate a valid G2 subgroup element by taking a random multiple of the G2 generator.
     """
-    s = draw(st.integers(min_value=1, max_value=curve_order - 1))
-    return multiply(G2, s)
+    s = draw(st.integers(min_value=1, max_value=CURVE_ORDER - 1))
+    return G2.generator_multiply(s)
 
 
 @composite
@@ -721,33 +705,15 @@ def pairing_input_bytes(draw):
     for _ in range(num_pairs):
         # Generate a valid G1 point and serialize it.
         g1_point = draw(bls12_381_g1_point())
-        g1x = g1_point[0].n
-        g1y = g1_point[1].n
-        g1x_bytes = g1x.to_bytes(64, byteorder="big")
-        g1y_bytes = g1y.to_bytes(64, byteorder="big")
+        g1_bytes = serialize_g1(g1_point)
 
         # Generate a valid G2 point and serialize it.
-        # G2 points are represented as tuples of two FQ2 elements: ((x0, x1), (y0, y1))
+        # G2 points are represented as ((x_c0, x_c1), (y_c0, y_c1))
         g2_point = draw(bls12_381_g2_point())
-        g2x_real = g2_point[0].coeffs[0].n
-        g2x_imag = g2_point[0].coeffs[1].n
-        g2y_real = g2_point[1].coeffs[0].n
-        g2y_imag = g2_point[1].coeffs[1].n
-        g2x_real_bytes = g2x_real.to_bytes(64, byteorder="big")
-        g2x_imag_bytes = g2x_imag.to_bytes(64, byteorder="big")
-        g2y_real_bytes = g2y_real.to_bytes(64, byteorder="big")
-        g2y_imag_bytes = g2y_imag.to_bytes(64, byteorder="big")
+        g2_bytes = serialize_g2(g2_point)
 
         # Concatenate the serialized coordinates.
-        pair_bytes = (
-            g1x_bytes
-            + g1y_bytes
-            + g2x_real_bytes
-            + g2x_imag_bytes
-            + g2y_real_bytes
-            + g2y_imag_bytes
-        )
-        result += pair_bytes
+        result += g1_bytes + g2_bytes
 
     return result
 
@@ -774,3 +740,83 @@ def invalid_size_pairing_bytes(draw):
 
     # Generate the actual bytes
     return draw(st.binary(min_size=size, max_size=size))
+
+
+def serialize_g1(pt):
+    """Serialize G1 point into 128 bytes."""
+    return g1_to_bytes(pt)
+
+
+@composite
+def pairing_bilinear_input_bytes(draw, min_pairs=1, max_pairs=16, identity=None):
+    """
+    Generate pairing input whose result is known by construction.
+
+    With P and Q the G1 and G2 generators and scalars a, b drawn in [1, r - 1]:
+    - cancelling couples (a*P, b*Q), (-ab*P, Q), whose pairings multiply to
+      e(P, Q)^(ab - ab) = 1
+    - infinity pairs (either or both points at infinity) contributing 1
+    - if identity is False, one extra (a*P, b*Q) pair contributing
+      e(P, Q)^ab != 1, making the product != 1
+    The pairs are shuffled, so the result is PAIRING_TRUE if identity else PAIRING_FALSE.
+    Points are generator multiples computed with the comb (curve.py), the
+    points of each group normalized together.
+
+    Args:
+        min_pairs: Minimum number of pairs
+        max_pairs: Maximum number of pairs
+        identity: Whether the product of pairings is 1 (drawn when None)
+    """
+    if identity is None:
+        identity = draw(st.booleans())
+    scalar = st.integers(min_value=1, max_value=CURVE_ORDER - 1)
+
+    num_pairs = draw(
+        st.integers(min_value=max(min_pairs, 0 if identity else 1), max_value=max_pairs)
+    )
+    # Scalars of the G1 and G2 point of each pair, None for infinity
+    scalar_pairs = []
+
+    if not identity:
+        scalar_pairs.append((draw(scalar), draw(scalar)))
+
+    num_couples = draw(
+        st.integers(min_value=0, max_value=(num_pairs - len(scalar_pairs)) // 2)
+    )
+    for _ in range(num_couples):
+        a, b = draw(scalar), draw(scalar)
+        scalar_pairs.append((a, b))
+        scalar_pairs.append((-a * b % CURVE_ORDER, 1))
+
+    # Infinity pairs: the kind first, then the scalar of the finite point if any
+    while len(scalar_pairs) < num_pairs:
+        kind = draw(st.sampled_from(["g1_infinity", "g2_infinity", "both_infinity"]))
+        if kind == "g1_infinity":
+            scalar_pairs.append((None, draw(scalar)))
+        elif kind == "g2_infinity":
+            scalar_pairs.append((draw(scalar), None))
+        else:
+            scalar_pairs.append((None, None))
+
+    g1_scalars = [a for a, _ in scalar_pairs if a is not None]
+    g2_scalars = [b for _, b in scalar_pairs if b is not None]
+    g1_points = iter(G1.generator_multiply_many(g1_scalars))
+    g2_points = iter(G2.generator_multiply_many(g2_scalars))
+    pairs = [
+        (bytes(128) if a is None else serialize_g1(next(g1_points)))
+        + (bytes(256) if b is None else serialize_g2(next(g2_points)))
+        for a, b in scalar_pairs
+    ]
+    return b"".join(draw(st.permutations(pairs)))
+
+
+# Strategies generating valid inputs for each precompile
+VALID_INPUT_STRATEGIES = {
+    "g1_add": two_bls12_381_points_bytes,
+    "g2_add": two_bls12_381_g2_points_bytes,
+    "g1_msm": g1_msm_valid_subgroup_input_bytes,
+    "g2_msm": g2_msm_input_bytes,
+    "map_fp_to_g1": valid_fp_field_element_bytes,
+    "map_fp2_to_g2": valid_fp2_field_element_bytes,
+    "pairing": pairing_bilinear_input_bytes,
+}
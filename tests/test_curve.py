@@ -0,0 +1,45 @@
+import pytest
+from py_ecc.bls12_381 import bls12_381_curve as py_ecc_curve
+
+from .curve import CURVE_ORDER, G1, G2
+
+# Edge scalars: zero, one, the order and its neighbour, the largest 32-byte value
+EDGE_SCALARS = [0, 1, 2, CURVE_ORDER - 1, CURVE_ORDER, CURVE_ORDER + 1, 2**256 - 1]
+
+
+def py_ecc_affine(point):
+    """A py_ecc point as the affine ints of tests/curve.py, None at infinity."""
+    if point is None:
+        return None
+    return tuple(
+        (
+            tuple(int(c) for c in coordinate.coeffs)
+            if hasattr(coordinate, "coeffs")
+            else int(coordinate)
+        )
+        for coordinate in point
+    )
+
+
+@pytest.mark.parametrize(
+    "curve, py_ecc_generator",
+    [(G1, py_ecc_curve.G1), (G2, py_ecc_curve.G2)],
+    ids=["G1", "G2"],
+)
+def test_multiplication_matches_py_ecc(curve, py_ecc_generator):
+    """wNAF, comb and batched comb multiplications agree with py_ecc."""
+    expected = [
+        py_ecc_affine(py_ecc_curve.multiply(py_ecc_generator, scalar))
+        for scalar in EDGE_SCALARS
+    ]
+    assert [
+        curve.multiply(curve.generator, scalar) for scalar in EDGE_SCALARS
+    ] == expected
+    assert [curve.generator_multiply(scalar) for scalar in EDGE_SCALARS] == expected
+    assert curve.generator_multiply_many(EDGE_SCALARS) == expected
+    assert (
+        curve.multiply_many([(curve.generator, scalar) for scalar in EDGE_SCALARS])
+        == expected
+    )
+    for point in expected:
+        assert point is None or curve.is_on_curve(point)
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from .dedup import BloomFilter, Deduplicator, RotatingFilter, deduplicate_test
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Every added item is found."""
+    bloom = BloomFilter(1000, 0.01)
+    items = [i.to_bytes(4, "big") for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    assert bloom.count == 1000
+
+
+def test_bloom_filter_false_positive_rate():
+    """At capacity, the false positive rate is about the configured one."""
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(i.to_bytes(4, "big"))
+    false_positives = sum(i.to_bytes(4, "big") in bloom for i in range(1000, 101000))
+    assert false_positives / 100000 < 0.02
+
+
+def test_rotating_filter_false_positive_rate():
+    """With both generations full, the rate stays below the configured one."""
+    rotating = RotatingFilter(1000, 0.01)
+    for i in range(2000):
+        rotating.add(i.to_bytes(4, "big"))
+    assert rotating.previous is not None
+    false_positives = sum(i.to_bytes(4, "big") in rotating for i in range(2000, 102000))
+    assert false_positives / 100000 < 0.015
+
+
+def test_rotating_filter_drops_oldest_generation():
+    """Items of the previous generation are kept, older ones are dropped."""
+    rotating = RotatingFilter(100, 1e-9)
+    memory = None
+    for generation in range(3):
+        for i in range(100):
+            rotating.add(bytes([generation, i]))
+        memory = memory or rotating.memory
+    assert all(bytes([1, i]) in rotating for i in range(100))
+    assert all(bytes([2, i]) in rotating for i in range(100))
+    assert not any(bytes([0, i]) in rotating for i in range(100))
+    # Two generations at most
+    assert rotating.memory == 2 * memory
+
+
+def test_deduplicator_unique():
+    """Duplicates are dropped within and across calls, and counted."""
+    deduplicator = Deduplicator()
+    assert deduplicator.unique("g1_add", [b"a", b"b", b"a"]) == [b"a", b"b"]
+    assert deduplicator.unique("g1_add", [b"b", b"c"]) == [b"c"]
+    # Each op has its own filter
+    assert deduplicator.unique("g2_add", [b"a"]) == [b"a"]
+    assert deduplicator.stats["g1_add.checked"] == 5
+    assert deduplicator.stats["g1_add.duplicates"] == 2
+    deduplicator.reset()
+    assert deduplicator.unique("g1_add", [b"a"]) == [b"a"]
+
+
+def _backend(name, digest=None):
+    return SimpleNamespace(name=name, digest=digest)
+
+
+def _counting_test(calls, failing=()):
+    @given(input_data=st.sampled_from([b"a", b"b", b"c"]))
+    @settings(max_examples=50, database=None, derandomize=True)
+    def inner(rust_wrapper, input_data):
+        calls.append((rust_wrapper.name, input_data))
+        assert input_data not in failing
+
+    return inner
+
+
+def test_deduplicate_test_runs_each_input_once():
+    """An input runs once per test, Rust backend and native build."""
+    calls = []
+    test = _counting_test(calls)
+    deduplicate_test(test, "g1_add", Deduplicator())
+    test(rust_wrapper=_backend("blst"))
+    assert sorted(calls) == [("blst", b"a"), ("blst", b"b"), ("blst", b"c")]
+    test(rust_wrapper=_backend("blst"))
+    assert len(calls) == 3
+    # Another backend, and a new build of the same one
+    test(rust_wrapper=_backend("arkworks"))
+    test(rust_wrapper=_backend("blst", digest="new build"))
+    assert len(calls) == 9
+
+
+def test_deduplicate_test_replays_failing_inputs():
+    """A failing input is not recorded, so it is executed again."""
+    calls = []
+    test = _counting_test(calls, failing=(b"b",))
+    deduplicate_test(test, "g1_add", Deduplicator())
+    with pytest.raises(AssertionError):
+        test(rust_wrapper=_backend("blst"))
+    assert calls.count(("blst", b"b")) >= 2
+    assert calls.count(("blst", b"a")) <= 1
@@ -0,0 +1,56 @@
+import pytest
+
+from wrappers.python.eels_wrapper import MAX_GAS, PRECOMPILES, MockEvm, gas_cost
+
+from .layouts import OPS
+
+# Lengths of valid all-zero inputs (points at infinity, zero scalars)
+VALID_LENGTHS = {
+    "g1_add": [256],
+    "g2_add": [512],
+    "map_fp_to_g1": [64],
+    "map_fp2_to_g2": [128],
+    "g1_msm": [160 * k for k in (1, 2, 3, 64, 127, 128, 129, 130)],
+    "g2_msm": [288 * k for k in (1, 2, 3, 64, 127, 128, 129, 130)],
+    "pairing": [384 * k for k in (1, 2, 3)],
+}
+
+INVALID_LENGTHS = {
+    "g1_add": [0, 255, 257, 512],
+    "g2_add": [0, 256, 511],
+    "map_fp_to_g1": [0, 63, 128],
+    "map_fp2_to_g2": [0, 64, 127],
+    "g1_msm": [0, 159, 161, 288],
+    "g2_msm": [0, 160, 287, 289],
+    "pairing": [0, 383, 385, 512],
+}
+
+
+@pytest.mark.parametrize("op", OPS)
+def test_gas_cost_matches_eels_charge(op):
+    """The gas from the input length is the gas the EELS precompile charges."""
+    for length in VALID_LENGTHS[op]:
+        evm = MockEvm(bytes(length))
+        PRECOMPILES[op](evm)
+        assert gas_cost(op, bytes(length)) == MAX_GAS - evm.gas_left, length
+
+
+@pytest.mark.parametrize("op", OPS)
+def test_gas_cost_invalid_length(op):
+    """Lengths the precompile rejects have no gas."""
+    for length in INVALID_LENGTHS[op]:
+        assert gas_cost(op, bytes(length)) is None, length
+
+
+def test_gas_cost_documented_values():
+    """Costs listed in EIP-2537."""
+    assert gas_cost("g1_add", bytes(256)) == 375
+    assert gas_cost("g2_add", bytes(512)) == 600
+    assert gas_cost("map_fp_to_g1", bytes(64)) == 5500
+    assert gas_cost("map_fp2_to_g2", bytes(128)) == 23800
+    assert gas_cost("g1_msm", bytes(160)) == 12000
+    assert gas_cost("g2_msm", bytes(288)) == 22500
+    assert gas_cost("pairing", bytes(384 * 2)) == 32600 * 2 + 37700
+    # Past 128 pairs, the discount of the last table entry
+    assert gas_cost("g1_msm", bytes(160 * 200)) == 200 * 12000 * 519 // 1000
+    assert gas_cost("g2_msm", bytes(288 * 200)) == 200 * 22500 * 524 // 1000
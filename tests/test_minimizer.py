@@ -0,0 +1,42 @@
+from .layouts import LAYOUTS
+from .minimizer import Minimizer, minimize_divergence
+
+
+class Fixed:
+    """Implementation returning the same output for every g1_msm input."""
+
+    def __init__(self, output):
+        self.output = output
+
+    def g1_msm(self, input_bytes):
+        return self.output
+
+
+class PairCount:
+    """Implementation whose output depends on the number of g1_msm pairs."""
+
+    def g1_msm(self, input_bytes):
+        pairs = len(input_bytes) // LAYOUTS["g1_msm"].unit_size
+        return b"g" if pairs >= 3 else b"r"
+
+
+def test_minimize_keeps_the_original_groups():
+    """
+    Dropping pairs makes go agree with rust while python still disagrees: the
+    input diverges, but not the same way, so the three pairs are kept.
+    """
+    implementations = {"rust": Fixed(b"r"), "go": PairCount(), "python": Fixed(b"p")}
+    input_bytes = bytes(3 * LAYOUTS["g1_msm"].unit_size)
+    minimized = minimize_divergence("g1_msm", input_bytes, implementations, workers=1)
+    assert len(minimized) == len(input_bytes)
+
+
+def test_minimize_drops_pairs():
+    """Pairs that do not matter to the divergence are dropped."""
+    minimizer = Minimizer("g1_msm", {"rust": Fixed(b"r"), "go": Fixed(b"g")}, 1)
+    try:
+        input_bytes = bytes(range(256)) * 5
+        minimized = minimizer.minimize(input_bytes)
+    finally:
+        minimizer.close()
+    assert len(minimized) == LAYOUTS["g1_msm"].unit_size
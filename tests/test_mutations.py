@@ -0,0 +1,44 @@
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from .layouts import OPS
+from .mutator import mutated_input_bytes
+from .strategies import VALID_INPUT_STRATEGIES
+
+
+@pytest.mark.parametrize("op", OPS)
+@given(data=st.data())
+@settings(deadline=5000)
+def test_mutated_valid_input(rust_wrapper, go_wrapper, python_wrapper, op, data):
+    """
+    Test valid inputs with a few structure-aware mutations applied
+    (non-canonical field elements, flipped y, infinity, scalars >= r, ...).
+    All implementations should either succeed with the same result or all fail.
+    """
+    input_data = data.draw(mutated_input_bytes(op, VALID_INPUT_STRATEGIES[op]()))
+
+    implementations = [
+        ("rust", getattr(rust_wrapper, op)),
+        ("go", getattr(go_wrapper, op)),
+        ("python", getattr(python_wrapper, op)),
+    ]
+
+    results = []
+    errors = []
+
+    for name, func in implementations:
+        try:
+            results.append((name, func(input_data)))
+        except RuntimeError as e:
+            errors.append((name, str(e)))
+
+    # Check for consistency: all should succeed or all should fail
+    if results and errors:
+        pytest.fail(f"Inconsistent behavior: {results} succeeded but {errors} failed")
+
+    # If all succeeded, verify they return the same result
+    if results:
+        first_name, first_result = results[0]
+        for name, result in results[1:]:
+            assert first_result == result, f"{first_name} and {name} disagree on result"
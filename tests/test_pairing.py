@@ -2,7 +2,13 @@ import pytest
 from hypothesis import given, settings
 from hypothesis import strategies as st
 
-from .strategies import invalid_size_pairing_bytes, pairing_input_bytes
+from .strategies import (
+    PAIRING_FALSE,
+    PAIRING_TRUE,
+    invalid_size_pairing_bytes,
+    pairing_bilinear_input_bytes,
+    pairing_input_bytes,
+)
 
 
 @given(input_data=pairing_input_bytes())
@@ -15,6 +21,72 @@ def test_pairing(rust_wrapper, go_wrapper, python_wrapper, input_data):
     assert rust_result == go_result == python_result
 
 
+@given(input_data=pairing_bilinear_input_bytes(max_pairs=16, identity=True))
+@settings(deadline=5000)
+def test_pairing_bilinear_identity(
+    rust_wrapper, go_wrapper, python_wrapper, input_data
+):
+    """
+    Test pairing inputs whose product of pairings is 1 by construction.
+    """
+    python_result = python_wrapper.pairing(input_data)
+    rust_result = rust_wrapper.pairing(input_data)
+    go_result = go_wrapper.pairing(input_data)
+
+    assert rust_result == go_result == python_result == PAIRING_TRUE
+
+
+@given(input_data=pairing_bilinear_input_bytes(max_pairs=16, identity=False))
+@settings(deadline=5000)
+def test_pairing_bilinear_non_identity(
+    rust_wrapper, go_wrapper, python_wrapper, input_data
+):
+    """
+    Test pairing inputs whose product of pairings is not 1 by construction.
+    """
+    python_result = python_wrapper.pairing(input_data)
+    rust_result = rust_wrapper.pairing(input_data)
+    go_result = go_wrapper.pairing(input_data)
+
+    assert rust_result == go_result == python_result == PAIRING_FALSE
+
+
+@given(
+    input_data=pairing_bilinear_input_bytes(min_pairs=32, max_pairs=64, identity=True)
+)
+@settings(deadline=None, max_examples=3)
+def test_pairing_bilinear_many_pairs_identity(
+    rust_wrapper, go_wrapper, python_wrapper, input_data
+):
+    """
+    Test pairing inputs of 32 to 64 pairs whose product of pairings is 1 by
+    construction (a few examples: EELS takes seconds per input).
+    """
+    python_result = python_wrapper.pairing(input_data)
+    rust_result = rust_wrapper.pairing(input_data)
+    go_result = go_wrapper.pairing(input_data)
+
+    assert rust_result == go_result == python_result == PAIRING_TRUE
+
+
+@given(
+    input_data=pairing_bilinear_input_bytes(min_pairs=32, max_pairs=64, identity=False)
+)
+@settings(deadline=None, max_examples=3)
+def test_pairing_bilinear_many_pairs_non_identity(
+    rust_wrapper, go_wrapper, python_wrapper, input_data
+):
+    """
+    Test pairing inputs of 32 to 64 pairs whose product of pairings is not 1 by
+    construction (a few examples: EELS takes seconds per input).
+    """
+    python_result = python_wrapper.pairing(input_data)
+    rust_result = rust_wrapper.pairing(input_data)
+    go_result = go_wrapper.pairing(input_data)
+
+    assert rust_result == go_result == python_result == PAIRING_FALSE
+
+
 @given(input_data=st.binary(min_size=384, max_size=384 * 3))
 def test_pairing_error_handling(rust_wrapper, go_wrapper, python_wrapper, input_data):
     try:
@@ -0,0 +1,53 @@
+from collections import Counter
+
+import pytest
+
+from .tiered import LastOutcome, TieredOracle
+
+G1_ADD_INPUT = bytes(256)
+
+
+class Counting:
+    """Implementation counting its g1_add calls."""
+
+    def __init__(self, output=b"\x00" * 128, digest=None):
+        self.output = output
+        self.digest = digest
+        self.calls = Counter()
+
+    def g1_add(self, input_bytes):
+        self.calls[input_bytes] += 1
+        if self.output is None:
+            raise RuntimeError("invalid point")
+        return self.output
+
+
+def test_oracle_reuses_the_native_outcomes_of_the_test():
+    """Each input runs once on each native, on the test and oracle side."""
+    rust, go, eels = Counting(), Counting(), Counting()
+    natives = {"rust": LastOutcome(rust), "go": LastOutcome(go)}
+    oracle = TieredOracle(natives, eels)
+    for name in ("rust", "go"):
+        assert natives[name].g1_add(G1_ADD_INPUT) == b"\x00" * 128
+    assert oracle.g1_add(G1_ADD_INPUT) == b"\x00" * 128
+    assert rust.calls[G1_ADD_INPUT] == go.calls[G1_ADD_INPUT] == 1
+    # The first input of a bucket is confirmed
+    assert eels.calls[G1_ADD_INPUT] == 1
+
+
+def test_last_outcome():
+    """Failures are replayed, and a new input or build runs again."""
+    native = Counting(output=None)
+    wrapper = LastOutcome(native)
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="invalid point"):
+            wrapper.g1_add(G1_ADD_INPUT)
+    assert native.calls[G1_ADD_INPUT] == 1
+    assert wrapper.digest is None
+    native.digest = "new build"
+    with pytest.raises(RuntimeError):
+        wrapper.g1_add(G1_ADD_INPUT)
+    assert native.calls[G1_ADD_INPUT] == 2
+    with pytest.raises(RuntimeError):
+        wrapper.g1_add(bytes(255))
+    assert native.calls[bytes(255)] == 1
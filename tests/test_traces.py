@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from .traces import (
+    BINARY_CALL,
+    BINARY_OUTPUT_LENGTH,
+    Call,
+    PackedTrace,
+    import_trace,
+)
+
+# A successful g1_add, a call to the identity precompile (skipped) and a failed
+# pairing, whose gas is all the gas of the call
+CALLS = [
+    Call(0x0B, bytes(range(256)), 375, b"\x01" * 128),
+    Call(0x04, b"not a BLS12-381 call", 18, b"not a BLS12-381 call"),
+    Call(0x0F, b"\xff" * 384, 70300, None),
+]
+
+
+def write_jsonl(path, calls):
+    with open(path, "w") as f:
+        for call in calls:
+            line = {
+                "address": hex(call.address),
+                "input": "0x" + call.input.hex(),
+                "gas": call.gas,
+                "output": None if call.output is None else "0x" + call.output.hex(),
+            }
+            f.write(json.dumps(line) + "\n")
+        # Blank lines are ignored
+        f.write("\n")
+
+
+def write_binary(path, calls):
+    with open(path, "wb") as f:
+        for call in calls:
+            f.write(BINARY_CALL.pack(call.address, call.gas, len(call.input)))
+            f.write(call.input)
+            if call.output is None:
+                f.write(BINARY_OUTPUT_LENGTH.pack(-1))
+            else:
+                f.write(BINARY_OUTPUT_LENGTH.pack(len(call.output)))
+                f.write(call.output)
+
+
+WRITERS = {"jsonl": write_jsonl, "binary": write_binary}
+
+
+@pytest.mark.parametrize("trace_format", WRITERS)
+def test_import_round_trip(tmp_path, trace_format):
+    """Imported calls read back from the packed file, other addresses skipped."""
+    source = tmp_path / f"calls.{trace_format}"
+    WRITERS[trace_format](source, CALLS)
+    packed = tmp_path / "packed" / "calls.trace"
+    assert import_trace(source, packed, trace_format) == (2, 1)
+
+    trace = PackedTrace(packed)
+    try:
+        assert len(trace) == 2
+        records = list(trace.records())
+        added, failed = records
+        assert added.index == 0
+        assert added.op == "g1_add"
+        assert added.gas == 375
+        assert added.input == CALLS[0].input
+        assert added.expected == (True, CALLS[0].output)
+        assert failed.index == 1
+        assert failed.op == "pairing"
+        assert failed.gas == 70300
+        assert failed.input == CALLS[2].input
+        assert failed.expected == (False, b"")
+        # Batches stream the same records
+        assert [record for batch in trace.batches(1) for record in batch] == records
+    finally:
+        trace.close()
+
+
+def test_truncated_binary_trace(tmp_path):
+    """A binary trace cut in the middle of a call is rejected."""
+    source = tmp_path / "calls.binary"
+    write_binary(source, CALLS[:1])
+    source.write_bytes(source.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="Truncated"):
+        import_trace(source, tmp_path / "calls.trace", "binary")
+
+
+def test_not_a_packed_trace(tmp_path):
+    path = tmp_path / "calls.trace"
+    path.write_bytes(bytes(64))
+    with pytest.raises(ValueError, match="not a packed trace"):
+        PackedTrace(path)
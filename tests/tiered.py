@@ -0,0 +1,239 @@
+"""
+Tiered oracle: native implementations first, sampled EELS confirmation.
+
+The native implementations run on every input. The slow EELS oracle only runs
+when it can tell us something:
+
+- the natives disagree (native_divergence)
+- the input falls in an error class not seen before (new_error_class)
+- the input falls in a coverage bucket not seen before (new_bucket)
+- the input is in the deterministic sample of FUZZ_EELS_SAMPLE_RATE (sampled)
+
+Otherwise the native consensus stands in for EELS. When the natives agree on a
+failure, the EELS error message recorded for the same error class is replayed,
+so tests matching on EELS messages (e.g. "Sub-group check failed") still work.
+
+Under pytest, the tests and the oracle share the natives through LastOutcome,
+so the oracle reuses the outcomes of the native calls the test already made
+(and the other way around) instead of running each input twice.
+"""
+
+import functools
+import hashlib
+from collections import Counter
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .differential import Outcome, is_divergent, run_one
+from .input_classes import edge_features, failure_stage
+from .layouts import LAYOUTS, OPS
+
+# Reasons for running the oracle, in priority order
+REASONS = ("native_divergence", "new_error_class", "new_bucket", "sampled")
+
+
+def coverage_bucket(op: str, input_bytes: bytes, stage: str, ok: bool) -> Tuple:
+    """
+    Coarse behavioural bucket of an input: failure stage, native success,
+    number of units (log2) and whether any point is infinity or scalar is zero.
+    """
+    if stage == "length":
+        return (op, stage, ok)
+    units = len(input_bytes) // LAYOUTS[op].unit_size
+    return (op, stage, ok, units.bit_length(), *edge_features(op, input_bytes))
+
+
+def is_sampled(op: str, input_bytes: bytes, sample_rate: float) -> bool:
+    """Deterministic sample: the same input is always (or never) sampled."""
+    digest = hashlib.blake2b(op.encode() + input_bytes, digest_size=8).digest()
+    return int.from_bytes(digest, "big") < sample_rate * 2**64
+
+
+class LastOutcome:
+    """
+    Native implementation remembering the outcome of its last call: the same
+    input of the same op, on the same build, is not run again.
+    """
+
+    def __init__(self, implementation):
+        self.implementation = implementation
+        # (op, input, build digest, outcome)
+        self._last: Optional[Tuple[str, bytes, Optional[str], Outcome]] = None
+
+    def __getattr__(self, name):
+        # Everything but the ops (name, digest, check_reload, ...) is delegated
+        if name not in OPS:
+            return getattr(self.implementation, name)
+        return functools.partial(self._call, name)
+
+    def _call(self, op: str, input_bytes: bytes) -> bytes:
+        digest = getattr(self.implementation, "digest", None)
+        if self._last is not None and self._last[:3] == (op, input_bytes, digest):
+            ok, value = self._last[3]
+        else:
+            ok, value = run_one(self.implementation, op, input_bytes)
+            self._last = (op, input_bytes, digest, (ok, value))
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+
+class TieredOracle:
+    """
+    Differential checker running the oracle only on selected inputs.
+
+    Exposes the EELSWrapper methods, so it can stand in for the python
+    implementation: each call runs the natives, then returns the oracle
+    outcome, or the native consensus when the oracle was skipped. Natives
+    wrapped in LastOutcome and shared with the caller are not run again on
+    the input the caller just ran.
+    """
+
+    def __init__(
+        self,
+        natives: Mapping[str, object],
+        oracle,
+        oracle_name: str = "python",
+        sample_rate: float = 0.05,
+        bucket: Callable[[str, bytes, str, bool], Tuple] = coverage_bucket,
+    ):
+        """
+        Args:
+            natives: Fast implementations, run on every input
+            oracle: Slow reference implementation (EELSWrapper or EELSPool)
+            oracle_name: Name of the oracle in the returned outcomes
+            sample_rate: Fraction of the remaining inputs confirmed by the oracle
+            bucket: Coverage bucket of (op, input, failure stage, native success)
+        """
+        self.natives = dict(natives)
+        self.oracle = oracle
+        self.oracle_name = oracle_name
+        self.sample_rate = sample_rate
+        self.bucket = bucket
+        self.seen_buckets = set()
+        # Oracle error message of each error class seen so far
+        self.error_messages: Dict[Tuple, str] = {}
+        self.stats = Counter()
+        self._last: Optional[Tuple[str, bytes, Dict[str, Outcome]]] = None
+
+    def _reason(self, op: str, input_bytes: bytes, outcomes) -> Optional[str]:
+        """Why the oracle should run on this input, None to skip it."""
+        if is_divergent(outcomes):
+            return "native_divergence"
+        ok = next(iter(outcomes.values()))[0]
+        stage = failure_stage(op, input_bytes)
+        if not ok and (op, stage) not in self.error_messages:
+            return "new_error_class"
+        bucket = self.bucket(op, input_bytes, stage, ok)
+        if bucket not in self.seen_buckets:
+            self.seen_buckets.add(bucket)
+            return "new_bucket"
+        if is_sampled(op, input_bytes, self.sample_rate):
+            return "sampled"
+        return None
+
+    def check_batch(self, op: str, inputs: Sequence[bytes]) -> List[Dict[str, Outcome]]:
+        """
+        Run `op` on every input. The oracle receives the selected inputs as one
+        batch when it has a run_batch() method (EELSPool).
+
+        Returns:
+            The outcomes by name of each input; the oracle entry is only
+            present when the oracle ran
+        """
+        batch_outcomes = []
+        selected = []
+        for index, input_bytes in enumerate(inputs):
+            outcomes = {
+                name: run_one(native, op, input_bytes)
+                for name, native in self.natives.items()
+            }
+            batch_outcomes.append(outcomes)
+            self.stats["inputs"] += 1
+            reason = self._reason(op, input_bytes, outcomes)
+            if reason is None:
+                continue
+            self.stats[reason] += 1
+            selected.append(index)
+
+        selected_inputs = [inputs[index] for index in selected]
+        if hasattr(self.oracle, "run_batch"):
+            oracle_outcomes = self.oracle.run_batch(op, selected_inputs)
+        else:
+            oracle_outcomes = [
+                run_one(self.oracle, op, input_bytes) for input_bytes in selected_inputs
+            ]
+
+        for index, oracle_outcome in zip(selected, oracle_outcomes, strict=True):
+            outcomes = batch_outcomes[index]
+            native_divergence = is_divergent(outcomes)
+            outcomes[self.oracle_name] = oracle_outcome
+            self.stats["oracle_runs"] += 1
+            if not oracle_outcome[0]:
+                stage = failure_stage(op, inputs[index])
+                self.error_messages.setdefault((op, stage), oracle_outcome[1])
+            if not is_divergent(outcomes):
+                self.stats["full_confirmations"] += 1
+            elif not native_divergence:
+                self.stats["oracle_divergences"] += 1
+        return batch_outcomes
+
+    def check(self, op: str, input_bytes: bytes) -> Dict[str, Outcome]:
+        """Run `op` on one input (see check_batch)."""
+        return self.check_batch(op, [input_bytes])[0]
+
+    def _call(self, op: str, input_bytes: bytes) -> bytes:
+        # Tests call the oracle several times on the same input: decide once
+        if self._last is not None and self._last[:2] == (op, input_bytes):
+            outcomes = self._last[2]
+        else:
+            outcomes = self.check(op, input_bytes)
+            self._last = (op, input_bytes, outcomes)
+
+        if self.oracle_name in outcomes:
+            ok, value = outcomes[self.oracle_name]
+        else:
+            ok, value = next(iter(outcomes.values()))
+            if not ok:
+                value = self.error_messages[(op, failure_stage(op, input_bytes))]
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def map_fp_to_g1(self, input_bytes):
+        return self._call("map_fp_to_g1", input_bytes)
+
+    def g1_add(self, input_bytes):
+        return self._call("g1_add", input_bytes)
+
+    def g1_msm(self, input_bytes):
+        return self._call("g1_msm", input_bytes)
+
+    def g2_add(self, input_bytes):
+        return self._call("g2_add", input_bytes)
+
+    def g2_msm(self, input_bytes):
+        return self._call("g2_msm", input_bytes)
+
+    def map_fp2_to_g2(self, input_bytes):
+        return self._call("map_fp2_to_g2", input_bytes)
+
+    def pairing(self, input_bytes):
+        return self._call("pairing", input_bytes)
+
+
+def format_stats(stats: Mapping[str, int]) -> List[str]:
+    """Report lines of the tiered oracle counters."""
+    inputs = stats.get("inputs", 0)
+    if not inputs:
+        return ["no inputs checked"]
+    runs = stats.get("oracle_runs", 0)
+    lines = [
+        f"inputs checked:            {inputs}",
+        f"oracle runs:               {runs} ({100 * runs / inputs:.1f}%)",
+    ]
+    lines += [f"  {reason + ':':<24}{stats.get(reason, 0)}" for reason in REASONS]
+    lines += [
+        f"full 3-way confirmations:  {stats.get('full_confirmations', 0)}",
+        f"oracle-only divergences:   {stats.get('oracle_divergences', 0)}",
+    ]
+    return lines
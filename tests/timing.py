@@ -0,0 +1,167 @@
+"""
+Generation vs execution time breakdown of the tests (FUZZ_TIMING=1).
+
+The wall time of each test is split into:
+
+- generation: time spent drawing inputs from the named strategies of
+  strategies.py and mutator.py (their @composite is the timed one below)
+- execution: time spent in each implementation
+- other: the rest (Hypothesis engine, comparisons, fixtures)
+
+Strategies are also reported on their own, with inclusive time and self time
+(excluding the named strategies they draw from), ranked by self time: the
+first line is the generator to optimize first.
+"""
+
+import functools
+from time import perf_counter_ns
+from typing import Dict, Iterable, List, Optional
+
+from hypothesis.strategies import composite as hypothesis_composite
+
+from . import settings
+
+
+class TimingReport:
+    """Per-test and per-strategy time accumulators, in nanoseconds."""
+
+    def __init__(self):
+        # nodeid -> {"total": ns, "generation": ns, "execution": {impl: ns}}
+        self.tests: Dict[str, dict] = {}
+        # strategy name -> [draws, inclusive ns, self ns]
+        self.strategies: Dict[str, List[int]] = {}
+        self.current_test: Optional[str] = None
+        # Time spent in named strategies drawn by each strategy being drawn
+        self.draw_stack: List[int] = []
+
+    def _test(self, nodeid: str) -> dict:
+        if nodeid not in self.tests:
+            self.tests[nodeid] = {"total": 0, "generation": 0, "execution": {}}
+        return self.tests[nodeid]
+
+    def add_draw(self, name: str, elapsed_ns: int, children_ns: int):
+        entry = self.strategies.setdefault(name, [0, 0, 0])
+        entry[0] += 1
+        entry[1] += elapsed_ns
+        entry[2] += elapsed_ns - children_ns
+        if self.draw_stack:
+            self.draw_stack[-1] += elapsed_ns
+        elif self.current_test is not None:
+            self._test(self.current_test)["generation"] += elapsed_ns
+
+    def add_execution(self, implementation: str, elapsed_ns: int):
+        if self.current_test is None:
+            return
+        execution = self._test(self.current_test)["execution"]
+        execution[implementation] = execution.get(implementation, 0) + elapsed_ns
+
+    def add_test(self, nodeid: str, elapsed_ns: int):
+        self._test(nodeid)["total"] += elapsed_ns
+
+    def to_dict(self) -> dict:
+        return {"tests": self.tests, "strategies": self.strategies}
+
+    def merge(self, data: dict):
+        """Add the accumulators of another report (e.g. of an xdist worker)."""
+        for nodeid, test in data["tests"].items():
+            own = self._test(nodeid)
+            own["total"] += test["total"]
+            own["generation"] += test["generation"]
+            for implementation, elapsed in test["execution"].items():
+                own["execution"][implementation] = (
+                    own["execution"].get(implementation, 0) + elapsed
+                )
+        for name, values in data["strategies"].items():
+            entry = self.strategies.setdefault(name, [0, 0, 0])
+            for index, value in enumerate(values):
+                entry[index] += value
+
+
+REPORT = TimingReport()
+
+
+def composite(f):
+    """
+    hypothesis.strategies.composite, timing every draw of the strategy when
+    FUZZ_TIMING is enabled.
+    """
+    if not settings.TIMING:
+        return hypothesis_composite(f)
+
+    @functools.wraps(f)
+    def timed(draw, *args, **kwargs):
+        REPORT.draw_stack.append(0)
+        start = perf_counter_ns()
+        try:
+            return f(draw, *args, **kwargs)
+        finally:
+            elapsed = perf_counter_ns() - start
+            REPORT.add_draw(f.__name__, elapsed, REPORT.draw_stack.pop())
+
+    return hypothesis_composite(timed)
+
+
+def time_calls(implementation: str, function):
+    """Wrap a precompile function to add its run time to the current test."""
+
+    def timed(*args):
+        start = perf_counter_ns()
+        try:
+            return function(*args)
+        finally:
+            REPORT.add_execution(implementation, perf_counter_ns() - start)
+
+    return timed
+
+
+class TimedImplementation:
+    """Proxy adding the time spent in an implementation object to the current test."""
+
+    def __init__(self, name: str, implementation, ops: Iterable[str]):
+        self._implementation = implementation
+        for op in ops:
+            setattr(self, op, time_calls(name, getattr(implementation, op)))
+        if hasattr(implementation, "run_batch"):
+            self.run_batch = time_calls(name, implementation.run_batch)
+
+    def __getattr__(self, name):
+        return getattr(self._implementation, name)
+
+
+def _ms(ns: int) -> str:
+    return f"{ns / 1e6:.1f}"
+
+
+def format_report(report: TimingReport, limit: int = 30) -> List[str]:
+    """Ranked tables of the tests (by total time) and strategies (by self time)."""
+    implementations = sorted(
+        {name for test in report.tests.values() for name in test["execution"]}
+    )
+    header = f"{'test':<60}{'total ms':>10}{'gen ms':>10}{'gen %':>7}"
+    header += "".join(f"{name + ' ms':>12}" for name in implementations)
+    header += f"{'other ms':>10}"
+    lines = [header]
+    ranked = sorted(report.tests.items(), key=lambda item: -item[1]["total"])
+    for nodeid, test in ranked[:limit]:
+        total = test["total"]
+        execution = test["execution"]
+        other = total - test["generation"] - sum(execution.values())
+        share = 100 * test["generation"] / total if total else 0
+        line = f"{nodeid[-60:]:<60}{_ms(total):>10}{_ms(test['generation']):>10}"
+        line += f"{share:>7.1f}"
+        line += "".join(
+            f"{_ms(execution.get(name, 0)):>12}" for name in implementations
+        )
+        lines.append(line + f"{_ms(other):>10}")
+
+    lines.append("")
+    lines.append(
+        f"{'strategy':<44}{'draws':>8}{'self ms':>10}{'incl ms':>10}{'us/draw':>10}"
+    )
+    ranked = sorted(report.strategies.items(), key=lambda item: -item[1][2])
+    for name, (draws, inclusive, self_time) in ranked[:limit]:
+        lines.append(
+            f"{name:<44}{draws:>8}{_ms(self_time):>10}{_ms(inclusive):>10}"
+            f"{inclusive / draws / 1e3 if draws else 0:>10.1f}"
+        )
+    return lines
@@ -0,0 +1,406 @@
+"""
+Replay of precompile calls exported from a chain.
+
+Traces of the calls to 0x0b-0x11 are imported into a packed file, then
+streamed in batches through all the implementations. Every call is compared
+with the output recorded in the trace and across implementations, the EELS gas
+cost with the gas recorded in the trace, and the latency of every call is
+recorded per implementation and precompile. Everything works offline on local
+files, and neither step loads a trace into memory: the importer reads and
+writes sequentially, the replay maps the packed file and copies one batch of
+inputs at a time.
+
+Input formats:
+    jsonl: one call per line, {"address": "0x0b", "input": "0x...",
+        "gas": 375, "output": "0x..."}, with "output": null for a failed call
+        and "gas" the gas used by the call
+    binary: little-endian records of address (u8), gas (u64), input length
+        (u32), input, output length (i32, -1 for a failed call), output
+
+Packed file: HEADER (magic, version, record count) followed by records of
+RECORD_HEADER (op index in OPS, success, input length, output length, gas),
+the input and the output.
+
+Usage:
+    uv run python -m tests.traces import calls.jsonl build/traces/calls.trace
+    uv run python -m tests.traces replay build/traces/calls.trace \\
+        [--batch-size 1024] [--implementations rust,go,python] [--no-gas]
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+from pathlib import Path
+from time import perf_counter_ns
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .differential import Outcome, is_divergent, outcome_key, run_one
+from .layouts import OPS, PRECOMPILE_ADDRESSES
+from .metrics import Series
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / "build" / "trace-diffs"
+
+MAGIC = b"BLSTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sI4xQ")
+RECORD_HEADER = struct.Struct("<BBxxIIQ")
+
+# Record of the binary input format, before the input and the output
+BINARY_CALL = struct.Struct("<BQI")
+BINARY_OUTPUT_LENGTH = struct.Struct("<i")
+
+# Op of each precompile address
+OPS_BY_ADDRESS = {address: op for op, address in PRECOMPILE_ADDRESSES.items()}
+
+
+class TraceRecord(NamedTuple):
+    """One recorded call: `expected` is its outcome on chain."""
+
+    index: int
+    op: str
+    gas: int
+    input: bytes
+    expected: Outcome
+
+
+class Call(NamedTuple):
+    """A call of an imported trace, None as output for a failed call."""
+
+    address: int
+    input: bytes
+    gas: int
+    output: Optional[bytes]
+
+
+def _parse_hex(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+def read_jsonl(f: BinaryIO) -> Iterator[Call]:
+    for line in f:
+        if not line.strip():
+            continue
+        call = json.loads(line)
+        address = call["address"]
+        output = call.get("output")
+        yield Call(
+            address=int(address, 16) if isinstance(address, str) else address,
+            input=_parse_hex(call["input"]),
+            gas=int(call["gas"]),
+            output=None if output is None else _parse_hex(output),
+        )
+
+
+def _read_exactly(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated binary trace")
+    return data
+
+
+def read_binary(f: BinaryIO) -> Iterator[Call]:
+    while True:
+        header = f.read(BINARY_CALL.size)
+        if not header:
+            return
+        if len(header) != BINARY_CALL.size:
+            raise ValueError("Truncated binary trace")
+        address, gas, input_length = BINARY_CALL.unpack(header)
+        input_bytes = _read_exactly(f, input_length)
+        (output_length,) = BINARY_OUTPUT_LENGTH.unpack(
+            _read_exactly(f, BINARY_OUTPUT_LENGTH.size)
+        )
+        output = None if output_length < 0 else _read_exactly(f, output_length)
+        yield Call(address, input_bytes, gas, output)
+
+
+READERS = {"jsonl": read_jsonl, "binary": read_binary}
+
+
+def write_packed(calls: Iterable[Call], path: Path) -> Tuple[int, int]:
+    """
+    Write the calls to the BLS12-381 precompiles to a packed file.
+
+    Returns:
+        Number of calls written and of calls to other addresses (skipped)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = skipped = 0
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0))
+        for call in calls:
+            op = OPS_BY_ADDRESS.get(call.address)
+            if op is None:
+                skipped += 1
+                continue
+            output = call.output or b""
+            f.write(
+                RECORD_HEADER.pack(
+                    OPS.index(op),
+                    call.output is not None,
+                    len(call.input),
+                    len(output),
+                    call.gas,
+                )
+            )
+            f.write(call.input)
+            f.write(output)
+            written += 1
+        # The record count is known at the end
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, written))
+    return written, skipped
+
+
+def import_trace(source: Path, packed: Path, trace_format: str) -> Tuple[int, int]:
+    """Convert a jsonl or binary trace to a packed file, see write_packed."""
+    with open(source, "rb") as f:
+        return write_packed(READERS[trace_format](f), packed)
+
+
+class PackedTrace:
+    """Memory-mapped packed trace, read sequentially."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Read ahead: records are streamed in order
+        self._map.madvise(mmap.MADV_SEQUENTIAL)
+        magic, version, self.count = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a packed trace (version {VERSION})")
+        # End of the records read so far and of the pages released
+        self._offset = HEADER.size
+        self._released = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def records(self) -> Iterator[TraceRecord]:
+        offset = self._offset = HEADER.size
+        for index in range(self.count):
+            op_index, ok, input_length, output_length, gas = RECORD_HEADER.unpack_from(
+                self._map, offset
+            )
+            offset += RECORD_HEADER.size
+            # Slices of the map are copies of the bytes of one record
+            input_bytes = self._map[offset : offset + input_length]
+            offset += input_length
+            output = self._map[offset : offset + output_length]
+            offset += output_length
+            self._offset = offset
+            yield TraceRecord(
+                index, OPS[op_index], gas, input_bytes, (bool(ok), output)
+            )
+
+    def batches(self, size: int) -> Iterator[List[TraceRecord]]:
+        batch = []
+        for record in self.records():
+            batch.append(record)
+            if len(batch) == size:
+                yield batch
+                batch = []
+                self.release()
+        if batch:
+            yield batch
+
+    def release(self):
+        """Drop the pages of the records read so far from the resident memory."""
+        end = self._offset - self._offset % mmap.PAGESIZE
+        if end > self._released:
+            self._map.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+            self._released = end
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class ReplayStats:
+    """Mismatches and per-call latencies of a replay."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names = list(names)
+        self.records = 0
+        # By op: calls, divergences between implementations, gas mismatches
+        self.calls: Dict[str, int] = {}
+        self.divergences: Dict[str, int] = {}
+        self.gas_mismatches: Dict[str, int] = {}
+        # By (implementation, op): outcomes different from the trace
+        self.trace_mismatches: Dict[Tuple[str, str], int] = {}
+        self.latencies: Dict[Tuple[str, str], Series] = {}
+        self.recorded: List[Path] = []
+
+    def series(self, name: str, op: str) -> Series:
+        if (name, op) not in self.latencies:
+            self.latencies[name, op] = Series(name, op)
+        return self.latencies[name, op]
+
+
+def record_mismatch(
+    output_dir: Path,
+    record: TraceRecord,
+    outcomes: Mapping[str, Outcome],
+    gas: Optional[int],
+) -> Path:
+    """Write a mismatching input and the trace and implementation outcomes."""
+    digest = hashlib.sha256(record.input).hexdigest()[:16]
+    path = output_dir / record.op / f"{digest}.bin"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(record.input)
+    with open(path.with_suffix(".txt"), "w") as f:
+        f.write(f"record: {record.index}\n")
+        f.write(f"trace gas: {record.gas}, EELS gas: {gas}\n")
+        for label, (ok, value) in (("trace", record.expected), *outcomes.items()):
+            f.write(f"{label}: {value.hex() if ok else (value or 'failed')}\n")
+    return path
+
+
+def replay_batch(
+    batch: List[TraceRecord],
+    implementations: Mapping[str, object],
+    stats: ReplayStats,
+    gas_cost=None,
+    output_dir: Path = DEFAULT_OUTPUT_DIR,
+):
+    """
+    Run every record of a batch on every implementation.
+
+    Args:
+        gas_cost: Function (op, input) -> gas of the successful calls (None
+            for an invalid length), compared with the trace; gas is not
+            checked when None
+    """
+    for record in batch:
+        op = record.op
+        outcomes = {}
+        for name, implementation in implementations.items():
+            start = perf_counter_ns()
+            outcome = run_one(implementation, op, record.input)
+            stats.series(name, op).record(perf_counter_ns() - start, not outcome[0])
+            outcomes[name] = outcome
+
+        expected = outcome_key(record.expected)
+        mismatch = False
+        for name, outcome in outcomes.items():
+            if outcome_key(outcome) != expected:
+                stats.trace_mismatches[name, op] = (
+                    stats.trace_mismatches.get((name, op), 0) + 1
+                )
+                mismatch = True
+        if is_divergent(outcomes):
+            stats.divergences[op] = stats.divergences.get(op, 0) + 1
+            mismatch = True
+        gas = None
+        if gas_cost is not None and record.expected[0]:
+            gas = gas_cost(op, record.input)
+            if gas != record.gas:
+                stats.gas_mismatches[op] = stats.gas_mismatches.get(op, 0) + 1
+                mismatch = True
+        if mismatch:
+            stats.recorded.append(record_mismatch(output_dir, record, outcomes, gas))
+        stats.calls[op] = stats.calls.get(op, 0) + 1
+        stats.records += 1
+
+
+def format_stats(stats: ReplayStats) -> List[str]:
+    """Mismatches by op and latency quantiles by implementation and op."""
+    names = stats.names
+    lines = [
+        f"{'op':<16}{'calls':>10}{'divergent':>11}{'gas':>7}"
+        + "".join(f"{name + ' != trace':>18}" for name in names)
+    ]
+    for op, calls in stats.calls.items():
+        lines.append(
+            f"{op:<16}{calls:>10}{stats.divergences.get(op, 0):>11}"
+            f"{stats.gas_mismatches.get(op, 0):>7}"
+            + "".join(
+                f"{stats.trace_mismatches.get((name, op), 0):>18}" for name in names
+            )
+        )
+    lines.append(
+        f"{'latency (us)':<16}{'implementation':<16}{'mean':>10}{'p50':>10}"
+        f"{'p99':>10}{'errors':>8}"
+    )
+    for (name, op), series in stats.latencies.items():
+        lines.append(
+            f"{op:<16}{name:<16}{series.total_ns / series.calls / 1e3:>10.1f}"
+            f"{series.quantile(0.5) / 1e3:>10.1f}{series.quantile(0.99) / 1e3:>10.1f}"
+            f"{series.errors:>8}"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and replay call traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="pack a jsonl or binary trace")
+    import_parser.add_argument("source", type=Path)
+    import_parser.add_argument("packed", type=Path)
+    import_parser.add_argument(
+        "--format", choices=sorted(READERS), help="defaults to the file suffix"
+    )
+    replay_parser = commands.add_parser("replay", help="replay a packed trace")
+    replay_parser.add_argument("packed", type=Path)
+    replay_parser.add_argument("--batch-size", type=int, default=1024)
+    replay_parser.add_argument("--implementations", help="defaults to all")
+    replay_parser.add_argument(
+        "--no-gas", action="store_true", help="skip the EELS gas comparison"
+    )
+    replay_parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        trace_format = args.format or (
+            "jsonl" if args.source.suffix in (".jsonl", ".json") else "binary"
+        )
+        written, skipped = import_trace(args.source, args.packed, trace_format)
+        print(f"{args.packed}: {written} calls, {skipped} to other addresses skipped")
+        return
+
+    from wrappers.python.eels_wrapper import gas_cost
+
+    from .LibCallerWrapper import IMPLEMENTATIONS
+
+    names = (
+        args.implementations.split(",")
+        if args.implementations
+        else list(IMPLEMENTATIONS)
+    )
+    implementations = {name: IMPLEMENTATIONS[name] for name in names}
+    trace = PackedTrace(args.packed)
+    stats = ReplayStats(names)
+    try:
+        for batch in trace.batches(args.batch_size):
+            replay_batch(
+                batch,
+                implementations,
+                stats,
+                None if args.no_gas else gas_cost,
+                args.output_dir,
+            )
+            print(f"{stats.records}/{len(trace)} calls", end="\r", flush=True)
+    finally:
+        trace.close()
+    print()
+    for line in format_stats(stats):
+        print(line)
+    for path in stats.recorded[:10]:
+        print(f"mismatch: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Side-by-side comparison of versioned builds of the native wrappers.
+
+`make rust-version REVM_PRECOMPILE_VERSION=...` and `make go-version
+GETH_VERSION=...` build the wrappers against other pinned dependency versions
+into build/versions/, with the version in the file name. Given an old and a
+new library, every precompile runs on the same inputs (the native coverage
+corpus and freshly generated inputs) and the report shows, per precompile, the
+inputs on which the outputs differ and the latency delta.
+
+Libraries with distinct paths are opened RTLD_LOCAL by every FFI backend, so
+their identical `*_wrapper` symbols do not clash and Rust builds are loaded
+side by side in this process. A process cannot host two Go runtimes, so Go
+builds each run in their own worker process. Latencies are measured where the
+library runs, as the minimum over --repeats calls of each input.
+
+Usage:
+    uv run python -m tests.versions build/versions/librevm_wrapper-21.0.0.so \\
+        build/versions/librevm_wrapper-22.0.0.so [--generated 256] [--repeats 5]
+"""
+
+import argparse
+import hashlib
+import mmap
+import multiprocessing
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from . import settings
+from .differential import Outcome, outcome_key
+from .ffi_backends import create_backend
+from .layouts import OPS, PRECOMPILE_FUNCTIONS
+from .native_coverage import CORPUS, Corpus
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / "build" / "version-diffs"
+
+# Magic of the build information section of Go binaries
+GO_BUILDINFO_MAGIC = b"\xff Go buildinf:"
+
+# Outcome of one input and its fastest call, in nanoseconds
+Measurement = Tuple[Outcome, int]
+
+
+def is_go_library(path: str) -> bool:
+    """Whether a library embeds a Go runtime."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return m.find(GO_BUILDINFO_MAGIC) >= 0
+
+
+def bind_library(
+    path: str, backend: str, functions: Sequence[Tuple[str, int]]
+) -> Dict[str, Callable]:
+    """Bind the precompile functions of a library, by op."""
+    library = create_backend(backend, path)
+    return {
+        function_name.replace("_wrapper", ""): library.bind(function_name, size)
+        for function_name, size in functions
+    }
+
+
+def measure(
+    function: Callable, inputs: Sequence[bytes], repeats: int
+) -> List[Measurement]:
+    """Outcome and fastest of `repeats` calls of each input."""
+    measurements = []
+    for input_bytes in inputs:
+        best = None
+        for _ in range(repeats):
+            start = perf_counter_ns()
+            try:
+                outcome = True, function(input_bytes)
+            except RuntimeError as e:
+                outcome = False, str(e)
+            elapsed = perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+        measurements.append((outcome, best))
+    return measurements
+
+
+# Precompile functions of the library of a worker process
+_worker_functions: Dict[str, Callable] = {}
+
+
+def _init_worker(path: str, backend: str, functions: Sequence[Tuple[str, int]]):
+    _worker_functions.update(bind_library(path, backend, functions))
+
+
+def _measure_in_worker(op: str, inputs: Sequence[bytes], repeats: int):
+    return measure(_worker_functions[op], inputs, repeats)
+
+
+class VersionedLibrary:
+    """A build of a wrapper, loaded in this process or in a worker process."""
+
+    def __init__(
+        self,
+        path: str,
+        backend: str,
+        functions: Sequence[Tuple[str, int]],
+        isolated: bool,
+    ):
+        """
+        Args:
+            path: Path to the shared library
+            backend: FFI backend used to call it
+            functions: (C function name, maximum output size) of each precompile
+            isolated: Run the library in its own worker process
+        """
+        self.path = path
+        self.isolated = isolated
+        if isolated:
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(path, backend, functions),
+            )
+        else:
+            self._functions = bind_library(path, backend, functions)
+
+    def measure(self, op: str, inputs: Sequence[bytes], repeats: int):
+        if self.isolated:
+            return self._executor.submit(
+                _measure_in_worker, op, inputs, repeats
+            ).result()
+        return measure(self._functions[op], inputs, repeats)
+
+    def close(self):
+        if self.isolated:
+            self._executor.shutdown()
+
+
+def generated_inputs(op: str, count: int, seed: int) -> List[bytes]:
+    """Inputs of `op` from the raw fuzz mode generator (requires numpy)."""
+    from .raw_fuzz import BatchGenerator
+
+    generator = BatchGenerator(seed)
+    inputs = []
+    while len(inputs) < count:
+        _, buffer, size = generator.sample(op, min(64, count - len(inputs)))
+        inputs += [bytes(buffer[i : i + size]) for i in range(0, len(buffer), size)]
+    return inputs
+
+
+def record_diff(output_dir: Path, op: str, input_bytes: bytes, old, new) -> Path:
+    """Write an input with different outputs and both outcomes next to it."""
+    digest = hashlib.sha256(input_bytes).hexdigest()[:16]
+    path = output_dir / op / f"{digest}.bin"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(input_bytes)
+    with open(path.with_suffix(".txt"), "w") as f:
+        for label, (ok, value) in (("old", old), ("new", new)):
+            f.write(f"{label}: {value.hex() if ok else value}\n")
+    return path
+
+
+def compare(
+    old: VersionedLibrary,
+    new: VersionedLibrary,
+    inputs: Dict[str, List[bytes]],
+    repeats: int,
+    output_dir: Path,
+) -> Dict[str, dict]:
+    """Output diffs and mean latencies of two builds, by op."""
+    results = {}
+    for op, op_inputs in inputs.items():
+        if not op_inputs:
+            continue
+        old_measurements = old.measure(op, op_inputs, repeats)
+        new_measurements = new.measure(op, op_inputs, repeats)
+        diffs = []
+        for input_bytes, (old_outcome, _), (new_outcome, _) in zip(
+            op_inputs, old_measurements, new_measurements, strict=True
+        ):
+            if outcome_key(old_outcome) != outcome_key(new_outcome):
+                diffs.append(
+                    record_diff(output_dir, op, input_bytes, old_outcome, new_outcome)
+                )
+        results[op] = {
+            "inputs": len(op_inputs),
+            "diffs": diffs,
+            "old_us": statistics.fmean(ns for _, ns in old_measurements) / 1e3,
+            "new_us": statistics.fmean(ns for _, ns in new_measurements) / 1e3,
+        }
+    return results
+
+
+def format_results(results: Dict[str, dict], threshold: float) -> List[str]:
+    """Per-op table; latency deltas above `threshold` percent are marked."""
+    lines = [
+        f"{'op':<16}{'inputs':>8}{'diffs':>7}{'old us':>11}{'new us':>11}"
+        f"{'delta':>9}"
+    ]
+    for op, result in results.items():
+        delta = 100 * (result["new_us"] / result["old_us"] - 1)
+        mark = "  slower" if delta > threshold else ""
+        lines.append(
+            f"{op:<16}{result['inputs']:>8}{len(result['diffs']):>7}"
+            f"{result['old_us']:>11.1f}{result['new_us']:>11.1f}{delta:>+8.1f}%{mark}"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two builds of a wrapper")
+    parser.add_argument("old", help="path to the old library")
+    parser.add_argument("new", help="path to the new library")
+    parser.add_argument("--ops", default=",".join(OPS))
+    parser.add_argument("--corpus-dir", type=Path, default=CORPUS.directory)
+    parser.add_argument(
+        "--generated", type=int, default=256, help="generated inputs per op"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--threshold", type=float, default=5.0, help="latency regression, in %%"
+    )
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument(
+        "--backend",
+        default=settings.FFI_BACKEND,
+        help="FFI backend (default: FUZZ_FFI_BACKEND, ctypes for auto)",
+    )
+    args = parser.parse_args()
+
+    corpus = Corpus(args.corpus_dir)
+    inputs = {
+        op: corpus.inputs(op) + generated_inputs(op, args.generated, args.seed)
+        for op in args.ops.split(",")
+    }
+    # Benchmarking the backends would load a library in this process
+    backend = "ctypes" if args.backend == "auto" else args.backend
+    old, new = (
+        VersionedLibrary(path, backend, PRECOMPILE_FUNCTIONS, is_go_library(path))
+        for path in (args.old, args.new)
+    )
+    try:
+        results = compare(old, new, inputs, args.repeats, args.output_dir)
+    finally:
+        old.close()
+        new.close()
+
+    print(f"old: {args.old}{' (worker process)' if old.isolated else ''}")
+    print(f"new: {args.new}{' (worker process)' if new.isolated else ''}")
+    for line in format_results(results, args.threshold):
+        print(line)
+    diffs = [path for result in results.values() for path in result["diffs"]]
+    for path in diffs[:10]:
+        print(f"diff: {path}")
+    slower = any(
+        result["new_us"] > result["old_us"] * (1 + args.threshold / 100)
+        for result in results.values()
+    )
+    sys.exit(1 if diffs or slower else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+/*
+ * Minimal CPython extension calling the `*_wrapper` symbols of the native
+ * wrappers directly, without the argument conversion done by ctypes/cffi.
+ *
+ * Every wrapper follows the C-ABI described in docs/design.md:
+ *
+ *   int fn(const uint8_t *input, size_t input_len,
+ *          uint8_t *output, size_t output_capacity, size_t *output_len);
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <dlfcn.h>
+#include <stddef.h>
+#include <stdint.h>
+
+typedef int (*wrapper_fn)(const uint8_t *, size_t, uint8_t *, size_t, size_t *);
+
+typedef struct {
+    PyObject_HEAD
+    vectorcallfunc vectorcall;
+    wrapper_fn fn;
+    Py_ssize_t max_output_size;
+    PyObject *name;
+} FunctionObject;
+
+static PyObject *
+function_vectorcall(PyObject *callable, PyObject *const *args, size_t nargsf,
+                    PyObject *kwnames)
+{
+    FunctionObject *self = (FunctionObject *)callable;
+    Py_buffer input;
+    PyObject *output;
+    size_t output_len = 0;
+    int result;
+
+    if (PyVectorcall_NARGS(nargsf) != 1 ||
+        (kwnames != NULL && PyTuple_GET_SIZE(kwnames) != 0)) {
+        PyErr_Format(PyExc_TypeError, "%U() takes exactly one positional argument",
+                     self->name);
+        return NULL;
+    }
+    if (PyObject_GetBuffer(args[0], &input, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+    output = PyBytes_FromStringAndSize(NULL, self->max_output_size);
+    if (output == NULL) {
+        PyBuffer_Release(&input);
+        return NULL;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    result = self->fn((const uint8_t *)input.buf, (size_t)input.len,
+                      (uint8_t *)PyBytes_AS_STRING(output),
+                      (size_t)self->max_output_size, &output_len);
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&input);
+    if (result != 0) {
+        Py_DECREF(output);
+        PyErr_Format(PyExc_RuntimeError, "%U failed with error code: %d",
+                     self->name, result);
+        return NULL;
+    }
+    if (_PyBytes_Resize(&output, (Py_ssize_t)output_len) < 0) {
+        return NULL;
+    }
+    return output;
+}
+
+static void
+function_dealloc(FunctionObject *self)
+{
+    /* The library is never dlclose'd: the Go runtime cannot be unloaded. */
+    Py_XDECREF(self->name);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+function_repr(FunctionObject *self)
+{
+    return PyUnicode_FromFormat("<fastcall function %U>", self->name);
+}
+
+static PyTypeObject FunctionType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "_fastcall.Function",
+    .tp_basicsize = sizeof(FunctionObject),
+    .tp_dealloc = (destructor)function_dealloc,
+    .tp_vectorcall_offset = offsetof(FunctionObject, vectorcall),
+    .tp_call = PyVectorcall_Call,
+    .tp_repr = (reprfunc)function_repr,
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_VECTORCALL,
+    .tp_doc = "Native wrapper function bound to a shared library symbol.",
+};
+
+static PyObject *
+fastcall_bind(PyObject *module, PyObject *args)
+{
+    const char *lib_path;
+    const char *function_name;
+    Py_ssize_t max_output_size;
+    void *handle;
+    void *symbol;
+    FunctionObject *function;
+
+    if (!PyArg_ParseTuple(args, "ssn", &lib_path, &function_name,
+                          &max_output_size)) {
+        return NULL;
+    }
+    if (max_output_size < 0) {
+        PyErr_SetString(PyExc_ValueError, "max_output_size must be non-negative");
+        return NULL;
+    }
+    /* dlopen is reference counted: this shares the handle of any other backend */
+    handle = dlopen(lib_path, RTLD_NOW | RTLD_LOCAL);
+    if (handle == NULL) {
+        PyErr_Format(PyExc_OSError, "%s", dlerror());
+        return NULL;
+    }
+    symbol = dlsym(handle, function_name);
+    if (symbol == NULL) {
+        PyErr_Format(PyExc_AttributeError, "%s: undefined symbol: %s", lib_path,
+                     function_name);
+        return NULL;
+    }
+
+    function = PyObject_New(FunctionObject, &FunctionType);
+    if (function == NULL) {
+        return NULL;
+    }
+    function->vectorcall = function_vectorcall;
+    function->fn = (wrapper_fn)symbol;
+    function->max_output_size = max_output_size;
+    function->name = PyUnicode_FromString(function_name);
+    if (function->name == NULL) {
+        Py_DECREF(function);
+        return NULL;
+    }
+    return (PyObject *)function;
+}
+
+static PyMethodDef fastcall_methods[] = {
+    {"bind", fastcall_bind, METH_VARARGS,
+     "bind(lib_path, function_name, max_output_size)\n\n"
+     "Return a callable taking the input bytes and returning the output bytes.\n"
+     "A non-zero return code raises RuntimeError."},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef fastcall_module = {
+    PyModuleDef_HEAD_INIT,
+    .m_name = "_fastcall",
+    .m_doc = "Direct calls into the native precompile wrappers.",
+    .m_size = -1,
+    .m_methods = fastcall_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__fastcall(void)
+{
+    if (PyType_Ready(&FunctionType) < 0) {
+        return NULL;
+    }
+    return PyModule_Create(&fastcall_module);
+}
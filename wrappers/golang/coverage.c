@@ -0,0 +1,67 @@
+//go:build libfuzzer
+
+// Edge counters of the coverage build (`make coverage`).
+//
+// Built with -tags libfuzzer -gcflags=all=-d=libfuzzer, the compiler emits
+// 8-bit edge counters and comparison hooks, and the runtime registers the
+// counter section through the libFuzzer interface at start-up. No libFuzzer
+// is linked: the interface is defined here, and the counters are exposed to
+// the harness through the exports of coverage.go.
+
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+#define MAX_REGIONS 64
+
+static uint8_t *region_start[MAX_REGIONS];
+static size_t region_size[MAX_REGIONS];
+static size_t regions;
+
+void __sanitizer_cov_8bit_counters_init(uint8_t *start, uint8_t *stop) {
+	if (start < stop && regions < MAX_REGIONS) {
+		region_start[regions] = start;
+		region_size[regions] = stop - start;
+		regions++;
+	}
+}
+
+// Hooks called by the instrumented code, unused by the harness
+void __sanitizer_cov_pcs_init(const uintptr_t *start, const uintptr_t *stop) {}
+void __sanitizer_cov_trace_cmp1(uint8_t a, uint8_t b) {}
+void __sanitizer_cov_trace_cmp2(uint16_t a, uint16_t b) {}
+void __sanitizer_cov_trace_cmp4(uint32_t a, uint32_t b) {}
+void __sanitizer_cov_trace_cmp8(uint64_t a, uint64_t b) {}
+void __sanitizer_cov_trace_const_cmp1(uint8_t a, uint8_t b) {}
+void __sanitizer_cov_trace_const_cmp2(uint16_t a, uint16_t b) {}
+void __sanitizer_cov_trace_const_cmp4(uint32_t a, uint32_t b) {}
+void __sanitizer_cov_trace_const_cmp8(uint64_t a, uint64_t b) {}
+void __sanitizer_weak_hook_strcmp(void *pc, const char *s1, const char *s2, int result) {}
+
+// Total number of edge counters
+size_t sancov_counters_size(void) {
+	size_t size = 0;
+	for (size_t i = 0; i < regions; i++) {
+		size += region_size[i];
+	}
+	return size;
+}
+
+// Copy the edge counters hit since the last collection and reset them
+int32_t sancov_collect(uint8_t *output, size_t output_capacity, size_t *output_len) {
+	if (output == NULL || output_len == NULL) {
+		return -1;
+	}
+	size_t size = sancov_counters_size();
+	if (size > output_capacity) {
+		return -2;
+	}
+	size_t offset = 0;
+	for (size_t i = 0; i < regions; i++) {
+		memcpy(output + offset, region_start[i], region_size[i]);
+		memset(region_start[i], 0, region_size[i]);
+		offset += region_size[i];
+	}
+	*output_len = size;
+	return 0;
+}
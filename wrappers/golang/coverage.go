@@ -0,0 +1,27 @@
+//go:build libfuzzer
+
+package main
+
+/*
+#include <stddef.h>
+#include <stdint.h>
+
+size_t sancov_counters_size(void);
+int32_t sancov_collect(uint8_t *output, size_t output_capacity, size_t *output_len);
+*/
+import "C"
+
+// The counters are registered by the runtime initialization, which exported
+// Go functions wait for (unlike plain C functions of the library)
+
+//export coverage_counters_size
+func coverage_counters_size() C.size_t {
+	return C.sancov_counters_size()
+}
+
+//export coverage_collect
+func coverage_collect(output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t) C.int32_t {
+
+	return C.sancov_collect(output, outCap, outputLen)
+}
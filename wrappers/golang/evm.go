@@ -0,0 +1,177 @@
+//go:build evm
+
+package main
+
+/*
+#include <stdint.h>
+#include <stdlib.h>
+
+typedef int32_t error_code_t;
+*/
+import "C"
+import (
+	"sync"
+	"unsafe"
+
+	"github.com/ethereum/go-ethereum/common"
+	"github.com/ethereum/go-ethereum/core/state"
+	"github.com/ethereum/go-ethereum/core/types"
+	"github.com/ethereum/go-ethereum/core/vm/runtime"
+	"github.com/ethereum/go-ethereum/params"
+)
+
+// Precompiles called from a contract run by the geth interpreter: the caller
+// contract copies its calldata to memory, STATICCALLs the precompile with all
+// its gas and returns the return data, or reverts when the call failed. It is
+// the contract of wrappers/python/eels_evm.py and the Rust `evm` feature.
+
+// Gas of the call, enough for the largest MSM and pairing inputs
+const evmGasLimit = 1 << 40
+
+var (
+	// Sender of the calls
+	evmOrigin = common.HexToAddress("0x00000000000000000000000000000000000c0de0")
+
+	// Finalised state holding one caller contract per precompile, copied by
+	// every call so that no call sees the accesses, refunds or logs of another
+	evmPrototype *state.StateDB
+	evmMutex     sync.Mutex
+)
+
+// Bytecode calling the precompile with the calldata and returning its output
+func callerCode(precompile byte) []byte {
+	return []byte{
+		// CALLDATACOPY(0, 0, CALLDATASIZE)
+		0x36, 0x60, 0x00, 0x60, 0x00, 0x37,
+		// STATICCALL(GAS, precompile, 0, CALLDATASIZE, 0, 0)
+		0x60, 0x00, 0x60, 0x00, 0x36, 0x60, 0x00, 0x60, precompile, 0x5a, 0xfa,
+		// RETURNDATACOPY(0, 0, RETURNDATASIZE)
+		0x3d, 0x60, 0x00, 0x60, 0x00, 0x3e,
+		// JUMPI(0x1e, success)
+		0x60, 0x1e, 0x57,
+		// REVERT(0, RETURNDATASIZE)
+		0x3d, 0x60, 0x00, 0xfd,
+		// JUMPDEST, RETURN(0, RETURNDATASIZE)
+		0x5b, 0x3d, 0x60, 0x00, 0xf3,
+	}
+}
+
+// Address of the caller contract of a precompile
+func callerAddress(precompile byte) common.Address {
+	return common.BytesToAddress([]byte{0x0c, 0xde, precompile})
+}
+
+func init() {
+	statedb, err := state.New(types.EmptyRootHash, state.NewDatabaseForTesting())
+	if err != nil {
+		panic(err)
+	}
+	for precompile := byte(0x0b); precompile <= 0x11; precompile++ {
+		statedb.SetCode(callerAddress(precompile), callerCode(precompile))
+	}
+	// End of the setup transaction: the copies start with an empty journal
+	statedb.Finalise(true)
+	evmPrototype = statedb
+}
+
+// Fresh state of a call, copied from the prototype
+func newCallState() *state.StateDB {
+	// Copy is not safe for concurrent use of the same StateDB
+	evmMutex.Lock()
+	defer evmMutex.Unlock()
+	return evmPrototype.Copy()
+}
+
+// Helper function to handle common wrapper logic of the EVM-level calls
+func runCallerContract(
+	input *C.uint8_t, inputLen C.size_t,
+	output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t,
+	contractAddress byte) C.error_code_t {
+
+	// Check for null pointers
+	if input == nil || output == nil || outputLen == nil {
+		return -1
+	}
+
+	inputSlice := C.GoBytes(unsafe.Pointer(input), C.int(inputLen))
+
+	result, _, err := runtime.Call(callerAddress(contractAddress), inputSlice, &runtime.Config{
+		ChainConfig: params.MergedTestChainConfig,
+		Origin:      evmOrigin,
+		GasLimit:    evmGasLimit,
+		State:       newCallState(),
+		Random:      &common.Hash{},
+	})
+	if err != nil {
+		return -4 // The precompile call failed and the contract reverted
+	}
+
+	// Check output buffer capacity
+	if len(result) > int(outCap) {
+		return -2
+	}
+
+	// Copy result to output buffer
+	outSlice := (*[1 << 30]byte)(unsafe.Pointer(output))[:len(result):len(result)]
+	copy(outSlice, result)
+	*outputLen = C.size_t(len(result))
+
+	return 0
+}
+
+//export g1_add_evm_wrapper
+func g1_add_evm_wrapper(input *C.uint8_t, inputLen C.size_t,
+	output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t) C.error_code_t {
+
+	return runCallerContract(input, inputLen, output, outCap, outputLen, 0x0b)
+}
+
+//export g1_msm_evm_wrapper
+func g1_msm_evm_wrapper(input *C.uint8_t, inputLen C.size_t,
+	output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t) C.error_code_t {
+
+	return runCallerContract(input, inputLen, output, outCap, outputLen, 0x0c)
+}
+
+//export g2_add_evm_wrapper
+func g2_add_evm_wrapper(input *C.uint8_t, inputLen C.size_t,
+	output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t) C.error_code_t {
+
+	return runCallerContract(input, inputLen, output, outCap, outputLen, 0x0d)
+}
+
+//export g2_msm_evm_wrapper
+func g2_msm_evm_wrapper(input *C.uint8_t, inputLen C.size_t,
+	output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t) C.error_code_t {
+
+	return runCallerContract(input, inputLen, output, outCap, outputLen, 0x0e)
+}
+
+//export pairing_evm_wrapper
+func pairing_evm_wrapper(input *C.uint8_t, inputLen C.size_t,
+	output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t) C.error_code_t {
+
+	return runCallerContract(input, inputLen, output, outCap, outputLen, 0x0f)
+}
+
+//export map_fp_to_g1_evm_wrapper
+func map_fp_to_g1_evm_wrapper(input *C.uint8_t, inputLen C.size_t,
+	output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t) C.error_code_t {
+
+	return runCallerContract(input, inputLen, output, outCap, outputLen, 0x10)
+}
+
+//export map_fp2_to_g2_evm_wrapper
+func map_fp2_to_g2_evm_wrapper(input *C.uint8_t, inputLen C.size_t,
+	output *C.uint8_t, outCap C.size_t,
+	outputLen *C.size_t) C.error_code_t {
+
+	return runCallerContract(input, inputLen, output, outCap, outputLen, 0x11)
+}
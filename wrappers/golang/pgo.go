@@ -0,0 +1,45 @@
+//go:build pgo
+
+package main
+
+/*
+#include <stdint.h>
+*/
+import "C"
+import (
+	"os"
+	"runtime/pprof"
+)
+
+// CPU profile of the PGO training run (tests/pgo_train.py), the profile of
+// the pgo build of `make profile-pgo`
+
+var profileFile *os.File
+
+//export pgo_profile_start
+func pgo_profile_start(path *C.char) C.int32_t {
+	f, err := os.Create(C.GoString(path))
+	if err != nil {
+		return -1
+	}
+	if err := pprof.StartCPUProfile(f); err != nil {
+		f.Close()
+		return -1
+	}
+	profileFile = f
+	return 0
+}
+
+//export pgo_profile_stop
+func pgo_profile_stop() C.int32_t {
+	if profileFile == nil {
+		return -1
+	}
+	pprof.StopCPUProfile()
+	err := profileFile.Close()
+	profileFile = nil
+	if err != nil {
+		return -1
+	}
+	return 0
+}
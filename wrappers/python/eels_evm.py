@@ -0,0 +1,136 @@
+"""
+EELS precompiles called from a contract run by the interpreter (FUZZ_EXECUTION_MODE=evm).
+
+Instead of calling the precompile function on a MockEvm, each call runs a
+caller contract through `process_message`: the contract copies its calldata
+to memory, STATICCALLs the precompile with all its gas, and returns the return
+data, or reverts when the call failed. The native wrappers run the same
+contract (see caller_code) in revm and in the geth interpreter.
+"""
+
+from ethereum.prague.fork_types import Address
+from ethereum.prague.state import State, TransientStorage
+from ethereum.prague.vm import BlockEnvironment, Message, TransactionEnvironment
+from ethereum.prague.vm.interpreter import process_message
+from ethereum.prague.vm.precompiled_contracts.mapping import PRE_COMPILED_CONTRACTS
+from ethereum_types.numeric import U64, U256, Uint
+
+from tests.layouts import PRECOMPILE_ADDRESSES
+
+# Gas of the outer call, enough for the largest MSM and pairing inputs
+EVM_GAS_LIMIT = 1 << 40
+
+# Sender of the calls and address of the caller contracts
+ORIGIN = Address(bytes.fromhex("00000000000000000000000000000000000c0de0"))
+CALLER_CONTRACT = Address(bytes.fromhex("00000000000000000000000000000000000c0de1"))
+
+
+def caller_code(precompile: int) -> bytes:
+    """Bytecode calling `precompile` with the calldata and returning its output."""
+    return bytes(
+        [
+            # CALLDATACOPY(0, 0, CALLDATASIZE)
+            0x36, 0x60, 0x00, 0x60, 0x00, 0x37,
+            # STATICCALL(GAS, precompile, 0, CALLDATASIZE, 0, 0)
+            0x60, 0x00, 0x60, 0x00, 0x36, 0x60, 0x00, 0x60, precompile, 0x5A, 0xFA,
+            # RETURNDATACOPY(0, 0, RETURNDATASIZE)
+            0x3D, 0x60, 0x00, 0x60, 0x00, 0x3E,
+            # JUMPI(0x1E, success)
+            0x60, 0x1E, 0x57,
+            # REVERT(0, RETURNDATASIZE)
+            0x3D, 0x60, 0x00, 0xFD,
+            # JUMPDEST, RETURN(0, RETURNDATASIZE)
+            0x5B, 0x3D, 0x60, 0x00, 0xF3,
+        ]
+    )  # fmt: skip
+
+
+CALLER_CODES = {
+    op: caller_code(address) for op, address in PRECOMPILE_ADDRESSES.items()
+}
+
+
+def call_precompile(op: str, input_bytes: bytes) -> bytes:
+    """Run the caller contract of `op` on `input_bytes` and return its output."""
+    block_env = BlockEnvironment(
+        chain_id=U64(1),
+        state=State(),
+        block_gas_limit=Uint(EVM_GAS_LIMIT),
+        block_hashes=[],
+        coinbase=ORIGIN,
+        number=Uint(0),
+        base_fee_per_gas=Uint(0),
+        time=U256(0),
+        prev_randao=bytes(32),
+        excess_blob_gas=U64(0),
+        parent_beacon_block_root=bytes(32),
+    )
+    tx_env = TransactionEnvironment(
+        origin=ORIGIN,
+        gas_price=Uint(0),
+        gas=Uint(EVM_GAS_LIMIT),
+        access_list_addresses=set(),
+        access_list_storage_keys=set(),
+        transient_storage=TransientStorage(),
+        blob_versioned_hashes=(),
+        authorizations=(),
+        index_in_block=None,
+        tx_hash=None,
+    )
+    message = Message(
+        block_env=block_env,
+        tx_env=tx_env,
+        caller=ORIGIN,
+        target=CALLER_CONTRACT,
+        current_target=CALLER_CONTRACT,
+        gas=Uint(EVM_GAS_LIMIT),
+        value=U256(0),
+        data=input_bytes,
+        code_address=CALLER_CONTRACT,
+        code=CALLER_CODES[op],
+        depth=Uint(0),
+        should_transfer_value=False,
+        is_static=False,
+        # Precompiles are warm, as in a transaction
+        accessed_addresses={ORIGIN, CALLER_CONTRACT, *PRE_COMPILED_CONTRACTS},
+        accessed_storage_keys=set(),
+        disable_precompiles=False,
+        parent_evm=None,
+    )
+    evm = process_message(message)
+    if evm.error is not None:
+        # A failed precompile call makes the contract revert
+        raise RuntimeError(f"Error in {op} EVM call: {type(evm.error).__name__}")
+    return evm.output
+
+
+class EELSEvmWrapper:
+    """The methods of EELSWrapper, running the precompiles through the interpreter."""
+
+    @staticmethod
+    def map_fp_to_g1(input_bytes):
+        return call_precompile("map_fp_to_g1", input_bytes)
+
+    @staticmethod
+    def g1_add(input_bytes):
+        return call_precompile("g1_add", input_bytes)
+
+    @staticmethod
+    def g1_msm(input_bytes):
+        return call_precompile("g1_msm", input_bytes)
+
+    @staticmethod
+    def g2_add(input_bytes):
+        return call_precompile("g2_add", input_bytes)
+
+    @staticmethod
+    def g2_msm(input_bytes):
+        return call_precompile("g2_msm", input_bytes)
+
+    @staticmethod
+    def map_fp2_to_g2(input_bytes):
+        return call_precompile("map_fp2_to_g2", input_bytes)
+
+    @staticmethod
+    def pairing(input_bytes):
+        return call_precompile("pairing", input_bytes)
@@ -0,0 +1,228 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Size of the output slot of each input: 4-byte little-endian length, 8-byte
+# little-endian call time in nanoseconds, output
+OUTPUT_SLOT_SIZE = 4 + 8 + 256
+OUTPUT_OFFSET = 4 + 8
+
+# Number of chunks per worker a batch is split into (load balancing)
+CHUNKS_PER_WORKER = 4
+
+# Initial size of the input and output segments, grown by the batches needing more
+MIN_SEGMENT_SIZE = 1 << 16
+
+# Segments attached by a worker, by role ("input" or "output")
+_attached: Dict[str, SharedMemory] = {}
+
+
+def _init_worker():
+    """Pre-warm a worker: import ethereum.prague and run every precompile once."""
+    from .eels_wrapper import warm_up
+
+    warm_up()
+
+
+def _attach(role: str, name: str) -> SharedMemory:
+    """Segment `name` of the pool, attached once per worker until it is replaced."""
+    segment = _attached.get(role)
+    if segment is None or segment.name != name:
+        if segment is not None:
+            segment.close()
+        segment = _attached[role] = SharedMemory(name=name)
+    return segment
+
+
+def _run_chunk(
+    op: str,
+    input_name: str,
+    spans: Sequence[Tuple[int, int]],
+    output_name: str,
+    first_index: int,
+) -> dict:
+    """
+    Run `op` on the inputs at `spans` (offset, length) of the input segment and
+    write each output and call time to its slot of the output segment.
+
+    Returns:
+        Error messages of the failed inputs, by batch index
+    """
+    from .eels_wrapper import EELSWrapper
+
+    method = getattr(EELSWrapper, op)
+    # Spawned workers share the resource tracker of the parent, which owns and
+    # unlinks the segments
+    input_shm = _attach("input", input_name)
+    output_shm = _attach("output", output_name)
+    errors = {}
+    for index, (offset, length) in enumerate(spans, start=first_index):
+        input_bytes = bytes(input_shm.buf[offset : offset + length])
+        start = time.perf_counter_ns()
+        try:
+            output = method(input_bytes)
+        except RuntimeError as e:
+            errors[index] = str(e)
+            output = b""
+        elapsed = time.perf_counter_ns() - start
+        slot = index * OUTPUT_SLOT_SIZE
+        output_shm.buf[slot : slot + OUTPUT_OFFSET] = len(output).to_bytes(
+            4, "little"
+        ) + elapsed.to_bytes(8, "little")
+        start = slot + OUTPUT_OFFSET
+        output_shm.buf[start : start + len(output)] = output
+    return errors
+
+
+class EELSPool:
+    """
+    EELS oracle executing on a pool of pre-warmed worker processes.
+
+    Exposes the same methods as EELSWrapper, plus run_batch() which spreads a
+    batch of inputs across the workers. Inputs and outputs move through two
+    shared memory segments, reused by every call and replaced by larger ones
+    when a batch does not fit; only error messages are pickled.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Start the worker processes.
+
+        Args:
+            workers: Number of worker processes (defaults to the CPU count)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        # Workers are spawned: forking a process that loaded the Go runtime is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+        )
+        self._input_shm: Optional[SharedMemory] = None
+        self._output_shm: Optional[SharedMemory] = None
+        # The segments hold one batch at a time
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def close(self):
+        """Stop the worker processes and free the segments."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            for segment in (self._input_shm, self._output_shm):
+                if segment is not None:
+                    segment.close()
+                    segment.unlink()
+            self._input_shm = self._output_shm = None
+
+    @staticmethod
+    def _grown(segment: Optional[SharedMemory], size: int) -> SharedMemory:
+        """`segment`, or a new one of at least twice its size if it is too small."""
+        if segment is not None and segment.size >= size:
+            return segment
+        new_size = MIN_SEGMENT_SIZE
+        if segment is not None:
+            new_size = 2 * segment.size
+            segment.close()
+            segment.unlink()
+        while new_size < size:
+            new_size *= 2
+        return SharedMemory(create=True, size=new_size)
+
+    def run_batch(
+        self,
+        op: str,
+        inputs: Sequence[bytes],
+        latencies: Optional[List[int]] = None,
+    ) -> List[Tuple[bool, object]]:
+        """
+        Run `op` on every input.
+
+        Args:
+            op: Precompile to run
+            inputs: Inputs of the batch
+            latencies: When given, extended with the time of each call in its
+                worker, in nanoseconds
+
+        Returns:
+            One (True, output) or (False, error_message) outcome per input
+        """
+        if not inputs:
+            return []
+        spans = []
+        offset = 0
+        for input_bytes in inputs:
+            spans.append((offset, len(input_bytes)))
+            offset += len(input_bytes)
+
+        with self._lock:
+            self._input_shm = input_shm = self._grown(self._input_shm, offset)
+            self._output_shm = output_shm = self._grown(
+                self._output_shm, len(inputs) * OUTPUT_SLOT_SIZE
+            )
+            for (start, length), input_bytes in zip(spans, inputs, strict=True):
+                input_shm.buf[start : start + length] = input_bytes
+
+            chunk_size = -(-len(inputs) // (self.workers * CHUNKS_PER_WORKER))
+            futures = [
+                self._executor.submit(
+                    _run_chunk,
+                    op,
+                    input_shm.name,
+                    spans[start : start + chunk_size],
+                    output_shm.name,
+                    start,
+                )
+                for start in range(0, len(inputs), chunk_size)
+            ]
+            errors = {}
+            for future in futures:
+                errors.update(future.result())
+
+            outcomes = []
+            for index in range(len(inputs)):
+                slot = index * OUTPUT_SLOT_SIZE
+                if latencies is not None:
+                    latencies.append(
+                        int.from_bytes(
+                            output_shm.buf[slot + 4 : slot + OUTPUT_OFFSET], "little"
+                        )
+                    )
+                if index in errors:
+                    outcomes.append((False, errors[index]))
+                    continue
+                length = int.from_bytes(output_shm.buf[slot : slot + 4], "little")
+                start = slot + OUTPUT_OFFSET
+                outcomes.append((True, bytes(output_shm.buf[start : start + length])))
+            return outcomes
+
+    def _call(self, op: str, input_bytes: bytes) -> bytes:
+        ok, value = self.run_batch(op, [input_bytes])[0]
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def map_fp_to_g1(self, input_bytes):
+        return self._call("map_fp_to_g1", input_bytes)
+
+    def g1_add(self, input_bytes):
+        return self._call("g1_add", input_bytes)
+
+    def g1_msm(self, input_bytes):
+        return self._call("g1_msm", input_bytes)
+
+    def g2_add(self, input_bytes):
+        return self._call("g2_add", input_bytes)
+
+    def g2_msm(self, input_bytes):
+        return self._call("g2_msm", input_bytes)
+
+    def map_fp2_to_g2(self, input_bytes):
+        return self._call("map_fp2_to_g2", input_bytes)
+
+    def pairing(self, input_bytes):
+        return self._call("pairing", input_bytes)
@@ -0,0 +1,245 @@
+"""
+EELS oracle served by worker processes of another interpreter (FUZZ_EELS_MODE=pypy).
+
+The EELS precompiles are big-integer pure Python, which the PyPy JIT runs much
+faster than CPython. EELSRemote starts worker processes of any interpreter
+with the `ethereum` package installed (`pypy3 -m wrappers.python.eels_remote`)
+and sends them the inputs over their stdin/stdout pipes, so the driver keeps
+running the native wrappers and Hypothesis on CPython.
+
+Each frame is a REQUEST or RESPONSE header followed by the input, output or
+error message. Workers answer in order; at most WINDOW requests are in flight
+per worker, so that their responses always fit in the pipe buffer and neither
+side blocks on a full pipe. The pipes carry one batch at a time: concurrent
+callers (e.g. the threads of the minimizer) are serialized.
+"""
+
+import atexit
+import os
+import selectors
+import struct
+import subprocess
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+# Precompiles served by the workers, by request op index
+OPS = (
+    "g1_add",
+    "g1_msm",
+    "g2_add",
+    "g2_msm",
+    "map_fp_to_g1",
+    "map_fp2_to_g2",
+    "pairing",
+)
+
+# op index, input length
+REQUEST = struct.Struct("<BI")
+# status (RESPONSE_OK or RESPONSE_ERROR), output or error message length
+RESPONSE = struct.Struct("<BI")
+RESPONSE_OK = 0
+RESPONSE_ERROR = 1
+
+# Written by a worker once warmed up
+READY = b"R"
+
+# Requests in flight per worker
+WINDOW = 32
+
+# Root of the repository, from which the workers import this module
+REPO_ROOT = Path(__file__).parent.parent.parent
+
+
+def _read_exact(stream, size: int) -> bytes:
+    """Read `size` bytes from an unbuffered stream, or fewer at end of file."""
+    chunks = []
+    while size > 0:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _write_all(stream, data: bytes):
+    view = memoryview(data)
+    while view:
+        view = view[stream.write(view) :]
+
+
+def serve():
+    """Worker loop: answer the requests of stdin on stdout until end of file."""
+    from .eels_wrapper import EELSWrapper, warm_up
+
+    # Keep stdout for the frames: stray prints go to stderr
+    output = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    requests = sys.stdin.buffer
+    methods = [getattr(EELSWrapper, op) for op in OPS]
+
+    warm_up()
+    output.write(READY)
+    output.flush()
+    while True:
+        header = requests.read(REQUEST.size)
+        if len(header) < REQUEST.size:
+            return
+        op_index, length = REQUEST.unpack(header)
+        input_bytes = requests.read(length)
+        try:
+            status, payload = RESPONSE_OK, methods[op_index](input_bytes)
+        except RuntimeError as e:
+            status, payload = RESPONSE_ERROR, str(e).encode()
+        output.write(RESPONSE.pack(status, len(payload)) + payload)
+        output.flush()
+
+
+class EELSRemote:
+    """
+    EELS oracle executing in worker processes of another interpreter.
+
+    Exposes the same methods as EELSWrapper, plus run_batch() which spreads a
+    batch of inputs across the workers as they answer.
+    """
+
+    def __init__(self, command: Sequence[str], workers: Optional[int] = None):
+        """
+        Start the worker processes and wait until they are warmed up.
+
+        Args:
+            command: Interpreter command of the workers (e.g. ["pypy3"])
+            workers: Number of worker processes (defaults to the CPU count)
+
+        Raises:
+            RuntimeError: If the interpreter is missing or a worker fails to start
+        """
+        self.command = list(command)
+        self.workers = workers or os.cpu_count() or 1
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")])
+        )
+        self._processes: List[subprocess.Popen] = []
+        # The pipes hold one batch at a time
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+        for _ in range(self.workers):
+            try:
+                process = subprocess.Popen(
+                    [*self.command, "-m", "wrappers.python.eels_remote"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    bufsize=0,
+                    cwd=REPO_ROOT,
+                    env=env,
+                )
+            except FileNotFoundError as e:
+                raise RuntimeError(
+                    f"EELS worker interpreter not found: {self.command[0]}"
+                ) from e
+            self._processes.append(process)
+        for process in self._processes:
+            if _read_exact(process.stdout, len(READY)) != READY:
+                self.close()
+                raise RuntimeError(
+                    f"EELS worker `{' '.join(self.command)}` failed to start"
+                    " (is the ethereum package installed for it?)"
+                )
+
+    def close(self):
+        """Stop the worker processes."""
+        with self._lock:
+            for process in self._processes:
+                process.stdin.close()
+            for process in self._processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                process.stdout.close()
+            self._processes = []
+
+    def _read_response(self, process: subprocess.Popen) -> Tuple[bool, object]:
+        header = _read_exact(process.stdout, RESPONSE.size)
+        if len(header) < RESPONSE.size:
+            raise RuntimeError(f"EELS worker {process.pid} exited")
+        status, length = RESPONSE.unpack(header)
+        payload = _read_exact(process.stdout, length)
+        if status == RESPONSE_ERROR:
+            return False, payload.decode()
+        return True, payload
+
+    def run_batch(self, op: str, inputs: Sequence[bytes]) -> List[Tuple[bool, object]]:
+        """
+        Run `op` on every input. Concurrent calls run one after the other.
+
+        Returns:
+            One (True, output) or (False, error_message) outcome per input
+        """
+        with self._lock:
+            return self._run_batch(op, inputs)
+
+    def _run_batch(self, op: str, inputs: Sequence[bytes]) -> List[Tuple[bool, object]]:
+        op_index = OPS.index(op)
+        outcomes: List[Optional[Tuple[bool, object]]] = [None] * len(inputs)
+        # Batch indices of the requests in flight, by worker
+        in_flight = {process.pid: deque() for process in self._processes}
+        next_index = 0
+        remaining = len(inputs)
+        with selectors.DefaultSelector() as selector:
+            for process in self._processes:
+                selector.register(process.stdout, selectors.EVENT_READ, process)
+            while remaining:
+                for process in self._processes:
+                    pending = in_flight[process.pid]
+                    frames = []
+                    while len(pending) < WINDOW and next_index < len(inputs):
+                        input_bytes = inputs[next_index]
+                        frames.append(REQUEST.pack(op_index, len(input_bytes)))
+                        frames.append(input_bytes)
+                        pending.append(next_index)
+                        next_index += 1
+                    if frames:
+                        _write_all(process.stdin, b"".join(frames))
+                for key, _ in selector.select():
+                    process = key.data
+                    if in_flight[process.pid]:
+                        index = in_flight[process.pid].popleft()
+                        outcomes[index] = self._read_response(process)
+                        remaining -= 1
+        return outcomes
+
+    def _call(self, op: str, input_bytes: bytes) -> bytes:
+        ok, value = self.run_batch(op, [input_bytes])[0]
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def map_fp_to_g1(self, input_bytes):
+        return self._call("map_fp_to_g1", input_bytes)
+
+    def g1_add(self, input_bytes):
+        return self._call("g1_add", input_bytes)
+
+    def g1_msm(self, input_bytes):
+        return self._call("g1_msm", input_bytes)
+
+    def g2_add(self, input_bytes):
+        return self._call("g2_add", input_bytes)
+
+    def g2_msm(self, input_bytes):
+        return self._call("g2_msm", input_bytes)
+
+    def map_fp2_to_g2(self, input_bytes):
+        return self._call("map_fp2_to_g2", input_bytes)
+
+    def pairing(self, input_bytes):
+        return self._call("pairing", input_bytes)
+
+
+if __name__ == "__main__":
+    serve()
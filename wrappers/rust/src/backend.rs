@@ -0,0 +1,18 @@
+//! BLS12-381 precompiles of revm-precompile, backed by blst when its `blst`
+//! feature is enabled (our `blst` feature) and by arkworks otherwise.
+
+pub use revm_precompile::bls12_381::g1_add::PRECOMPILE as G1_ADD_PRECOMPILE;
+pub use revm_precompile::bls12_381::g1_msm::PRECOMPILE as G1_MSM_PRECOMPILE;
+pub use revm_precompile::bls12_381::g2_add::PRECOMPILE as G2_ADD_PRECOMPILE;
+pub use revm_precompile::bls12_381::g2_msm::PRECOMPILE as G2_MSM_PRECOMPILE;
+pub use revm_precompile::bls12_381::map_fp2_to_g2::PRECOMPILE as MAP_FP2_TO_G2_PRECOMPILE;
+pub use revm_precompile::bls12_381::map_fp_to_g1::PRECOMPILE as MAP_FP_TO_G1_PRECOMPILE;
+pub use revm_precompile::bls12_381::pairing::PRECOMPILE as PAIRING_PRECOMPILE;
+use revm_precompile::{Bytes, PrecompileResult};
+
+pub type PrecompileFn = fn(&[u8], u64) -> PrecompileResult;
+
+/// Run a precompile with unlimited gas, returning None on error
+pub fn run(precompile: PrecompileFn, input: &[u8]) -> Option<Bytes> {
+    precompile(input, u64::MAX).ok().map(|output| output.bytes)
+}
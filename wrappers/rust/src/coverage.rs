@@ -0,0 +1,62 @@
+//! Edge counters of the coverage build (`make coverage`).
+//!
+//! The crate and its dependencies are compiled with SanitizerCoverage inline
+//! 8-bit counters: every instrumented module registers its counter array
+//! through `__sanitizer_cov_8bit_counters_init` at load time. No sanitizer
+//! runtime is linked, the callback is defined here and the counters are
+//! exposed to the harness through `coverage_counters_size` and
+//! `coverage_collect`.
+
+use std::sync::Mutex;
+
+/// Counter arrays registered by the instrumented modules: (start, length)
+static REGIONS: Mutex<Vec<(usize, usize)>> = Mutex::new(Vec::new());
+
+/// Called by the constructor of every instrumented module.
+///
+/// # Safety
+/// - `start..stop` must be the counter array of the module
+#[no_mangle]
+pub unsafe extern "C" fn __sanitizer_cov_8bit_counters_init(start: *mut u8, stop: *mut u8) {
+    if start < stop {
+        let mut regions = REGIONS.lock().unwrap_or_else(|e| e.into_inner());
+        regions.push((start as usize, stop as usize - start as usize));
+    }
+}
+
+/// Total number of edge counters.
+#[no_mangle]
+pub extern "C" fn coverage_counters_size() -> usize {
+    let regions = REGIONS.lock().unwrap_or_else(|e| e.into_inner());
+    regions.iter().map(|&(_, len)| len).sum()
+}
+
+/// Copy the edge counters hit since the last collection and reset them.
+///
+/// # Safety
+/// - Output pointers must be valid and properly aligned
+/// - Output buffer must have a capacity of `coverage_counters_size()` bytes
+#[no_mangle]
+pub unsafe extern "C" fn coverage_collect(
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    if output.is_null() || output_len.is_null() {
+        return -1;
+    }
+    let regions = REGIONS.lock().unwrap_or_else(|e| e.into_inner());
+    let size: usize = regions.iter().map(|&(_, len)| len).sum();
+    if size > output_capacity {
+        return -2;
+    }
+    let mut offset = 0;
+    for &(start, len) in regions.iter() {
+        let counters = start as *mut u8;
+        std::ptr::copy_nonoverlapping(counters, output.add(offset), len);
+        std::ptr::write_bytes(counters, 0, len);
+        offset += len;
+    }
+    *output_len = size;
+    0
+}
@@ -0,0 +1,212 @@
+//! Precompiles called from a contract run by an in-memory revm (feature `evm`).
+//!
+//! Each `*_evm_wrapper` function executes a transaction to a caller contract
+//! which copies its calldata to memory, STATICCALLs the precompile with all
+//! its gas and returns the return data, or reverts when the call failed: the
+//! CALL path, gas forwarding and return data handling of a node. The contract
+//! is the one of wrappers/python/eels_evm.py and the Go `evm` build.
+
+use crate::write_output;
+use revm::db::{CacheDB, EmptyDB};
+use revm::primitives::{
+    address, AccountInfo, Address, Bytecode, Bytes, ExecutionResult, Output, SpecId, TxKind, U256,
+};
+use revm::Evm;
+use std::slice;
+
+/// Gas of the transaction, enough for the largest MSM and pairing inputs
+const EVM_GAS_LIMIT: u64 = 1 << 40;
+
+/// Sender of the transactions
+const ORIGIN: Address = address!("00000000000000000000000000000000000c0de0");
+
+/// Address of the caller contracts
+const CALLER_CONTRACT: Address = address!("00000000000000000000000000000000000c0de1");
+
+/// Bytecode calling `precompile` with the calldata and returning its output
+fn caller_code(precompile: u8) -> Bytes {
+    #[rustfmt::skip]
+    let code = [
+        // CALLDATACOPY(0, 0, CALLDATASIZE)
+        0x36, 0x60, 0x00, 0x60, 0x00, 0x37,
+        // STATICCALL(GAS, precompile, 0, CALLDATASIZE, 0, 0)
+        0x60, 0x00, 0x60, 0x00, 0x36, 0x60, 0x00, 0x60, precompile, 0x5a, 0xfa,
+        // RETURNDATACOPY(0, 0, RETURNDATASIZE)
+        0x3d, 0x60, 0x00, 0x60, 0x00, 0x3e,
+        // JUMPI(0x1e, success)
+        0x60, 0x1e, 0x57,
+        // REVERT(0, RETURNDATASIZE)
+        0x3d, 0x60, 0x00, 0xfd,
+        // JUMPDEST, RETURN(0, RETURNDATASIZE)
+        0x5b, 0x3d, 0x60, 0x00, 0xf3,
+    ];
+    Bytes::copy_from_slice(&code)
+}
+
+/// Run the caller contract of `precompile` in a fresh state, returning None
+/// when it reverts
+fn call(precompile: u8, input: &[u8]) -> Option<Bytes> {
+    let mut db = CacheDB::new(EmptyDB::default());
+    db.insert_account_info(
+        CALLER_CONTRACT,
+        AccountInfo {
+            code: Some(Bytecode::new_raw(caller_code(precompile))),
+            ..Default::default()
+        },
+    );
+    let mut evm = Evm::builder()
+        .with_db(db)
+        .with_spec_id(SpecId::PRAGUE)
+        .modify_tx_env(|tx| {
+            tx.caller = ORIGIN;
+            tx.transact_to = TxKind::Call(CALLER_CONTRACT);
+            tx.data = Bytes::copy_from_slice(input);
+            tx.gas_limit = EVM_GAS_LIMIT;
+            tx.gas_price = U256::ZERO;
+        })
+        .build();
+    match evm.transact().ok()?.result {
+        ExecutionResult::Success {
+            output: Output::Call(output),
+            ..
+        } => Some(output),
+        _ => None,
+    }
+}
+
+/// Helper function handling the FFI logic of the EVM-level wrappers
+///
+/// # Safety
+/// - Input/output pointers must be valid and properly aligned
+/// - Output buffer must have sufficient capacity
+unsafe fn execute_call(
+    precompile: u8,
+    input: *const u8,
+    input_len: usize,
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    // Safety checks
+    if input.is_null() || output.is_null() || output_len.is_null() {
+        return -1;
+    }
+
+    let input_slice = slice::from_raw_parts(input, input_len);
+    match call(precompile, input_slice) {
+        Some(result) => write_output(&result, output, output_capacity, output_len),
+        None => -4, // The precompile call failed and the contract reverted
+    }
+}
+
+/// FFI wrapper for BLS12-381 G1 point addition, called through the EVM.
+///
+/// # Safety
+/// - Input/output pointers must be valid and properly aligned
+/// - Output buffer must have sufficient capacity
+#[no_mangle]
+pub unsafe extern "C" fn g1_add_evm_wrapper(
+    input: *const u8,
+    input_len: usize,
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    execute_call(0x0b, input, input_len, output, output_capacity, output_len)
+}
+
+/// FFI wrapper for BLS12-381 G1 multi-scalar multiplication, called through the EVM.
+///
+/// # Safety
+/// - Input/output pointers must be valid and properly aligned
+/// - Output buffer must have sufficient capacity
+#[no_mangle]
+pub unsafe extern "C" fn g1_msm_evm_wrapper(
+    input: *const u8,
+    input_len: usize,
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    execute_call(0x0c, input, input_len, output, output_capacity, output_len)
+}
+
+/// FFI wrapper for BLS12-381 G2 point addition, called through the EVM.
+///
+/// # Safety
+/// - Input/output pointers must be valid and properly aligned
+/// - Output buffer must have sufficient capacity
+#[no_mangle]
+pub unsafe extern "C" fn g2_add_evm_wrapper(
+    input: *const u8,
+    input_len: usize,
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    execute_call(0x0d, input, input_len, output, output_capacity, output_len)
+}
+
+/// FFI wrapper for BLS12-381 G2 multi-scalar multiplication, called through the EVM.
+///
+/// # Safety
+/// - Input/output pointers must be valid and properly aligned
+/// - Output buffer must have sufficient capacity
+#[no_mangle]
+pub unsafe extern "C" fn g2_msm_evm_wrapper(
+    input: *const u8,
+    input_len: usize,
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    execute_call(0x0e, input, input_len, output, output_capacity, output_len)
+}
+
+/// FFI wrapper for BLS12-381 pairing operation, called through the EVM.
+///
+/// # Safety
+/// - Input/output pointers must be valid and properly aligned
+/// - Output buffer must have sufficient capacity
+#[no_mangle]
+pub unsafe extern "C" fn pairing_evm_wrapper(
+    input: *const u8,
+    input_len: usize,
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    execute_call(0x0f, input, input_len, output, output_capacity, output_len)
+}
+
+/// FFI wrapper for BLS12-381 map_fp_to_g1 operation, called through the EVM.
+///
+/// # Safety
+/// - Input/output pointers must be valid and properly aligned
+/// - Output buffer must have sufficient capacity
+#[no_mangle]
+pub unsafe extern "C" fn map_fp_to_g1_evm_wrapper(
+    input: *const u8,
+    input_len: usize,
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    execute_call(0x10, input, input_len, output, output_capacity, output_len)
+}
+
+/// FFI wrapper for BLS12-381 map_fp2_to_g2 operation, called through the EVM.
+///
+/// # Safety
+/// - Input/output pointers must be valid and properly aligned
+/// - Output buffer must have sufficient capacity
+#[no_mangle]
+pub unsafe extern "C" fn map_fp2_to_g2_evm_wrapper(
+    input: *const u8,
+    input_len: usize,
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
+    execute_call(0x11, input, input_len, output, output_capacity, output_len)
+}
@@ -1,14 +1,24 @@
-use revm_precompile::bls12_381::g1_add::PRECOMPILE as G1_ADD_PRECOMPILE;
-use revm_precompile::bls12_381::g1_msm::PRECOMPILE as G1_MSM_PRECOMPILE;
-use revm_precompile::bls12_381::g2_add::PRECOMPILE as G2_ADD_PRECOMPILE;
-use revm_precompile::bls12_381::g2_msm::PRECOMPILE as G2_MSM_PRECOMPILE;
-use revm_precompile::bls12_381::map_fp2_to_g2::PRECOMPILE as MAP_FP2_TO_G2_PRECOMPILE;
-use revm_precompile::bls12_381::map_fp_to_g1::PRECOMPILE as MAP_FP_TO_G1_PRECOMPILE;
-use revm_precompile::bls12_381::pairing::PRECOMPILE as PAIRING_PRECOMPILE;
-use revm_precompile::Bytes;
-use revm_precompile::{PrecompileErrors, PrecompileOutput};
+#[cfg(all(feature = "blst", feature = "arkworks"))]
+compile_error!("the blst and arkworks features select the BLS12-381 backend, enable only one");
+#[cfg(not(any(feature = "blst", feature = "arkworks")))]
+compile_error!("enable a BLS12-381 backend feature: blst or arkworks");
+
+mod backend;
+
+use backend::{
+    G1_ADD_PRECOMPILE, G1_MSM_PRECOMPILE, G2_ADD_PRECOMPILE, G2_MSM_PRECOMPILE,
+    MAP_FP2_TO_G2_PRECOMPILE, MAP_FP_TO_G1_PRECOMPILE, PAIRING_PRECOMPILE,
+};
 use std::slice;
 
+#[cfg(feature = "coverage")]
+mod coverage;
+
+#[cfg(all(feature = "evm", feature = "arkworks"))]
+compile_error!("the evm feature runs the precompiles of revm's blst build, disable arkworks");
+#[cfg(feature = "evm")]
+mod evm;
+
 /// Helper function to handle common FFI wrapper logic for BLS12-381 operations
 ///
 /// # Safety
@@ -16,7 +26,7 @@ use std::slice;
 /// - Input buffer must contain valid data for the specific operation
 /// - Output buffer must have sufficient capacity
 unsafe fn execute_precompile(
-    precompile: fn(&Bytes, u64) -> Result<PrecompileOutput, PrecompileErrors>,
+    precompile: backend::PrecompileFn,
     input: *const u8,
     input_len: usize,
     output: *mut u8,
@@ -30,14 +40,26 @@ unsafe fn execute_precompile(
 
     // Convert input to Rust slice
     let input_slice = slice::from_raw_parts(input, input_len);
-    let input_bytes = Bytes::copy_from_slice(input_slice);
 
     // Call the precompile implementation
-    let result = match precompile(&input_bytes, u64::MAX) {
-        Ok(output) => output.bytes,
-        Err(_) => return -4, // Invalid input format or computation error
+    let result = match backend::run(precompile, input_slice) {
+        Some(output) => output,
+        None => return -4, // Invalid input format or computation error
     };
 
+    write_output(&result, output, output_capacity, output_len)
+}
+
+/// Copy a precompile result to the output buffer
+///
+/// # Safety
+/// - Output pointers must be valid and properly aligned
+unsafe fn write_output(
+    result: &[u8],
+    output: *mut u8,
+    output_capacity: usize,
+    output_len: *mut usize,
+) -> i32 {
     // Check output buffer capacity
     if result.len() > output_capacity {
         return -2;